@@ -1,21 +1,35 @@
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Request
+from fastapi.responses import FileResponse, JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.background import BackgroundTask
+import asyncio
 import os
+from contextlib import asynccontextmanager
+import json
+import logging
 from pathlib import Path
 from dotenv import load_dotenv
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
 # Load environment variables
 load_dotenv()
 
+# Leveled logging for all app modules (LOG_LEVEL: DEBUG, INFO, WARNING, ERROR)
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+)
+
 from app.models.schemas import (
     TranslationRequest, 
     TranslationResponse,
+    BatchTranslationRequest,
+    BatchTranslationResponse,
     TTSRequest,
     STTResponse,
+    VideoTranslationResponse,
     LanguageCode,
-    SUPPORTED_LANGUAGES,
-    get_stt_supported_languages,
+    LANGUAGES,
     is_language_supported
 )
 
@@ -23,13 +37,42 @@ from app.services.stt_service import STTService
 from app.services.translation_service import TranslationService
 from app.services.tts_service import TTSService
 from app.services.video_service import VideoService
-from app.utils.file_handler import FileHandler
+from app.services.pipeline_service import PipelineService, NoSpeechError
+from app.services.job_service import JobService, Job, QueueFullError
+from app.services.cache_service import PipelineCache
+from app.services.storage_service import StorageManager, InsufficientStorageError
+from app.services.service_container import ServiceContainer
+from app.utils.file_handler import FileHandler, UploadTooLargeError
+from app.utils.executor import TaskExecutor
+from app.utils.http_pool import shared_pool
+from app.utils.static_json import StaticJSON
+from app.utils.subtitles import SUBTITLE_FORMATS
+from app.utils.metrics import JOB_QUEUE_DEPTH, monitor_event_loop
+
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build and warm the services while serving (see /health); stop everything on shutdown"""
+    startup = services.start_background(executor.run_io)
+    loop_monitor = asyncio.create_task(monitor_event_loop())
+    janitor = asyncio.create_task(storage.janitor(executor.run_io))
+    yield
+    startup.cancel()
+    loop_monitor.cancel()
+    janitor.cancel()
+    await asyncio.gather(startup, return_exceptions=True)
+    await job_service.stop()
+    await services.stop(executor.run_io)
+    await shared_pool().aclose()
+    executor.shutdown()
 
 # Initialize FastAPI app
 app = FastAPI(
     title = "Elvet Video Translator API",
     description = "Translate reels between any language.",
-    version = "1.0.3"
+    version = "1.0.3",
+    lifespan=lifespan
 )
 
 # CORS middleware (allow frontend connections)
@@ -39,36 +82,68 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-    expose_headers=["X-Detected-Language", "X-Language-Confidence"]
+    expose_headers=["X-Detected-Language", "X-Language-Confidence", "X-Stage-Timings"]
 )
 
-# Initialize services (lazy loading on first use)
-stt_service = None
-translation_service = None
-tts_service = None
+# Initialize services (provider-backed ones are built and warmed at startup)
+services = ServiceContainer({
+    "stt": STTService,
+    "translation": TranslationService,
+    "tts": TTSService,
+})
 video_service = VideoService()
 file_handler = FileHandler()
+executor = TaskExecutor()
+pipeline_cache = PipelineCache()
+storage = StorageManager([file_handler.upload_dir, file_handler.output_dir])
 
 def get_stt_service():
-    """Lazy load STT service"""
-    global stt_service
-    if stt_service is None:
-        stt_service = STTService()
-    return stt_service
+    return services.get("stt")
 
 def get_translation_service():
-    """Lazy load translation service"""
-    global translation_service
-    if translation_service is None:
-        translation_service = TranslationService()
-    return translation_service
+    return services.get("translation")
 
 def get_tts_service():
-    """Lazy load TTS service"""
-    global tts_service
-    if tts_service is None:
-        tts_service = TTSService()
-    return tts_service
+    return services.get("tts")
+
+def get_pipeline_service():
+    """Build the video pipeline from the shared services"""
+    return PipelineService(
+        stt_service=get_stt_service(),
+        translation_service=get_translation_service(),
+        tts_service=get_tts_service(),
+        video_service=video_service,
+        file_handler=file_handler,
+        executor=executor,
+        cache=pipeline_cache
+    )
+
+async def run_video_pipeline(video_path: str, target_lang: str, content_hash: str = None):
+    """Job runner: translate one saved video; the output is kept for download"""
+    result = await get_pipeline_service().run(video_path, target_lang, content_hash)
+    storage.track(result.output_file)
+    return result
+
+def release_file(path: str):
+    """Job cleanup: drop the janitor's bookkeeping and delete the file"""
+    storage.forget(path)
+    file_handler.cleanup_file(path)
+
+job_service = JobService(runner=run_video_pipeline, cleanup=release_file)
+JOB_QUEUE_DEPTH.set_function(job_service.queue_depth)
+
+async def admit_job():
+    """Reject new work before the temp directories fill up"""
+    await executor.run_io(storage.admit)
+
+def file_response(path: str, media_type: str, filename: str) -> FileResponse:
+    """Send an output file and delete it once the response is complete"""
+    return FileResponse(
+        path,
+        media_type=media_type,
+        filename=filename,
+        background=BackgroundTask(file_handler.cleanup_file, path)
+    )
 
 ################ DEBUG ################
 @app.get("/debug/tmp")
@@ -122,58 +197,100 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "translate_text": "/api/translate",
+            "translate_batch": "/api/translate/batch",
             "text_to_speech": "/api/tts",
             "speech_to_text": "/api/stt",
-            "translate_video": "/api/translate-video"
+            "translate_video": "/api/translate-video",
+            "translate_video_batch": "/api/translate-video/batch",
+            "translate_video_stream": "/api/translate-video/stream",
+            "submit_job": "/api/jobs",
+            "job_status": "/api/jobs/{job_id}",
+            "job_result": "/api/jobs/{job_id}/result",
+            "metrics": "/metrics"
         }
     }
 
 @app.get("/health")
 async def health():
-    """Detailed health check"""
-    return {
-        "status": "healthy",
-        "services": {
-            "stt": "ready" if stt_service else "not_loaded",
-            "translation": "ready" if translation_service else "not_loaded",
-            "tts": "ready" if tts_service else "not_loaded",
-            "video": "ready"
-        }
+    """
+    Detailed health check
+    
+    status is "starting" (503) while services are built and warmed,
+    "healthy" once all are ready, and "degraded" when a service failed
+    to build or warm up (see errors).
+    """
+    translation_service = services.loaded("translation")
+    service_states = services.status()
+    if services.starting:
+        status = "starting"
+    elif all(state == "ready" for state in service_states.values()):
+        status = "healthy"
+    else:
+        status = "degraded"
+    
+    body = {
+        "status": status,
+        "services": {**service_states, "video": "ready"},
+        "errors": services.errors(),
+        "jobs": {
+            "workers": job_service.workers,
+            "queued": job_service.queue_depth()
+        },
+        "cache": pipeline_cache.stats(),
+        "storage": storage.stats(),
+        "translation_backends": translation_service.backend_stats() if translation_service else {},
+        "http_pool": shared_pool().stats()
     }
+    return JSONResponse(body, status_code=503 if status == "starting" else 200)
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Prometheus metrics in text exposition format
+    
+    Per-stage histograms by language pair, pipeline outcomes, bytes
+    processed, cache hit/miss counters, provider latency and errors,
+    and job queue depth. Each worker process reports its own values.
+    """
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
 
 ################ LANGUAGES ################
+# Built once from the registry; the lists only change on deploy
+LANGUAGES_RESPONSE = StaticJSON({
+    "languages": [
+        {
+            "code": lang.code,
+            "name": lang.name,
+            "native_name": lang.native_name,
+            "flag": lang.flag,
+            "stt_supported": lang.stt_supported
+        }
+        for lang in LANGUAGES.all
+    ]
+})
+
+VIDEO_LANGUAGES_RESPONSE = StaticJSON({
+    "languages": [
+        {
+            "code": lang.code,
+            "name": lang.name,
+            "native_name": lang.native_name,
+            "flag": lang.flag
+        }
+        for lang in LANGUAGES.stt
+    ]
+})
+
 @app.get("/api/languages")
-async def get_supported_languages():
+async def get_supported_languages(request: Request):
     """Return all supported languages with metadata"""
-    return {
-        "languages": [
-            {
-                "code": code,
-                "name": data["name"],
-                "native_name": data["native_name"],
-                "flag": data["flag"],
-                "stt_supported": data.get("stt_supported", False)
-            }
-            for code, data in SUPPORTED_LANGUAGES.items()
-        ]
-    }
+    return LANGUAGES_RESPONSE.response(request)
 
 @app.get("/api/languages/video")
-async def get_video_translation_languages():
+async def get_video_translation_languages(request: Request):
     """Return only languages that support full video translation (STT required)"""
-    stt_langs = get_stt_supported_languages()
-    return {
-        "languages": [
-            {
-                "code": code,
-                "name": data["name"],
-                "native_name": data["native_name"],
-                "flag": data["flag"]
-            }
-            for code, data in stt_langs.items()
-        ]
-    }
+    return VIDEO_LANGUAGES_RESPONSE.response(request)
 
 
 ################ TEXT TRANSLATION ################
@@ -194,7 +311,8 @@ async def translate_text(request: TranslationRequest):
     try:
         translator = get_translation_service()
         
-        translated = translator.translate(
+        translated = await executor.run_io(
+            translator.translate,
             text=request.text,
             source_lang=request.source_lang,
             target_lang=request.target_lang
@@ -211,6 +329,40 @@ async def translate_text(request: TranslationRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/translate/batch", response_model=BatchTranslationResponse)
+async def translate_text_batch(request: BatchTranslationRequest):
+    """
+    Translate a list of texts in one call (e.g. subtitle lines)
+    
+    Example:
+```json
+    {
+        "texts": ["Hello world", "How are you?"],
+        "source_lang": "en",
+        "target_lang": "zh-CN"
+    }
+```
+    """
+    try:
+        translator = get_translation_service()
+        
+        translations = await executor.run_io(
+            translator.translate_batch,
+            request.texts,
+            request.source_lang,
+            request.target_lang
+        )
+        
+        return BatchTranslationResponse(
+            translations=translations,
+            source_lang=request.source_lang,
+            target_lang=request.target_lang
+        )
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 ################ TEXT-TO-SPEECH ################
 @app.post("/api/tts")
 async def text_to_speech(request: TTSRequest):
@@ -220,23 +372,23 @@ async def text_to_speech(request: TTSRequest):
     Returns audio file download
     """
     try:
+        await admit_job()
         tts = get_tts_service()
         
         # Generate output path
         output_path = file_handler.get_output_path("tts", ".mp3")
         
         # Generate speech
-        audio_file = await tts.generate_speech_async(
+        audio_file = await tts.generate_speech_batch(
             text=request.text,
             language=request.language.value,
             output_path=output_path
         )
         
-        return FileResponse(
-            audio_file,
-            media_type="audio/mpeg",
-            filename=Path(audio_file).name
-        )
+        return file_response(audio_file, "audio/mpeg", Path(audio_file).name)
+        
+    except InsufficientStorageError as e:
+        raise HTTPException(status_code=503, detail=str(e))
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -252,15 +404,17 @@ async def speech_to_text(file: UploadFile = File(...)):
     """
     try:
         # Save uploaded file
-        temp_file = file_handler.save_upload(file, prefix="audio")
+        await admit_job()
+        upload = await file_handler.save_upload_async(file, prefix="audio")
+        temp_file = upload.path
         
         # Transcribe
         stt = get_stt_service()
-        text, detected_lang = stt.transcribe(temp_file)
+        text, detected_lang, _ = await executor.run_io(stt.transcribe, temp_file)
         
         # Get duration (if video, extract audio first)
         try:
-            duration = video_service.get_video_duration(temp_file)
+            duration = await executor.run_ffmpeg(video_service.get_video_duration, temp_file)
         except:
             duration = 0.0
         
@@ -273,6 +427,12 @@ async def speech_to_text(file: UploadFile = File(...)):
             duration=duration
         )
         
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+        
+    except InsufficientStorageError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+        
     except Exception as e:
         # Cleanup on error
         if 'temp_file' in locals():
@@ -285,7 +445,10 @@ async def speech_to_text(file: UploadFile = File(...)):
 async def translate_video(
     file: UploadFile = File(...),
     # source_lang: str = Form(...),
-    target_lang: str = Form(...)
+    target_lang: str = Form(...),
+    mode: str = Form("dub"),
+    subtitle_format: str = Form("srt"),
+    embed_subtitles: bool = Form(False)
 ):
     """
     Full pipeline: Video → Transcribe → Translate → TTS → New Video
@@ -294,104 +457,294 @@ async def translate_video(
     - file: Video file (mp4, avi, mov)
     - source_lang: Source language (en, zh-CN, ms)
     - target_lang: Target language (en, zh-CN, ms)
+    - mode: "dub" (default) or "subtitles" (stop after translation, no TTS)
+    - subtitle_format: "srt" (default) or "vtt", for mode=subtitles
+    - embed_subtitles: With mode=subtitles, return the video with a soft
+      subtitle track (no re-encoding) instead of the subtitle file
     
-    Returns: Translated video file
+    Returns: Translated video file, subtitle file or subtitled video
     """
-    temp_files = []
+    video_path = None
     
     try:
-        print("\n" + "="*60)
-        print("VIDEO TRANSLATION PIPELINE")
-        print("="*60)
-        
         # Validate languages using registry
         if not is_language_supported(target_lang):
             raise HTTPException(400, f"Unsupported target language: {target_lang}")
+        if mode not in ("dub", "subtitles"):
+            raise HTTPException(400, f"Unsupported mode: {mode}")
+        if subtitle_format not in SUBTITLE_FORMATS:
+            raise HTTPException(400, f"Unsupported subtitle format: {subtitle_format}")
         
-        # Step 1: Save uploaded video
-        print("Step 1: Saving video...")
-        video_path = file_handler.save_upload(file, prefix="input_video")
-        temp_files.append(video_path)
+        # Save uploaded video
+        await admit_job()
+        upload = await file_handler.save_upload_async(file, prefix="input_video")
+        video_path = upload.path
         
-        # Step 2: Extract audio
-        print("Step 2: Extracting audio...")
-        audio_path = file_handler.get_output_path("extracted_audio", ".wav")
-        temp_files.append(audio_path)
-        video_service.extract_audio(video_path, audio_path)
+        pipeline = get_pipeline_service()
+        if mode == "subtitles":
+            result = await pipeline.run_subtitles(
+                video_path, target_lang, upload.sha256, subtitle_format, embed_subtitles
+            )
+        else:
+            result = await pipeline.run(video_path, target_lang, upload.sha256)
         
-        # Step 3: Transcribe (STT)
-        print("Step 3: Transcribing audio...")
-        stt = get_stt_service()
+        # Return translated video (or subtitles)
+        if mode == "subtitles" and not embed_subtitles:
+            response = file_response(
+                result.output_file,
+                SUBTITLE_FORMATS[subtitle_format],
+                f"{Path(file.filename or 'video').stem}.{target_lang}.{subtitle_format}"
+            )
+        else:
+            response = file_response(result.output_file, "video/mp4", pipeline.output_filename(video_path))
+
+        response.headers["X-Detected-Language"] = result.detected_lang
+        response.headers["X-Language-Confidence"] = str(result.confidence)
 
-        try:
-            original_text, detected_lang, confidence = stt.transcribe(audio_path)
-            print(f"Original text: {original_text}")
+        return response
 
-            # Warn about mixed languages
-            if confidence < 0.7:
-                print("⚠ Possible mixed language video - translation may be inaccurate")
+    except HTTPException:
+        # Don't wrap HTTPExceptions, pass them through
+        raise
 
-        except Exception as e:
-            # Check if it's a "no speech" error
-            error_msg = str(e)
-            if "No speech detected" in error_msg or "empty transcript" in error_msg.lower():
-                raise HTTPException(
-                    status_code=400, 
-                    detail="No speech detected in the video. Please upload a video with spoken dialogue or narration."
-                )
-            raise  # Re-raise other errors
-        
-        # Step 4: Translate
-        print("Step 4: Translating text...")
-        translator = get_translation_service()
-        translated_text = translator.translate(
-            text=original_text,
-            source_lang=detected_lang,
-            target_lang=target_lang
-        )
-        print(f"Translated text: {translated_text}")
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    except InsufficientStorageError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    except NoSpeechError as e:
+        raise HTTPException(status_code=400, detail=str(e))
         
-        # Step 5: Text-to-Speech
-        print("Step 5: Generating speech...")
-        tts = get_tts_service()
-        new_audio_path = file_handler.get_output_path("translated_audio", ".mp3")
-        temp_files.append(new_audio_path)
-        await tts.generate_speech_async(translated_text, target_lang, new_audio_path)
-        
-        # Step 6: Merge audio with video
-        print("Step 6: Creating final video...")
-        output_video_path = file_handler.get_output_path("translated_video", ".mp4")
-        video_service.replace_audio(video_path, new_audio_path, output_video_path)
-        
-        print("="*60)
-        print("✓ TRANSLATION COMPLETE")
-        print("="*60 + "\n")
-        
-        # Cleanup temp files
-        file_handler.cleanup_files(*temp_files)
-        
-        # Return translated video
-        response = FileResponse(
-            output_video_path,
-            media_type="video/mp4",
-            filename=f"translated_{Path(video_path).name}"
-        )
+    except Exception as e:
+        logger.error(f"Pipeline Error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    finally:
+        if video_path:
+            file_handler.cleanup_file(video_path)
 
-        response.headers["X-Detected-Language"] = detected_lang
-        response.headers["X-Language-Confidence"] = str(confidence)
 
+@app.post("/api/translate-video/stream")
+async def translate_video_stream(request: Request, target_lang: str, filename: str = "video.mp4"):
+    """
+    Streaming pipeline: transcription, translation and TTS start while the
+    video is still uploading
+    
+    The request body is the raw video (not multipart form data), e.g.
+    `curl -X POST -T video.mkv "http://localhost:8000/api/translate-video/stream?target_lang=es&filename=video.mkv"`.
+    Streamable containers (MKV/WebM, MPEG-TS, faststart MP4) overlap best.
+    
+    Query:
+    - target_lang: Target language
+    - filename: Original filename (sets the extension)
+    
+    Returns: Translated video file, with the per-stage timing breakdown
+    in the X-Stage-Timings header (JSON, seconds from request start)
+    """
+    if not is_language_supported(target_lang):
+        raise HTTPException(400, f"Unsupported target language: {target_lang}")
+    
+    try:
+        await admit_job()
+        pipeline = get_pipeline_service()
+        result = await pipeline.run_streaming(
+            request.stream(), Path(filename).suffix or ".mp4", target_lang
+        )
+        
+        response = file_response(result.output_file, "video/mp4", pipeline.output_filename(filename))
+        
+        response.headers["X-Detected-Language"] = result.detected_lang
+        response.headers["X-Language-Confidence"] = str(result.confidence)
+        response.headers["X-Stage-Timings"] = json.dumps(result.timings, separators=(",", ":"))
+        
         return response
+    
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    
+    except InsufficientStorageError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    except NoSpeechError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    except Exception as e:
+        logger.error(f"Pipeline Error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 
+@app.post("/api/translate-video/batch")
+async def translate_video_batch(
+    file: UploadFile = File(...),
+    target_langs: str = Form(...)
+):
+    """
+    Translate one video into several languages in a single request
+    
+    The video is uploaded, extracted and transcribed once; translation,
+    TTS and merging then run concurrently for every target.
+    
+    Form Data:
+    - file: Video file (mp4, avi, mov)
+    - target_langs: Comma-separated target languages (e.g. "es,fr,zh-CN")
+    
+    Returns: Zip with one translated_<lang>.mp4 per successful target and a
+    manifest.json describing every target (texts or error)
+    """
+    langs = [lang.strip() for lang in target_langs.split(",") if lang.strip()]
+    if not langs:
+        raise HTTPException(400, "No target languages given")
+    unsupported = [lang for lang in langs if not is_language_supported(lang)]
+    if unsupported:
+        raise HTTPException(400, f"Unsupported target language: {', '.join(unsupported)}")
+    
+    video_path = None
+    results = {}
+    
+    try:
+        await admit_job()
+        upload = await file_handler.save_upload_async(file, prefix="input_video")
+        video_path = upload.path
+        
+        results = await get_pipeline_service().run_many(video_path, langs, upload.sha256)
+        
+        manifest = {"source_file": file.filename, "targets": {}}
+        videos = {}
+        for lang, result in results.items():
+            if isinstance(result, Exception):
+                manifest["targets"][lang] = {"status": "failed", "error": str(result)}
+                continue
+            name = f"translated_{lang}.mp4"
+            videos[name] = result.output_file
+            manifest["targets"][lang] = {
+                "status": "completed",
+                "file": name,
+                "original_text": result.original_text,
+                "translated_text": result.translated_text,
+                "detected_lang": result.detected_lang,
+                "confidence": result.confidence
+            }
+        
+        if not videos:
+            raise HTTPException(500, f"All targets failed: {json.dumps(manifest['targets'])}")
+        
+        zip_path = await executor.run_io(
+            file_handler.create_zip,
+            "translated_videos",
+            videos,
+            {"manifest.json": json.dumps(manifest, ensure_ascii=False, indent=2)}
+        )
+        
+        return file_response(
+            zip_path,
+            "application/zip",
+            f"translated_{Path(file.filename or 'video').stem}.zip"
+        )
+    
     except HTTPException:
-        # Don't wrap HTTPExceptions, pass them through
-        file_handler.cleanup_files(*temp_files)
         raise
-        
+    
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    
+    except InsufficientStorageError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    except NoSpeechError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     except Exception as e:
-        # Cleanup all temp files on error
-        file_handler.cleanup_files(*temp_files)
-        print(f"\n✗ Pipeline Error: {e}\n")
+        logger.error(f"Pipeline Error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+    
+    finally:
+        if video_path:
+            file_handler.cleanup_file(video_path)
+        file_handler.cleanup_files(*[
+            result.output_file for result in results.values()
+            if not isinstance(result, Exception)
+        ])
+
+
+################ VIDEO TRANSLATION JOBS ################
+def job_to_response(job: Job) -> VideoTranslationResponse:
+    """Serialize a job for status polling"""
+    response = VideoTranslationResponse(
+        job_id=job.job_id,
+        status=job.status,
+        error=job.error
+    )
+    if job.result:
+        response.original_text = job.result.original_text
+        response.translated_text = job.result.translated_text
+        response.detected_lang = job.result.detected_lang
+        response.confidence = job.result.confidence
+        response.output_file = f"/api/jobs/{job.job_id}/result"
+    return response
+
+@app.post("/api/jobs", response_model=VideoTranslationResponse, status_code=202)
+async def submit_video_job(
+    file: UploadFile = File(...),
+    target_lang: str = Form(...)
+):
+    """
+    Queue a video for translation and return immediately
+    
+    Poll GET /api/jobs/{job_id} until status is "completed" or "failed",
+    then download from GET /api/jobs/{job_id}/result
+    """
+    if not is_language_supported(target_lang):
+        raise HTTPException(400, f"Unsupported target language: {target_lang}")
+    
+    try:
+        await admit_job()
+        upload = await file_handler.save_upload_async(file, prefix="input_video")
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except InsufficientStorageError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    # Queued uploads can wait a while; keep the janitor off them
+    storage.pin(upload.path)
+    try:
+        job = job_service.submit(upload.path, target_lang, upload.sha256)
+    except QueueFullError as e:
+        release_file(upload.path)
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    return job_to_response(job)
+
+@app.get("/api/jobs/{job_id}", response_model=VideoTranslationResponse)
+async def get_video_job(job_id: str):
+    """Return the status of a queued video translation"""
+    job = job_service.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_to_response(job)
+
+@app.get("/api/jobs/{job_id}/result")
+async def get_video_job_result(job_id: str):
+    """Download the translated video of a completed job"""
+    job = job_service.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status == "failed":
+        raise HTTPException(status_code=409, detail=f"Job failed: {job.error}")
+    if job.status != "completed":
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    if not os.path.exists(job.result.output_file):
+        raise HTTPException(status_code=410, detail="Result expired, please resubmit the video")
+    
+    storage.touch(job.result.output_file)
+    response = FileResponse(
+        job.result.output_file,
+        media_type="video/mp4",
+        filename=PipelineService.output_filename(job.video_path)
+    )
+    response.headers["X-Detected-Language"] = job.result.detected_lang
+    response.headers["X-Language-Confidence"] = str(job.result.confidence)
+    return response
 
 
 ################ RUN SERVER ################
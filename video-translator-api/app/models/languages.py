@@ -0,0 +1,478 @@
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple
+
+# Complete language metadata, frozen into LANGUAGES below
+_LANGUAGE_DATA = {
+    # === Western European Languages ===
+    "en": {
+        "name": "English",
+        "native_name": "English",
+        "flag": "🇬🇧",
+        "tts_voice": "en-US-AriaNeural",
+        "stt_supported": True,
+        "deepgram_code": "en",
+        "deepgram_model": "nova-3"
+    },
+    "es": {
+        "name": "Spanish",
+        "native_name": "Español",
+        "flag": "🇪🇸",
+        "tts_voice": "es-ES-ElviraNeural",
+        "stt_supported": True,
+        "deepgram_code": "es",
+        "deepgram_model": "nova-3"
+    },
+    "fr": {
+        "name": "French",
+        "native_name": "Français",
+        "flag": "🇫🇷",
+        "tts_voice": "fr-FR-DeniseNeural",
+        "stt_supported": True,
+        "deepgram_code": "fr",
+        "deepgram_model": "nova-3"
+    },
+    "de": {
+        "name": "German",
+        "native_name": "Deutsch",
+        "flag": "🇩🇪",
+        "tts_voice": "de-DE-KatjaNeural",
+        "stt_supported": True,
+        "deepgram_code": "de",
+        "deepgram_model": "nova-3"
+    },
+    "pt": {
+        "name": "Portuguese",
+        "native_name": "Português",
+        "flag": "🇵🇹",
+        "tts_voice": "pt-PT-RaquelNeural",
+        "stt_supported": True,
+        "deepgram_code": "pt",
+        "deepgram_model": "nova-3"
+    },
+    "it": {
+        "name": "Italian",
+        "native_name": "Italiano",
+        "flag": "🇮🇹",
+        "tts_voice": "it-IT-ElsaNeural",
+        "stt_supported": True,
+        "deepgram_code": "it",
+        "deepgram_model": "nova-3"
+    },
+    "nl": {
+        "name": "Dutch",
+        "native_name": "Nederlands",
+        "flag": "🇳🇱",
+        "tts_voice": "nl-NL-ColetteNeural",
+        "stt_supported": True,
+        "deepgram_code": "nl",
+        "deepgram_model": "nova-3"
+    },
+    "ru": {
+        "name": "Russian",
+        "native_name": "Русский",
+        "flag": "🇷🇺",
+        "tts_voice": "ru-RU-SvetlanaNeural",
+        "stt_supported": True,
+        "deepgram_code": "ru",
+        "deepgram_model": "nova-3"
+    },
+    "pl": {
+        "name": "Polish",
+        "native_name": "Polski",
+        "flag": "🇵🇱",
+        "tts_voice": "pl-PL-ZofiaNeural",
+        "stt_supported": True,
+        "deepgram_code": "pl",
+        "deepgram_model": "nova-3"
+    },
+    "sv": {
+        "name": "Swedish",
+        "native_name": "Svenska",
+        "flag": "🇸🇪",
+        "tts_voice": "sv-SE-SofieNeural",
+        "stt_supported": True,
+        "deepgram_code": "sv",
+        "deepgram_model": "nova-3"
+    },
+    "no": {
+        "name": "Norwegian",
+        "native_name": "Norsk",
+        "flag": "🇳🇴",
+        "tts_voice": "nb-NO-PernilleNeural",
+        "stt_supported": True,
+        "deepgram_code": "no",
+        "deepgram_model": "nova-3"
+    },
+    "da": {
+        "name": "Danish",
+        "native_name": "Dansk",
+        "flag": "🇩🇰",
+        "tts_voice": "da-DK-ChristelNeural",
+        "stt_supported": True,
+        "deepgram_code": "da",
+        "deepgram_model": "nova-3"
+    },
+    "fi": {
+        "name": "Finnish",
+        "native_name": "Suomi",
+        "flag": "🇫🇮",
+        "tts_voice": "fi-FI-NooraNeural",
+        "stt_supported": True,
+        "deepgram_code": "fi",
+        "deepgram_model": "nova-3"
+    },
+    
+    # === Eastern European ===
+    "et": {
+        "name": "Estonian",
+        "native_name": "Eesti",
+        "flag": "🇪🇪",
+        "tts_voice": "et-EE-AnuNeural",
+        "stt_supported": True,
+        "deepgram_code": "et",
+        "deepgram_model": "nova-3"
+    },
+    "lv": {
+        "name": "Latvian",
+        "native_name": "Latviešu",
+        "flag": "🇱🇻",
+        "tts_voice": "lv-LV-EveritaNeural",
+        "stt_supported": True,
+        "deepgram_code": "lv",
+        "deepgram_model": "nova-3"
+    },
+    "lt": {
+        "name": "Lithuanian",
+        "native_name": "Lietuvių",
+        "flag": "🇱🇹",
+        "tts_voice": "lt-LT-OnaNeural",
+        "stt_supported": True,
+        "deepgram_code": "lt",
+        "deepgram_model": "nova-3"
+    },
+    "cs": {
+        "name": "Czech",
+        "native_name": "Čeština",
+        "flag": "🇨🇿",
+        "tts_voice": "cs-CZ-VlastaNeural",
+        "stt_supported": True,
+        "deepgram_code": "cs",
+        "deepgram_model": "nova-3"
+    },
+    "sk": {
+        "name": "Slovak",
+        "native_name": "Slovenčina",
+        "flag": "🇸🇰",
+        "tts_voice": "sk-SK-ViktoriaNeural",
+        "stt_supported": True,
+        "deepgram_code": "sk",
+        "deepgram_model": "nova-3"
+    },
+    "hu": {
+        "name": "Hungarian",
+        "native_name": "Magyar",
+        "flag": "🇭🇺",
+        "tts_voice": "hu-HU-NoemiNeural",
+        "stt_supported": True,
+        "deepgram_code": "hu",
+        "deepgram_model": "nova-3"
+    },
+    "bg": {
+        "name": "Bulgarian",
+        "native_name": "Български",
+        "flag": "🇧🇬",
+        "tts_voice": "bg-BG-KalinaNeural",
+        "stt_supported": True,
+        "deepgram_code": "bg",
+        "deepgram_model": "nova-3"
+    },
+    "ro": {
+        "name": "Romanian",
+        "native_name": "Română",
+        "flag": "🇷🇴",
+        "tts_voice": "ro-RO-AlinaNeural",
+        "stt_supported": True,
+        "deepgram_code": "ro",
+        "deepgram_model": "nova-3"
+    },
+    "ca": {
+        "name": "Catalan",
+        "native_name": "Català",
+        "flag": "🇪🇸",
+        "tts_voice": "ca-ES-JoanaNeural",
+        "stt_supported": True,
+        "deepgram_code": "ca",
+        "deepgram_model": "nova-3"
+    },
+    "el": {
+        "name": "Greek",
+        "native_name": "Ελληνικά",
+        "flag": "🇬🇷",
+        "tts_voice": "el-GR-AthinaNeural",
+        "stt_supported": True,
+        "deepgram_code": "el",
+        "deepgram_model": "nova-3"
+    },
+    "uk": {
+        "name": "Ukrainian",
+        "native_name": "Українська",
+        "flag": "🇺🇦",
+        "tts_voice": "uk-UA-PolinaNeural",
+        "stt_supported": True,
+        "deepgram_code": "uk",
+        "deepgram_model": "nova-3"
+    },
+    
+    # === East Asian Languages ===
+    "zh-CN": {
+        "name": "Chinese (Simplified)",
+        "native_name": "简体中文",
+        "flag": "🇨🇳",
+        "tts_voice": "zh-CN-XiaoxiaoNeural",
+        "stt_supported": True,
+        "deepgram_code": "zh",
+        "deepgram_model": "nova-2"  # Note: Chinese only in Nova-2
+    },
+    "zh-TW": {
+        "name": "Chinese (Traditional)",
+        "native_name": "繁體中文",
+        "flag": "🇹🇼",
+        "tts_voice": "zh-TW-HsiaoChenNeural",
+        "stt_supported": True,
+        "deepgram_code": "zh-TW",
+        "deepgram_model": "nova-2"  # Note: Chinese only in Nova-2
+    },
+    "ja": {
+        "name": "Japanese",
+        "native_name": "日本語",
+        "flag": "🇯🇵",
+        "tts_voice": "ja-JP-NanamiNeural",
+        "stt_supported": True,
+        "deepgram_code": "ja",
+        "deepgram_model": "nova-3"
+    },
+    "ko": {
+        "name": "Korean",
+        "native_name": "한국어",
+        "flag": "🇰🇷",
+        "tts_voice": "ko-KR-SunHiNeural",
+        "stt_supported": True,
+        "deepgram_code": "ko",
+        "deepgram_model": "nova-3"
+    },
+    
+    # === Southeast Asian Languages ===
+    "ms": {
+        "name": "Malay",
+        "native_name": "Bahasa Melayu",
+        "flag": "🇲🇾",
+        "tts_voice": "ms-MY-OsmanNeural",
+        "stt_supported": True,
+        "deepgram_code": "ms",
+        "deepgram_model": "nova-3"
+    },
+    "id": {
+        "name": "Indonesian",
+        "native_name": "Bahasa Indonesia",
+        "flag": "🇮🇩",
+        "tts_voice": "id-ID-ArdiNeural",
+        "stt_supported": True,
+        "deepgram_code": "id",
+        "deepgram_model": "nova-3"
+    },
+    "th": {
+        "name": "Thai",
+        "native_name": "ไทย",
+        "flag": "🇹🇭",
+        "tts_voice": "th-TH-PremwadeeNeural",
+        "stt_supported": True,
+        "deepgram_code": "th",
+        "deepgram_model": "nova-2"  # Note: Thai only in Nova-2
+    },
+    "vi": {
+        "name": "Vietnamese",
+        "native_name": "Tiếng Việt",
+        "flag": "🇻🇳",
+        "tts_voice": "vi-VN-HoaiMyNeural",
+        "stt_supported": True,
+        "deepgram_code": "vi",
+        "deepgram_model": "nova-3"
+    },
+    
+    # === South Asian Languages ===
+    "hi": {
+        "name": "Hindi",
+        "native_name": "हिन्दी",
+        "flag": "🇮🇳",
+        "tts_voice": "hi-IN-SwaraNeural",
+        "stt_supported": True,
+        "deepgram_code": "hi",
+        "deepgram_model": "nova-3"
+    },
+    "ta": {
+        "name": "Tamil",
+        "native_name": "தமிழ்",
+        "flag": "🇮🇳",
+        "tts_voice": "ta-IN-PallaviNeural",
+        "stt_supported": False,  # NOT in Deepgram docs
+        "deepgram_code": None,
+        "deepgram_model": None
+    },
+    "ur": {
+        "name": "Urdu",
+        "native_name": "اردو",
+        "flag": "🇵🇰",
+        "tts_voice": "ur-PK-UzmaNeural",
+        "stt_supported": False,  # NOT in Deepgram docs
+        "deepgram_code": None,
+        "deepgram_model": None
+    },
+    
+    # === Middle Eastern Languages ===
+    "ar": {
+        "name": "Arabic",
+        "native_name": "العربية",
+        "flag": "🇸🇦",
+        "tts_voice": "ar-SA-ZariyahNeural",
+        "stt_supported": False,  # NOT in Deepgram Nova-3 docs
+        "deepgram_code": None,
+        "deepgram_model": None
+    },
+    "tr": {
+        "name": "Turkish",
+        "native_name": "Türkçe",
+        "flag": "🇹🇷",
+        "tts_voice": "tr-TR-EmelNeural",
+        "stt_supported": True,
+        "deepgram_code": "tr",
+        "deepgram_model": "nova-3"
+    },
+}
+
+# Alternative codes accepted on input
+ALIASES = {"zh": "zh-CN"}
+
+
+# ISO 639-1 -> ISO 639-2/T, the three-letter codes containers use for track languages
+_ISO_639_2 = {
+    "en": "eng", "es": "spa", "fr": "fra", "de": "deu", "pt": "por", "it": "ita", "nl": "nld",
+    "ru": "rus", "pl": "pol", "sv": "swe", "no": "nor", "da": "dan", "fi": "fin", "et": "est",
+    "lv": "lav", "lt": "lit", "cs": "ces", "sk": "slk", "hu": "hun", "bg": "bul", "ro": "ron",
+    "ca": "cat", "el": "ell", "uk": "ukr", "zh": "zho", "ja": "jpn", "ko": "kor", "ms": "msa",
+    "id": "ind", "th": "tha", "vi": "vie", "hi": "hin", "ta": "tam", "ur": "urd", "ar": "ara",
+    "tr": "tur",
+}
+
+# Scripts written without spaces between words (ISO 639-1)
+_UNSPACED = {"zh", "ja", "th"}
+
+
+@dataclass(frozen=True)
+class Language:
+    """One supported language"""
+    code: str
+    name: str
+    native_name: str
+    flag: str
+    tts_voice: str
+    stt_supported: bool
+    deepgram_code: Optional[str]
+    deepgram_model: Optional[str]
+
+    @property
+    def whisper_code(self) -> str:
+        """Whisper uses bare ISO 639-1 codes (zh, not zh-CN)"""
+        return self.code.split("-")[0]
+
+    @property
+    def iso639_2(self) -> str:
+        """Three-letter code for container track metadata ("und" if unknown)"""
+        return _ISO_639_2.get(self.whisper_code, "und")
+
+    @property
+    def word_separator(self) -> str:
+        """What goes between sentences when joining text: nothing for Chinese, Japanese and Thai"""
+        return "" if self.whisper_code in _UNSPACED else " "
+
+
+class LanguageRegistry:
+    """Read-only language table with the lookups the services need
+
+    Built once at import; every index is precomputed so services share
+    it instead of re-filtering the metadata per call or per instance.
+    """
+
+    def __init__(self, data: Mapping[str, Mapping], aliases: Mapping[str, str] = None):
+        languages = [
+            Language(
+                code=code,
+                name=info["name"],
+                native_name=info["native_name"],
+                flag=info["flag"],
+                tts_voice=info["tts_voice"],
+                stt_supported=info.get("stt_supported", False),
+                deepgram_code=info.get("deepgram_code"),
+                deepgram_model=info.get("deepgram_model"),
+            )
+            for code, info in data.items()
+        ]
+        self.all: Tuple[Language, ...] = tuple(languages)
+        self.by_code: Mapping[str, Language] = MappingProxyType({lang.code: lang for lang in languages})
+        self.stt: Tuple[Language, ...] = tuple(lang for lang in languages if lang.stt_supported)
+        self.translation_only: Tuple[Language, ...] = tuple(lang for lang in languages if not lang.stt_supported)
+        self.by_deepgram_code: Mapping[str, Language] = MappingProxyType({
+            lang.deepgram_code: lang for lang in self.stt if lang.deepgram_code
+        })
+        self.by_whisper_code: Mapping[str, Language] = MappingProxyType({
+            lang.whisper_code: lang for lang in self.stt
+        })
+        self.by_voice: Mapping[str, Language] = MappingProxyType({lang.tts_voice: lang for lang in languages})
+        self.voices: Mapping[str, str] = MappingProxyType({lang.code: lang.tts_voice for lang in languages})
+        self.aliases: Mapping[str, str] = MappingProxyType(dict(aliases or {}))
+
+    def get(self, code: str) -> Optional[Language]:
+        """Language by our code or an alias"""
+        return self.by_code.get(self.aliases.get(code, code))
+
+    def normalize(self, code: str) -> str:
+        """Our code as a plain str (zh -> zh-CN, LanguageCode -> value); unknown codes pass through"""
+        lang = self.get(code)
+        return lang.code if lang else code
+
+    def __contains__(self, code: str) -> bool:
+        return code in self.by_code
+
+    def __len__(self) -> int:
+        return len(self.all)
+
+
+LANGUAGES = LanguageRegistry(_LANGUAGE_DATA, ALIASES)
+
+# Read-only views of the metadata dicts, for callers of the dict API
+SUPPORTED_LANGUAGES: Mapping[str, Mapping] = MappingProxyType({
+    code: MappingProxyType(info) for code, info in _LANGUAGE_DATA.items()
+})
+_STT_LANGUAGES = MappingProxyType({lang.code: SUPPORTED_LANGUAGES[lang.code] for lang in LANGUAGES.stt})
+_TRANSLATION_ONLY_LANGUAGES = MappingProxyType({
+    lang.code: SUPPORTED_LANGUAGES[lang.code] for lang in LANGUAGES.translation_only
+})
+
+
+# Helper function to get language info
+def get_language_info(lang_code: str) -> Mapping:
+    """Get language information by code"""
+    return SUPPORTED_LANGUAGES.get(lang_code, SUPPORTED_LANGUAGES["en"])
+
+# Helper function to validate language
+def is_language_supported(lang_code: str) -> bool:
+    """Check if language is supported"""
+    return lang_code in LANGUAGES
+
+def get_stt_supported_languages() -> Mapping:
+    """Get only languages with STT support (precomputed, read-only)"""
+    return _STT_LANGUAGES
+
+def get_translation_only_languages() -> Mapping:
+    """Get languages that only support translation (no STT; precomputed, read-only)"""
+    return _TRANSLATION_ONLY_LANGUAGES
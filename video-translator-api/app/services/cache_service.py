@@ -0,0 +1,221 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from app.utils.metrics import count_lookup
+
+logger = logging.getLogger(__name__)
+
+
+def content_key(*parts) -> str:
+    """Stable cache key from the inputs that determine a stage's output"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def text_hash(text: str) -> str:
+    """SHA-256 of a text, used to key stages on their text input"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def link_or_copy(src: str, dst: str):
+    """Hard-link src to dst (zero-copy on the same filesystem), else copy"""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+class PipelineCache:
+    """Content-addressed on-disk cache for pipeline stage outputs
+
+    Entries live under <cache_dir>/<stage>/<key><suffix>. Total size is
+    bounded; the least recently used entries are evicted first. Every
+    lookup is counted per stage so hit rates can be reported.
+    """
+
+    STAGES = ("audio", "transcript", "translation", "tts", "video")
+
+    def __init__(self, cache_dir: str = None, max_size_mb: int = None):
+        """
+        Args:
+            cache_dir: Cache root (env PIPELINE_CACHE_DIR, default /tmp/cache)
+            max_size_mb: Size bound in MB (env PIPELINE_CACHE_MB, default 1024; 0 disables)
+        """
+        self.cache_dir = Path(cache_dir or os.getenv("PIPELINE_CACHE_DIR", "/tmp/cache"))
+        if max_size_mb is None:
+            max_size_mb = int(os.getenv("PIPELINE_CACHE_MB", "1024"))
+        self.max_size = max_size_mb * 1024 * 1024
+        self.enabled = self.max_size > 0
+
+        self.hits = {stage: 0 for stage in self.STAGES}
+        self.misses = {stage: 0 for stage in self.STAGES}
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # path -> size, LRU first
+        self._size = 0
+
+        if self.enabled:
+            for stage in self.STAGES:
+                (self.cache_dir / stage).mkdir(parents=True, exist_ok=True)
+            self._load_index()
+
+    def get_file(self, stage: str, key: str, suffix: str, count: bool = True) -> Optional[str]:
+        """
+        Return the cached file path for a key, or None
+
+        count=False leaves the lookup out of the hit/miss counters, for
+        entries made of several files that are counted once (see record).
+        """
+        if not self.enabled:
+            return None
+
+        path = str(self._path(stage, key, suffix))
+        with self._lock:
+            # Touched under the lock: eviction (also under it) can't remove the file in between
+            hit = path in self._entries
+            if hit:
+                try:
+                    os.utime(path)
+                except FileNotFoundError:
+                    hit = False
+            if hit:
+                self._entries.move_to_end(path)
+            else:
+                self._forget(path)
+        if count:
+            self.record(stage, hit)
+        return path if hit else None
+
+    def put_file(self, stage: str, key: str, suffix: str, src_path: str) -> Optional[str]:
+        """Store a copy of src_path under the key and return the cached path"""
+        if not self.enabled:
+            return None
+
+        path = self._path(stage, key, suffix)
+        tmp_path = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+        try:
+            link_or_copy(src_path, str(tmp_path))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.error(f"Cache write failed ({stage}): {e}")
+            if tmp_path.exists():
+                tmp_path.unlink()
+            return None
+
+        self._add(str(path), path.stat().st_size)
+        return str(path)
+
+    def record(self, stage: str, hit: bool):
+        """Count one lookup of a stage"""
+        with self._lock:
+            if hit:
+                self.hits[stage] += 1
+            else:
+                self.misses[stage] += 1
+        count_lookup(f"pipeline_{stage}", hit)
+
+    def get_json(self, stage: str, key: str, count: bool = True):
+        """Return a cached JSON value, or None"""
+        path = self.get_file(stage, key, ".json", count)
+        if path is None:
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put_json(self, stage: str, key: str, value):
+        """Store a JSON-serializable value under the key"""
+        if not self.enabled:
+            return
+
+        path = self._path(stage, key, ".json")
+        tmp_path = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(value, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.error(f"Cache write failed ({stage}): {e}")
+            if tmp_path.exists():
+                tmp_path.unlink()
+            return
+
+        self._add(str(path), path.stat().st_size)
+
+    def get_json_many(self, stage: str, keys: List[str]) -> list:
+        """Cached JSON values for several keys (None where missing)"""
+        return [self.get_json(stage, key) for key in keys]
+
+    def put_json_many(self, stage: str, values: Dict[str, object]):
+        """Store several JSON values, keyed"""
+        for key, value in values.items():
+            self.put_json(stage, key, value)
+
+    def stats(self) -> dict:
+        """Hit/miss counters per stage and current size"""
+        return {
+            "enabled": self.enabled,
+            "size_bytes": self._size,
+            "max_size_bytes": self.max_size,
+            "entries": len(self._entries),
+            "stages": {
+                stage: {
+                    "hits": self.hits[stage],
+                    "misses": self.misses[stage],
+                }
+                for stage in self.STAGES
+            }
+        }
+
+    def _path(self, stage: str, key: str, suffix: str) -> Path:
+        return self.cache_dir / stage / f"{key}{suffix}"
+
+    def _add(self, path: str, size: int):
+        with self._lock:
+            self._forget(path)
+            self._entries[path] = size
+            self._size += size
+            self._evict()
+
+    def _forget(self, path: str):
+        size = self._entries.pop(path, None)
+        if size is not None:
+            self._size -= size
+
+    def _evict(self):
+        """Drop least recently used entries until under the size bound"""
+        while self._size > self.max_size and self._entries:
+            path, size = self._entries.popitem(last=False)
+            self._size -= size
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _load_index(self):
+        """Rebuild the LRU index from disk, oldest access first"""
+        found = []
+        for stage in self.STAGES:
+            for entry in (self.cache_dir / stage).iterdir():
+                if entry.name.startswith("."):
+                    entry.unlink(missing_ok=True)  # Interrupted write
+                    continue
+                stat = entry.stat()
+                found.append((stat.st_mtime, str(entry), stat.st_size))
+
+        for _, path, size in sorted(found):
+            self._entries[path] = size
+            self._size += size
+        self._evict()
@@ -0,0 +1,37 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class ClipFit:
+    """How one dub clip is fitted to the speech it replaces
+
+    target is the length of the source speech, limit the longest the
+    clip may last (until the next segment starts, or the video ends).
+    A clip between target and limit is left alone: running a little into
+    a pause sounds better than speeding up.
+    """
+    duration: float
+    target: float
+    limit: float
+
+    def rate(self, max_tempo: float, max_rate: float) -> float:
+        """
+        Edge-TTS speaking rate to synthesize the clip again at, 1.0 to keep it
+
+        Only clips that atempo can't fit within max_tempo are synthesized
+        again; the voice sounds more natural sped up by the engine than
+        stretched by a filter, but it costs another request.
+        """
+        if max_rate <= 1.0 or self.limit <= 0 or self.duration <= self.limit * max_tempo:
+            return 1.0
+        return round(min(self.duration / self.limit, max_rate), 2)
+
+    def tempo(self, min_tempo: float, max_tempo: float) -> float:
+        """atempo factor for the mix pass: faster to end within limit, slower (a little) to fill target"""
+        if self.duration <= 0:
+            return 1.0
+        if self.limit > 0 and self.duration > self.limit:
+            return round(min(self.duration / self.limit, max_tempo), 4)
+        if self.target > 0 and self.duration < self.target:
+            return round(max(self.duration / self.target, min_tempo), 4)
+        return 1.0
@@ -0,0 +1,169 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Optional
+
+from app.services.pipeline_service import PipelineResult
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue cannot accept more work"""
+
+
+@dataclass
+class Job:
+    """A queued video translation job"""
+    job_id: str
+    video_path: str
+    target_lang: str
+    content_hash: Optional[str] = None
+    status: str = "queued"  # queued → processing → completed | failed
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+    result: Optional[PipelineResult] = None
+    error: Optional[str] = None
+
+
+class JobService:
+    """In-process job queue with a bounded pool of pipeline workers"""
+
+    def __init__(
+        self,
+        runner: Callable[[str, str, Optional[str]], Awaitable[PipelineResult]],
+        cleanup: Callable[[str], None],
+        workers: int = None,
+        max_queue_size: int = None,
+        max_finished_jobs: int = None
+    ):
+        """
+        Args:
+            runner: Coroutine function (video_path, target_lang, content_hash) -> PipelineResult
+            cleanup: Called with a file path once the job no longer needs it
+            workers: Number of concurrent pipeline runs (env JOB_WORKERS)
+            max_queue_size: Queued jobs before submits are rejected (env JOB_QUEUE_SIZE)
+            max_finished_jobs: Finished jobs kept for polling (env JOB_HISTORY_SIZE)
+        """
+        self.runner = runner
+        self.cleanup = cleanup
+        self.workers = workers or int(os.getenv("JOB_WORKERS", "2"))
+        self.max_queue_size = max_queue_size or int(os.getenv("JOB_QUEUE_SIZE", "100"))
+        self.max_finished_jobs = max_finished_jobs or int(os.getenv("JOB_HISTORY_SIZE", "500"))
+
+        self.jobs: Dict[str, Job] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks = []
+
+    def start(self):
+        """Start worker tasks on the running event loop (idempotent)"""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._tasks = [
+            asyncio.create_task(self._worker(i)) for i in range(self.workers)
+        ]
+        logger.info(f"Job service started ({self.workers} workers)")
+
+    async def stop(self):
+        """Cancel workers; queued jobs are marked failed"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        for job in self.jobs.values():
+            if job.status in ("queued", "processing"):
+                self._fail(job, "Server shutting down")
+
+    def submit(self, video_path: str, target_lang: str, content_hash: str = None) -> Job:
+        """
+        Queue a saved video for translation
+
+        Args:
+            video_path: Path to the uploaded video (owned by the job from now on)
+            target_lang: Target language code
+            content_hash: SHA-256 of the video, enables the pipeline cache
+
+        Returns:
+            The queued Job
+
+        Raises:
+            QueueFullError: If the queue is at capacity
+        """
+        self.start()
+
+        job = Job(
+            job_id=uuid.uuid4().hex,
+            video_path=video_path,
+            target_lang=target_lang,
+            content_hash=content_hash
+        )
+        try:
+            self._queue.put_nowait(job.job_id)
+        except asyncio.QueueFull:
+            raise QueueFullError("Too many videos in the queue, please retry later")
+
+        self.jobs[job.job_id] = job
+        self._prune()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Look up a job by id"""
+        return self.jobs.get(job_id)
+
+    def queue_depth(self) -> int:
+        """Number of jobs waiting for a worker"""
+        return self._queue.qsize() if self._queue else 0
+
+    async def _worker(self, index: int):
+        while True:
+            job_id = await self._queue.get()
+            job = self.jobs.get(job_id)
+            try:
+                if job is not None:
+                    await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job):
+        job.status = "processing"
+        job.updated_at = time.time()
+
+        try:
+            job.result = await self.runner(job.video_path, job.target_lang, job.content_hash)
+            job.status = "completed"
+            job.updated_at = time.time()
+            logger.info(f"Job {job.job_id} completed")
+        except asyncio.CancelledError:
+            self._fail(job, "Job cancelled")
+            raise
+        except Exception as e:
+            self._fail(job, str(e))
+            logger.error(f"Job {job.job_id} failed: {e}")
+        finally:
+            self.cleanup(job.video_path)
+
+    def _fail(self, job: Job, error: str):
+        job.status = "failed"
+        job.error = error
+        job.updated_at = time.time()
+
+    def _prune(self):
+        """Forget the oldest finished jobs beyond the history limit"""
+        finished = [
+            job for job in self.jobs.values()
+            if job.status in ("completed", "failed")
+        ]
+        excess = len(finished) - self.max_finished_jobs
+        if excess <= 0:
+            return
+
+        finished.sort(key=lambda job: job.updated_at)
+        for job in finished[:excess]:
+            if job.result:
+                self.cleanup(job.result.output_file)
+            del self.jobs[job.job_id]
@@ -0,0 +1,155 @@
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from app.models.schemas import Segment
+from app.services.stt_backends import Transcription
+from app.utils.vad import SpeechMap
+
+
+@dataclass
+class Window:
+    """One piece of a long recording, transcribed on its own
+
+    speech holds the window's speech regions on the recording's timeline,
+    so its trimmed copy is what gets sent and speech.remap() puts the
+    returned segments straight back on that timeline. Segments whose
+    midpoint falls in [keep_from, keep_until) are kept when stitching;
+    windows cut inside speech overlap their neighbour and split the
+    overlap in the middle.
+    """
+    index: int
+    start: float
+    end: float
+    speech: SpeechMap
+    keep_from: float = 0.0
+    keep_until: float = float("inf")
+    overlaps_previous: bool = False
+
+
+def plan_windows(speech: SpeechMap, window_seconds: float, overlap: float) -> List[Window]:
+    """
+    Split a recording into windows of at most window_seconds, cut at silences
+
+    Each cut is placed in the middle of the last silence in the second
+    half of the window. Without one (continuous speech) the cut is made
+    at the limit and the next window starts `overlap` seconds earlier.
+    Windows without speech are skipped.
+    """
+    silences = [(start + end) / 2 for start, end in speech.silences()]
+    windows: List[Window] = []
+    start = 0.0
+    overlapped = False
+
+    while start < speech.duration:
+        limit = start + window_seconds
+        if limit >= speech.duration:
+            end = next_start = speech.duration
+        else:
+            cuts = [middle for middle in silences if start + window_seconds / 2 <= middle <= limit]
+            if cuts:
+                end = next_start = cuts[-1]
+            else:
+                end, next_start = limit, max(limit - overlap, start + window_seconds / 2)
+
+        regions = [
+            (max(region_start, start), min(region_end, end))
+            for region_start, region_end in speech.regions
+            if region_end > start and region_start < end
+        ]
+        if regions:
+            window = Window(
+                index=len(windows),
+                start=start,
+                end=end,
+                speech=SpeechMap(regions, end - start, speech.gap),
+                overlaps_previous=overlapped and bool(windows) and windows[-1].end > start,
+            )
+            if windows:
+                boundary = (start + windows[-1].end) / 2 if window.overlaps_previous else start
+                windows[-1].keep_until = window.keep_from = boundary
+            windows.append(window)
+
+        overlapped = next_start < end
+        start = next_start
+
+    if windows:
+        windows[0].keep_from = 0.0
+    return windows
+
+
+def stitch(windows: List[Window], results: List[Transcription]) -> List[Segment]:
+    """
+    Join window transcripts into one segment list on the recording's timeline
+
+    Segments from an overlap are kept from one side only (by midpoint),
+    and words repeated across an overlapping seam are dropped from the
+    later window.
+    """
+    segments: List[Segment] = []
+    for window, result in zip(windows, results):
+        window_segments = result.segments
+        if not window_segments and result.text.strip():
+            window_segments = [Segment(start=window.speech.onset, end=window.speech.end, text=result.text.strip())]
+
+        kept = [
+            segment for segment in window_segments
+            if window.keep_from <= (segment.start + segment.end) / 2 < window.keep_until
+        ]
+        if kept and segments and window.overlaps_previous:
+            # The seam's segments can reach past each other; start after the previous one
+            previous, first = segments[-1], kept[0]
+            repeated = _repeated_words(previous.text, first.text)
+            text = " ".join(first.text.split()[repeated:])
+            start = max(first.start, previous.end)
+            if text:
+                kept[0] = first.model_copy(update={
+                    "text": text,
+                    "start": start,
+                    "end": max(first.end, start),
+                    "words": first.words[repeated:] if first.words else first.words
+                })
+            else:
+                kept.pop(0)
+        segments.extend(kept)
+    return segments
+
+
+def aggregate_language(windows: List[Window], results: List[Transcription]) -> Tuple[str, float]:
+    """
+    Language of the whole recording from per-window detections
+
+    Each window votes with its confidence times its seconds of speech.
+    The confidence returned is the winner's share of all speech, so a
+    recording that switches language reports a low confidence.
+    """
+    scores: Dict[str, float] = {}
+    total = 0.0
+    for window, result in zip(windows, results):
+        if not result.text.strip() and not result.segments:
+            continue
+        weight = window.speech.speech_seconds
+        scores[result.language] = scores.get(result.language, 0.0) + result.confidence * weight
+        total += weight
+
+    if not scores:
+        return (results[0].language if results else "en"), 0.0
+    language = max(scores, key=scores.get)
+    return language, round(scores[language] / total, 4)
+
+
+_WORD = re.compile(r"[^\w']+")
+
+# Longest word run checked for repetition across a seam
+MAX_REPEATED_WORDS = 12
+
+
+def _repeated_words(previous: str, text: str) -> int:
+    """How many leading words of text repeat the end of previous"""
+    before = [_WORD.sub("", word).lower() for word in previous.split()]
+    after = [_WORD.sub("", word).lower() for word in text.split()]
+
+    for count in range(min(len(before), len(after), MAX_REPEATED_WORDS), 0, -1):
+        if before[-count:] == after[:count]:
+            return count
+    return 0
@@ -0,0 +1,977 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
+
+from app.models.languages import LANGUAGES
+from app.models.schemas import Segment
+from app.services.cache_service import PipelineCache, content_key, text_hash, link_or_copy
+from app.services.dub_fit import ClipFit
+from app.services.stt_backends import Transcription
+from app.services.video_service import PCM_BYTES_PER_SECOND, STREAM_CHUNK_SIZE
+from app.utils.metrics import (
+    BYTES_PROCESSED, DUB_CLIPS_FITTED, PIPELINE_RUNS, STT_AUDIO_SECONDS, observe_stage, time_stage
+)
+from app.utils.subtitles import SUBTITLE_FORMATS, build_cues, write_subtitles
+from app.utils.timing import StageTimer
+from app.utils.vad import SpeechMap
+
+logger = logging.getLogger(__name__)
+
+
+class NoSpeechError(Exception):
+    """Raised when the uploaded video has no usable speech"""
+
+
+@dataclass
+class PipelineResult:
+    """Output of one video translation run"""
+    output_file: str
+    original_text: str
+    translated_text: str
+    detected_lang: str
+    confidence: float
+    segments: Optional[List[Segment]] = None  # Translated segments (aligned mode)
+    timings: Optional[Dict[str, dict]] = None  # Stage spans (streaming mode, see StageTimer)
+
+
+@dataclass
+class SourceTranscript:
+    """Transcription of the source video, shared by all targets"""
+    text: str
+    lang: str
+    confidence: float
+    segments: Optional[List[Segment]] = None
+    duration: float = 0.0
+    speech: Optional[SpeechMap] = None  # VAD regions of the extracted audio
+
+
+class PipelineService:
+    """Full pipeline: Video → Transcribe → Translate → TTS → New Video"""
+
+    def __init__(self, stt_service, translation_service, tts_service, video_service, file_handler, executor,
+                 cache: Optional[PipelineCache] = None, align_segments: bool = None,
+                 audio_pipe: bool = None, audio_format: str = None, stream_window: float = None,
+                 audio_mix: str = None, duck_db: float = None, min_tempo: float = None,
+                 max_tempo: float = None, max_rate: float = None):
+        """
+        Args:
+            stt_service: STTService, or an object with detect_speech(audio_path),
+                transcribe(audio_path, speech) -> (text, lang, confidence) and, for aligned mode,
+                transcribe_segments(audio_path, speech) -> (segments, lang, confidence);
+                piped mode uses transcribe_stream / transcribe_segments_stream(chunks, audio_format)
+            translation_service: Object with translate(text, source_lang, target_lang)
+                and translate_batch(texts, source_lang, target_lang)
+            tts_service: Object with async generate_speech_batch(text, language, output_path, rate)
+            video_service: VideoService (FFmpeg operations)
+            file_handler: FileHandler (temp paths and cleanup)
+            executor: TaskExecutor that runs the blocking calls off the event loop
+            cache: Optional PipelineCache for stage outputs (used when a content hash is given)
+            align_segments: Translate and dub per segment, placed at the source timings
+                (env ALIGN_SEGMENTS, default true)
+            audio_pipe: Pipe FFmpeg's audio straight into STT instead of writing a WAV
+                (env AUDIO_PIPE, default false)
+            audio_format: Piped audio format: wav, flac or opus (env STT_AUDIO_FORMAT, default wav)
+            stream_window: Seconds of audio per transcription window in run_streaming
+                (env STREAM_WINDOW_SECONDS, default 30)
+            audio_mix: "replace" drops the original audio; "duck" keeps it under the dub,
+                turned down wherever there is speech (env AUDIO_MIX, default replace)
+            duck_db: Ducking depth in dB for audio_mix="duck" (env DUCK_DB, default -15)
+            min_tempo: Largest slow-down of a dub shorter than the speech it replaces
+                (env MIN_DUB_TEMPO, default 0.9; 1 disables)
+            max_tempo: Largest atempo speed-up of a dub longer than its slot (env MAX_DUB_TEMPO, default 1.5)
+            max_rate: Largest Edge-TTS speaking rate a clip atempo can't fit is synthesized
+                again at (env TTS_MAX_RATE, default 1.5; 1 disables)
+        """
+        self.stt = stt_service
+        self.translator = translation_service
+        self.tts = tts_service
+        self.video = video_service
+        self.files = file_handler
+        self.executor = executor
+        self.cache = cache
+        if align_segments is None:
+            align_segments = os.getenv("ALIGN_SEGMENTS", "true").lower() == "true"
+        self.align_segments = align_segments
+        if audio_pipe is None:
+            audio_pipe = os.getenv("AUDIO_PIPE", "false").lower() == "true"
+        self.audio_pipe = audio_pipe
+        self.audio_format = audio_format or os.getenv("STT_AUDIO_FORMAT", "wav")
+        self.stream_window = stream_window or float(os.getenv("STREAM_WINDOW_SECONDS", "30"))
+        self.audio_mix = audio_mix or os.getenv("AUDIO_MIX", "replace").lower()
+        if self.audio_mix not in ("replace", "duck"):
+            raise ValueError(f"Unsupported audio mix: {self.audio_mix}")
+        self.duck_db = duck_db if duck_db is not None else float(os.getenv("DUCK_DB", "-15"))
+        self.duck_fade = int(os.getenv("DUCK_FADE_MS", "250")) / 1000
+        self.min_tempo = min_tempo or float(os.getenv("MIN_DUB_TEMPO", "0.9"))
+        self.max_tempo = max_tempo or float(os.getenv("MAX_DUB_TEMPO", "1.5"))
+        self.max_rate = max_rate or float(os.getenv("TTS_MAX_RATE", "1.5"))
+
+    async def run(self, video_path: str, target_lang: str, content_hash: str = None) -> PipelineResult:
+        """
+        Translate a saved video into the target language
+
+        Intermediate audio files are always cleaned up; the input video is
+        left for the caller to remove. With a content hash and a cache,
+        every stage is looked up first: a repeat request returns the cached
+        video and a new target language for a known video starts at
+        translation.
+
+        Args:
+            video_path: Path to the uploaded video
+            target_lang: Target language code
+            content_hash: SHA-256 of the uploaded video (enables caching)
+
+        Returns:
+            PipelineResult with the path of the translated video
+        """
+        results = await self.run_many(video_path, [target_lang], content_hash)
+        result = results[target_lang]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def run_many(self, video_path: str, target_langs: List[str], content_hash: str = None) -> Dict[str, Union[PipelineResult, Exception]]:
+        """
+        Translate a saved video into several languages
+
+        Audio is extracted and transcribed once; translation, TTS and the
+        merge then run concurrently per target. Merges are bounded by the
+        executor's FFmpeg pool.
+
+        Args:
+            video_path: Path to the uploaded video
+            target_langs: Target language codes
+            content_hash: SHA-256 of the uploaded video (enables caching)
+
+        Returns:
+            Dict of target language -> PipelineResult, or the Exception that target failed with
+
+        Raises:
+            NoSpeechError: If the video has no usable speech (affects every target)
+        """
+        temp_files = []
+        cache = self.cache if content_hash else None
+        target_langs = list(dict.fromkeys(target_langs))  # De-duplicate, keep order
+
+        results = {}
+        try:
+            logger.info(f"Video translation pipeline → {', '.join(target_langs)}")
+
+            # Exact repeats: serve cached videos
+            for target_lang in target_langs:
+                output_video_path = self.files.get_output_path("translated_video", ".mp4")
+                cached = await self._cached_result(
+                    cache, self._video_key(content_hash, target_lang), output_video_path
+                )
+                if cached:
+                    logger.info(f"Cache hit: translated video ({target_lang})")
+                    PIPELINE_RUNS.labels(target_lang, "cached").inc()
+                    results[target_lang] = cached
+
+            pending = [lang for lang in target_langs if lang not in results]
+            if not pending:
+                return results
+
+            # Steps 1-2: Extract audio and transcribe (STT), once for all targets
+            try:
+                source = await self._source_transcript(cache, content_hash, video_path, temp_files)
+            except Exception:
+                for target_lang in pending:
+                    PIPELINE_RUNS.labels(target_lang, "failed").inc()
+                raise
+
+            # Steps 3-5 per target, concurrently
+            outcomes = await asyncio.gather(*[
+                self._translate_target(cache, content_hash, video_path, target_lang, source)
+                for target_lang in pending
+            ], return_exceptions=True)
+
+            for target_lang, outcome in zip(pending, outcomes):
+                if isinstance(outcome, Exception):
+                    logger.error(f"Translation to {target_lang} failed: {outcome}")
+                PIPELINE_RUNS.labels(target_lang, "failed" if isinstance(outcome, Exception) else "completed").inc()
+                results[target_lang] = outcome
+
+            logger.info("Translation complete")
+
+            return results
+
+        except BaseException:
+            # The caller gets no results to clean up: drop the cached videos already linked
+            self.files.cleanup_files(*[
+                result.output_file for result in results.values()
+                if isinstance(result, PipelineResult)
+            ])
+            raise
+
+        finally:
+            self.files.cleanup_files(*temp_files)
+
+    async def run_subtitles(self, video_path: str, target_lang: str, content_hash: str = None,
+                            subtitle_format: str = "srt", embed: bool = False) -> PipelineResult:
+        """
+        Translate a saved video into subtitles instead of a dub
+
+        Stops after translation: the translated segments are cut into
+        cues, timed from the source word timings (see subtitles.build_cues),
+        and written as SRT or WebVTT. With embed the file is added to a
+        copy of the video as a soft subtitle track, without re-encoding.
+        There is no TTS and no audio mix; the transcript and translations
+        share the dubbing pipeline's cache.
+
+        Args:
+            video_path: Path to the uploaded video
+            target_lang: Target language code
+            content_hash: SHA-256 of the uploaded video (enables caching)
+            subtitle_format: srt or vtt
+            embed: Return the video (.mp4) with a subtitle track instead of the subtitle file
+
+        Returns:
+            PipelineResult with the subtitle file or the subtitled video
+
+        Raises:
+            NoSpeechError: If the video has no usable speech
+        """
+        if subtitle_format not in SUBTITLE_FORMATS:
+            raise ValueError(f"Unsupported subtitle format: {subtitle_format}")
+
+        temp_files = []
+        cache = self.cache if content_hash else None
+        subtitle_path = self.files.get_output_path("subtitles", f".{subtitle_format}")
+        output_path = self.files.get_output_path("subtitled_video", ".mp4") if embed else subtitle_path
+        if embed:
+            temp_files.append(subtitle_path)
+
+        try:
+            logger.info(f"Subtitle pipeline → {target_lang}")
+
+            # Steps 1-2: Extract audio and transcribe into segments
+            source = await self._source_transcript(cache, content_hash, video_path, temp_files, aligned=True)
+
+            # Step 3: Translate
+            translated_segments = await self._translate_segments(cache, target_lang, source)
+
+            # Step 4: Subtitles instead of speech
+            logger.info(f"Step 4: Writing {subtitle_format} subtitles ({target_lang})...")
+            with time_stage("subtitles", source.lang, target_lang):
+                cues = build_cues(translated_segments)
+                await self.executor.run_io(write_subtitles, cues, subtitle_format, subtitle_path)
+
+            if embed:
+                logger.info(f"Step 5: Adding the subtitle track ({target_lang})...")
+                language = LANGUAGES.get(target_lang)
+                with time_stage("merge", source.lang, target_lang):
+                    await self.executor.run_ffmpeg(
+                        self.video.add_subtitles, video_path, subtitle_path, output_path,
+                        language.iso639_2 if language else None
+                    )
+            BYTES_PROCESSED.labels("output").inc(os.path.getsize(output_path))
+
+        except BaseException:
+            PIPELINE_RUNS.labels(target_lang, "failed").inc()
+            self.files.cleanup_file(output_path)
+            raise
+
+        finally:
+            self.files.cleanup_files(*temp_files)
+
+        PIPELINE_RUNS.labels(target_lang, "completed").inc()
+        logger.info(f"Subtitles complete: {len(cues)} cues")
+
+        return PipelineResult(
+            output_file=output_path,
+            original_text=source.text,
+            translated_text=" ".join(segment.text for segment in translated_segments),
+            detected_lang=source.lang,
+            confidence=source.confidence,
+            segments=translated_segments
+        )
+
+    async def run_streaming(self, chunks: AsyncIterator[bytes], file_ext: str, target_lang: str) -> PipelineResult:
+        """
+        Translate a video while it is still being uploaded
+
+        The stages overlap instead of running one after another: the upload
+        is saved and fed to FFmpeg at the same time, decoded audio is cut
+        into windows that are transcribed as soon as they are complete, and
+        each window's segments are translated and synthesized right away.
+        Only the dub track and the final merge wait for the whole upload.
+        Inputs FFmpeg can't decode from a pipe (MP4 with the index at the
+        end) fall back to decoding the saved file once it is complete.
+
+        The saved upload is removed when done. Results are cached under the
+        upload's hash, so a repeat through run() is served from the cache.
+
+        Args:
+            chunks: Async iterator of the video's bytes (e.g. request.stream())
+            file_ext: File extension of the video, including the dot
+            target_lang: Target language code
+
+        Returns:
+            PipelineResult with per-stage timings
+
+        Raises:
+            NoSpeechError: If the video has no usable speech
+            UploadTooLargeError: If the upload exceeds the size limit
+        """
+        timer = StageTimer()
+        window_bytes = int(self.stream_window * PCM_BYTES_PER_SECOND)
+        upload_queue: asyncio.Queue = asyncio.Queue()
+        windows: List[asyncio.Task] = []
+        language = asyncio.get_running_loop().create_future()  # Set by the first window
+        temp_files = []
+        upload = None
+        output_video_path = self.files.get_output_path("translated_video", ".mp4")
+
+        async def tee():
+            """Pass upload chunks to the file writer and the FFmpeg feeder"""
+            start = time.perf_counter()
+            try:
+                async for chunk in chunks:
+                    upload_queue.put_nowait(chunk)
+                    yield chunk
+            finally:
+                upload_queue.put_nowait(None)
+                timer.record("save", start, time.perf_counter())
+
+        async def feed(process):
+            """Write upload chunks to FFmpeg's stdin"""
+            broken = False
+            while (chunk := await upload_queue.get()) is not None:
+                if broken:
+                    continue  # Keep draining so the queue doesn't grow
+                try:
+                    process.stdin.write(chunk)
+                    await process.stdin.drain()
+                except (BrokenPipeError, ConnectionResetError):
+                    broken = True  # FFmpeg gave up on the stream
+            if not broken:
+                process.stdin.close()
+
+        async def read_windows(process) -> int:
+            """Cut FFmpeg's PCM output into windows and start transcribing each one"""
+            start = time.perf_counter()
+            buffer = bytearray()
+            total = 0
+            while True:
+                chunk = await process.stdout.read(STREAM_CHUNK_SIZE)
+                buffer += chunk
+                while len(buffer) >= window_bytes or (not chunk and buffer):
+                    pcm = bytes(buffer[:window_bytes])
+                    del buffer[:window_bytes]
+                    windows.append(asyncio.create_task(
+                        dub_window(len(windows), pcm, total / PCM_BYTES_PER_SECOND)
+                    ))
+                    total += len(pcm)
+                if not chunk:
+                    break
+            stderr = (await process.stderr.read()).decode()
+            if await process.wait() != 0 and total:
+                raise Exception(f"Audio extraction failed: {stderr}")
+            timer.record("extract", start, time.perf_counter())
+            return total
+
+        async def dub_window(index: int, pcm: bytes, offset: float):
+            """Transcribe one window, then translate and synthesize its segments"""
+            # Later windows reuse the first window's language so segments agree
+            lang = await asyncio.shield(language) if index else None
+            try:
+                with timer.stage("vad"):
+                    pcm, speech = await self.executor.run_io(self._window_speech, pcm)
+                if speech and not speech.regions:
+                    result = Transcription(text="", language=lang or "", confidence=0.0)
+                else:
+                    with timer.stage("stt"):
+                        result = await self.executor.run_io(
+                            self.stt.transcribe_window, self.video.wav_bytes(pcm), "wav", offset, lang, speech
+                        )
+            except BaseException:
+                if index == 0:
+                    language.set_result(None)
+                raise
+            if index == 0:
+                # A silent first window can't tell the language; later ones detect their own
+                language.set_result(result.language if result.segments else None)
+            if not result.segments:
+                return result, []
+
+            with timer.stage("translate"):
+                translated = await self._translate_batch(
+                    self.cache, [segment.text for segment in result.segments],
+                    lang or result.language, target_lang
+                )
+            translated_segments = [
+                segment.model_copy(update={"text": text})
+                for segment, text in zip(result.segments, translated)
+            ]
+
+            async def synthesize(segment: Segment) -> str:
+                clip_path = self.files.get_output_path("translated_segment", ".mp3")
+                temp_files.append(clip_path)
+                with timer.stage("tts"):
+                    await self._synthesize(self.cache, segment.text, target_lang, clip_path)
+                return clip_path
+
+            clip_paths = await asyncio.gather(*[synthesize(segment) for segment in translated_segments])
+            return result, list(zip(translated_segments, clip_paths))
+
+        process = None
+        feeder = reader = None
+        try:
+            logger.info(f"Streaming video translation pipeline → {target_lang}")
+
+            # Steps 1-4 overlap: upload → decode → per-window STT → translate + TTS
+            process = await self.video.open_pcm_pipe()
+            feeder = asyncio.create_task(feed(process))
+            reader = asyncio.create_task(read_windows(process))
+            upload = await self.files.save_stream(tee(), file_ext, prefix="input_video")
+            await feeder
+            audio_bytes = await reader
+
+            if not audio_bytes:
+                logger.warning("Upload isn't streamable, decoding the saved file")
+                process = await self.video.open_pcm_pipe(upload.path)
+                audio_bytes = await read_windows(process)
+
+            outcomes = await asyncio.gather(*windows)
+
+            segments = [segment for result, _ in outcomes for segment in result.segments]
+            dubbed = [pair for _, pairs in outcomes for pair in pairs]
+            if not segments:
+                raise NoSpeechError(
+                    "No speech detected in the video. Please upload a video with spoken dialogue or narration."
+                )
+            first = next(result for result, _ in outcomes if result.segments)
+            source = SourceTranscript(
+                text=" ".join(segment.text for segment in segments),
+                lang=language.result() or first.language,
+                confidence=first.confidence,
+                segments=segments,
+                duration=audio_bytes / PCM_BYTES_PER_SECOND
+            )
+            logger.debug(f"Original text: {source.text}")
+
+            # Step 5: Place the clips and merge, once the whole upload is in
+            logger.info(f"Step 5: Creating final video ({target_lang})...")
+            translated_segments = [segment for segment, _ in dubbed]
+            clip_paths = [clip_path for _, clip_path in dubbed]
+            slots = [self._slot(translated_segments, i, source.duration) for i in range(len(dubbed))]
+            with timer.stage("fit"):
+                tempos = await self._fit_clips(
+                    self.cache, target_lang, [segment.text for segment in translated_segments], clip_paths,
+                    [segment.end - segment.start for segment in translated_segments], slots, temp_files
+                )
+            clips = [
+                (segment.start, slot, clip_path)
+                for segment, slot, clip_path in zip(translated_segments, slots, clip_paths)
+            ]
+            track_path = self.files.get_output_path("translated_audio", ".wav")
+            temp_files.append(track_path)
+            with timer.stage("mix"):
+                await self.executor.run_ffmpeg(
+                    self.video.build_dub_track, clips, track_path, tempos=tempos, duration=source.duration
+                )
+            with timer.stage("merge"):
+                await self.executor.run_ffmpeg(
+                    self.video.replace_audio, upload.path, track_path, output_video_path,
+                    **self._mix_options(source)
+                )
+            BYTES_PROCESSED.labels("output").inc(os.path.getsize(output_video_path))
+
+            result = PipelineResult(
+                output_file=output_video_path,
+                original_text=source.text,
+                translated_text=" ".join(segment.text for segment in translated_segments),
+                detected_lang=source.lang,
+                confidence=source.confidence,
+                segments=translated_segments,
+                timings=timer.report()
+            )
+            if self.cache:
+                await self._cache_transcript(self.cache, upload.sha256, source)
+                await self._cache_result(self.cache, upload.sha256, target_lang, result)
+
+            # Busy time per stage; the upload is already recorded by save_stream
+            for stage, span in result.timings.items():
+                if stage != "save":
+                    observe_stage(stage, span["busy"], source.lang, target_lang)
+            PIPELINE_RUNS.labels(target_lang, "completed").inc()
+            timer.log_report()
+            logger.info("Translation complete")
+
+            return result
+
+        except BaseException:
+            PIPELINE_RUNS.labels(target_lang, "failed").inc()
+            self.files.cleanup_file(output_video_path)
+            raise
+
+        finally:
+            for task in [feeder, reader, *windows]:
+                if task:
+                    task.cancel()
+            if process and process.returncode is None:
+                process.kill()
+                await process.wait()
+            if upload:
+                self.files.cleanup_file(upload.path)
+            self.files.cleanup_files(*temp_files)
+
+    def _window_speech(self, pcm: bytes) -> Tuple[bytes, Optional[SpeechMap]]:
+        """
+        VAD pre-pass for a streaming window
+
+        Returns:
+            (pcm, None) to send as is, (b"", empty map) for a silent window,
+            or (trimmed pcm, speech map) to send only the speech
+        """
+        vad = getattr(self.stt, "vad", None)
+        if not vad:
+            return pcm, None
+        speech = vad.detect_pcm(pcm)
+        if not speech.regions:
+            STT_AUDIO_SECONDS.labels("silence").inc(speech.duration)
+            return b"", speech
+        if not vad.worth_trimming(speech):
+            STT_AUDIO_SECONDS.labels("speech").inc(speech.duration)
+            return pcm, None
+        STT_AUDIO_SECONDS.labels("speech").inc(speech.speech_seconds)
+        STT_AUDIO_SECONDS.labels("silence").inc(speech.silence_seconds)
+        return vad.speech_pcm(pcm, speech), speech
+
+    async def _source_transcript(self, cache, content_hash: str, video_path: str, temp_files: list,
+                                 aligned: bool = None) -> SourceTranscript:
+        """Steps 1-2: transcript of the source video, from the cache when available
+
+        aligned (default: the align_segments setting) asks for time-stamped segments.
+        """
+        if aligned is None:
+            aligned = self.align_segments
+        transcript = await self.executor.run_io(cache.get_json, "transcript", content_hash) if cache else None
+        if transcript and (transcript.get("segments") or not aligned):
+            logger.info("Cache hit: transcript")
+            source = SourceTranscript(
+                text=transcript["text"],
+                lang=transcript["lang"],
+                confidence=transcript["confidence"],
+                speech=SpeechMap.from_dict(transcript["speech"]) if transcript.get("speech") else None
+            )
+            if aligned:
+                source.segments = [Segment(**segment) for segment in transcript["segments"]]
+        else:
+            if self.audio_pipe:
+                source = await self._transcribe_piped(video_path, aligned)
+            else:
+                audio_path = await self._extract_audio(cache, content_hash, video_path, temp_files)
+                source = await self._transcribe(audio_path, aligned)
+            if cache:
+                await self._cache_transcript(cache, content_hash, source)
+
+        source.duration = await self.executor.run_ffmpeg(self.video.get_video_duration, video_path)
+        return source
+
+    async def _cache_transcript(self, cache, content_hash: str, source: SourceTranscript):
+        await self.executor.run_io(cache.put_json, "transcript", content_hash, {
+            "text": source.text,
+            "lang": source.lang,
+            "confidence": source.confidence,
+            "segments": [segment.model_dump() for segment in source.segments or []],
+            "speech": source.speech.to_dict() if source.speech else None
+        })
+
+    async def _translate_target(self, cache, content_hash: str, video_path: str, target_lang: str,
+                                source: SourceTranscript) -> PipelineResult:
+        """Steps 3-5 for one target language"""
+        temp_files = []
+        output_video_path = self.files.get_output_path("translated_video", ".mp4")
+        translated_segments = None
+
+        try:
+            if source.segments:
+                translated_segments, new_audio_path = await self._dub_segments(
+                    cache, target_lang, source, temp_files
+                )
+                translated_text = " ".join(segment.text for segment in translated_segments)
+            else:
+                translated_text, new_audio_path = await self._dub_text(
+                    cache, target_lang, source, temp_files
+                )
+
+            # Step 5: Merge audio with video
+            logger.info(f"Step 5: Creating final video ({target_lang})...")
+            with time_stage("merge", source.lang, target_lang):
+                await self.executor.run_ffmpeg(
+                    self.video.replace_audio, video_path, new_audio_path, output_video_path,
+                    **self._mix_options(source)
+                )
+            BYTES_PROCESSED.labels("output").inc(os.path.getsize(output_video_path))
+
+        except BaseException:
+            self.files.cleanup_file(output_video_path)
+            raise
+
+        finally:
+            self.files.cleanup_files(*temp_files)
+
+        result = PipelineResult(
+            output_file=output_video_path,
+            original_text=source.text,
+            translated_text=translated_text,
+            detected_lang=source.lang,
+            confidence=source.confidence,
+            segments=translated_segments
+        )
+        if cache:
+            await self._cache_result(cache, content_hash, target_lang, result)
+        return result
+
+    async def _cache_result(self, cache, content_hash: str, target_lang: str, result: PipelineResult):
+        """Store a translated video and its texts for exact repeats"""
+        video_key = self._video_key(content_hash, target_lang)
+        await self.executor.run_io(cache.put_file, "video", video_key, ".mp4", result.output_file)
+        await self.executor.run_io(cache.put_json, "video", video_key, {
+            "original_text": result.original_text,
+            "translated_text": result.translated_text,
+            "detected_lang": result.detected_lang,
+            "confidence": result.confidence
+        })
+
+    def _video_key(self, content_hash: str, target_lang: str) -> str:
+        """Cache key of a translated video: the upload, the target and the settings that shape the output"""
+        return content_key(content_hash, target_lang, self._output_settings())
+
+    def _output_settings(self) -> str:
+        """Fingerprint of every setting that changes the output video for the same upload and target"""
+        settings = {
+            "align_segments": self.align_segments,
+            "audio_mix": self.audio_mix,
+            "min_tempo": self.min_tempo,
+            "max_tempo": self.max_tempo,
+            "max_rate": self.max_rate,
+        }
+        if self.audio_mix == "duck":
+            settings.update(duck_db=self.duck_db, duck_fade=self.duck_fade)
+        return json.dumps(settings, sort_keys=True)
+
+    def _mix_options(self, source: SourceTranscript) -> dict:
+        """replace_audio() arguments for the configured mix: where the original speech is, to duck"""
+        if self.audio_mix == "replace":
+            return {}
+        if source.segments:
+            regions = [(segment.start, segment.end) for segment in source.segments]
+        elif source.speech:
+            regions = list(source.speech.regions)
+        else:
+            regions = [(0.0, max(source.duration, 1e6))]  # Speech unknown: duck throughout
+        return {"duck_regions": regions, "duck_db": self.duck_db, "duck_fade": self.duck_fade}
+
+    async def _dub_text(self, cache, target_lang: str, source: SourceTranscript, temp_files: list):
+        """Steps 3-4, whole transcript: (translated_text, speech_path)"""
+        # Step 3: Translate
+        logger.info(f"Step 3: Translating text ({target_lang})...")
+        with time_stage("translate", source.lang, target_lang):
+            translated_text = await self._translate(cache, source.text, source.lang, target_lang)
+        logger.debug(f"Translated text: {translated_text}")
+
+        # Step 4: Text-to-Speech
+        logger.info(f"Step 4: Generating speech ({target_lang})...")
+        new_audio_path = self.files.get_output_path("translated_audio", ".mp3")
+        temp_files.append(new_audio_path)
+        with time_stage("tts", source.lang, target_lang):
+            await self._synthesize(cache, translated_text, target_lang, new_audio_path)
+
+        # Fit the dub between where the speech starts (not under an intro) and the end of the video
+        onset = source.speech.onset if source.speech else 0.0
+        speech_seconds = (source.speech.end if source.speech else source.duration) - onset
+        clip_paths = [new_audio_path]
+        with time_stage("fit", source.lang, target_lang):
+            tempos = await self._fit_clips(
+                cache, target_lang, [translated_text], clip_paths, [speech_seconds],
+                [max(source.duration - onset, 0.0)], temp_files  # 0: video length unknown, no limit
+            )
+
+        # PCM track: the merge is the only lossy encode
+        track_path = self.files.get_output_path("translated_audio", ".wav")
+        temp_files.append(track_path)
+        with time_stage("mix", source.lang, target_lang):
+            await self.executor.run_ffmpeg(
+                self.video.build_dub_track, [(onset, 0.0, clip_paths[0])], track_path,
+                tempos=tempos, duration=source.duration
+            )
+
+        return translated_text, track_path
+
+    async def _translate_segments(self, cache, target_lang: str, source: SourceTranscript) -> List[Segment]:
+        """Step 3, per segment: the source segments with translated text (timings kept)"""
+        segments = source.segments
+        logger.info(f"Step 3: Translating {len(segments)} segments ({target_lang})...")
+        with time_stage("translate", source.lang, target_lang):
+            translated = await self._translate_batch(
+                cache, [segment.text for segment in segments], source.lang, target_lang
+            )
+        return [
+            segment.model_copy(update={"text": text})
+            for segment, text in zip(segments, translated)
+        ]
+
+    async def _dub_segments(self, cache, target_lang: str, source: SourceTranscript, temp_files: list):
+        """Steps 3-4, per segment: (translated_segments, dub_track_path)"""
+        # Step 3: Translate every segment
+        translated_segments = await self._translate_segments(cache, target_lang, source)
+
+        # Step 4: Synthesize every segment (the TTS service bounds concurrency),
+        # then place the clips on the timeline
+        logger.info(f"Step 4: Generating speech for {len(translated_segments)} segments ({target_lang})...")
+
+        async def synthesize(segment: Segment) -> str:
+            clip_path = self.files.get_output_path("translated_segment", ".mp3")
+            temp_files.append(clip_path)
+            await self._synthesize(cache, segment.text, target_lang, clip_path)
+            return clip_path
+
+        with time_stage("tts", source.lang, target_lang):
+            clip_paths = await asyncio.gather(*[
+                synthesize(segment) for segment in translated_segments
+            ])
+
+        # Fit every clip to its segment in one go: measure, re-synthesize the few atempo can't fit
+        clip_paths = list(clip_paths)
+        slots = [self._slot(translated_segments, i, source.duration) for i in range(len(translated_segments))]
+        with time_stage("fit", source.lang, target_lang):
+            tempos = await self._fit_clips(
+                cache, target_lang, [segment.text for segment in translated_segments], clip_paths,
+                [segment.end - segment.start for segment in translated_segments], slots, temp_files
+            )
+
+        clips = [
+            (segment.start, slot, clip_path)
+            for segment, slot, clip_path in zip(translated_segments, slots, clip_paths)
+        ]
+        track_path = self.files.get_output_path("translated_audio", ".wav")
+        temp_files.append(track_path)
+        with time_stage("mix", source.lang, target_lang):
+            await self.executor.run_ffmpeg(
+                self.video.build_dub_track, clips, track_path, tempos=tempos, duration=source.duration
+            )
+
+        return translated_segments, track_path
+
+    async def _fit_clips(self, cache, target_lang: str, texts: List[str], clip_paths: List[str],
+                         targets: List[float], limits: List[float], temp_files: list) -> List[float]:
+        """
+        Fitting stage: measure the dub clips once and decide how each is fitted
+
+        A clip that atempo can't fit within max_tempo is synthesized once
+        more at a faster Edge-TTS rate (its entry in clip_paths is
+        replaced). The rest of the difference is left to atempo, applied
+        by build_dub_track in the mix pass.
+
+        Args:
+            texts: Text of each clip
+            clip_paths: Synthesized clips, updated in place
+            targets: Seconds of source speech each clip replaces
+            limits: Seconds each clip may last at most (0: no limit)
+
+        Returns:
+            atempo factor per clip
+        """
+        durations = await asyncio.gather(*[
+            self.executor.run_ffmpeg(self.video.get_audio_duration, clip_path) for clip_path in clip_paths
+        ])
+        fits = [ClipFit(duration, target, limit) for duration, target, limit in zip(durations, targets, limits)]
+
+        async def resynthesize(i: int, rate: float):
+            clip_path = self.files.get_output_path("translated_segment", ".mp3")
+            temp_files.append(clip_path)
+            await self._synthesize(cache, texts[i], target_lang, clip_path, rate)
+            clip_paths[i] = clip_path
+            fits[i].duration = await self.executor.run_ffmpeg(self.video.get_audio_duration, clip_path)
+            DUB_CLIPS_FITTED.labels("rate").inc()
+
+        rates = [fit.rate(self.max_tempo, self.max_rate) for fit in fits]
+        if any(rate > 1.0 for rate in rates):
+            logger.info(f"Re-synthesizing {sum(rate > 1.0 for rate in rates)} clips at a faster rate")
+            await asyncio.gather(*[resynthesize(i, rate) for i, rate in enumerate(rates) if rate > 1.0])
+
+        tempos = [fit.tempo(self.min_tempo, self.max_tempo) for fit in fits]
+        for rate, tempo in zip(rates, tempos):
+            if rate == 1.0:
+                DUB_CLIPS_FITTED.labels("none" if tempo == 1.0 else "atempo").inc()
+        return tempos
+
+    @staticmethod
+    def _slot(segments: List[Segment], index: int, duration: float) -> float:
+        """Time a segment's dub may occupy: until the next segment starts (or the video ends)"""
+        segment = segments[index]
+        if index + 1 < len(segments):
+            end = segments[index + 1].start
+        else:
+            end = max(duration, segment.end)
+        return max(end - segment.start, segment.end - segment.start)
+
+    async def _translate(self, cache, text: str, source_lang: str, target_lang: str) -> str:
+        """Translate one text, from the cache when available"""
+        translation_key = content_key(text_hash(text), source_lang, target_lang)
+        translated_text = await self.executor.run_io(cache.get_json, "translation", translation_key) if cache else None
+        if translated_text is None:
+            translated_text = await self.executor.run_io(
+                self.translator.translate,
+                text=text,
+                source_lang=source_lang,
+                target_lang=target_lang
+            )
+            if cache:
+                await self.executor.run_io(cache.put_json, "translation", translation_key, translated_text)
+        return translated_text
+
+    async def _translate_batch(self, cache, texts: List[str], source_lang: str, target_lang: str) -> List[str]:
+        """Translate several texts in one batch call, skipping cached ones"""
+        keys = [content_key(text_hash(text), source_lang, target_lang) for text in texts]
+        if cache:
+            translated = await self.executor.run_io(cache.get_json_many, "translation", keys)
+        else:
+            translated = [None] * len(keys)
+
+        missing = [i for i, text in enumerate(translated) if text is None]
+        if missing:
+            results = await self.executor.run_io(
+                self.translator.translate_batch,
+                [texts[i] for i in missing],
+                source_lang,
+                target_lang
+            )
+            for i, text in zip(missing, results):
+                translated[i] = text
+            if cache:
+                await self.executor.run_io(
+                    cache.put_json_many, "translation", {keys[i]: translated[i] for i in missing}
+                )
+        return translated
+
+    async def _synthesize(self, cache, text: str, language: str, output_path: str, rate: float = 1.0):
+        """Synthesize one text to output_path, from the cache when available"""
+        tts_key = content_key(text_hash(text), language)
+        if rate != 1.0:
+            tts_key = content_key(text_hash(text), language, rate)
+        if await self._checkout(cache, "tts", tts_key, ".mp3", output_path):
+            logger.info("Cache hit: speech")
+            return
+        await self.tts.generate_speech_batch(text, language, output_path, rate=rate)
+        if cache:
+            await self.executor.run_io(cache.put_file, "tts", tts_key, ".mp3", output_path)
+
+    async def _cached_result(self, cache, video_key: str, output_video_path: str) -> Optional[PipelineResult]:
+        """Copy a cached translated video to the output path"""
+        if not cache:
+            return None
+
+        # One lookup of the video stage: the texts and the file are counted together
+        meta = await self.executor.run_io(cache.get_json, "video", video_key, False)
+        if not meta:
+            cache.record("video", False)
+            return None
+        if not await self._checkout(cache, "video", video_key, ".mp4", output_video_path):
+            return None
+
+        return PipelineResult(output_file=output_video_path, **meta)
+
+    async def _checkout(self, cache, stage: str, key: str, suffix: str, dst: str) -> bool:
+        """
+        Link a cached file to a private path so eviction can't remove it mid-run
+
+        Returns:
+            True on a cache hit
+        """
+        if not cache:
+            return False
+
+        cached = await self.executor.run_io(cache.get_file, stage, key, suffix)
+        if not cached:
+            return False
+
+        try:
+            await self.executor.run_io(link_or_copy, cached, dst)
+            return True
+        except OSError:
+            return False  # Evicted between lookup and link
+
+    async def _extract_audio(self, cache, content_hash: str, video_path: str, temp_files: list) -> str:
+        """Step 1: extracted audio, from the cache when available"""
+        logger.info("Step 1: Extracting audio...")
+        audio_path = self.files.get_output_path("extracted_audio", ".wav")
+        temp_files.append(audio_path)
+        if await self._checkout(cache, "audio", content_hash, ".wav", audio_path):
+            logger.info("Cache hit: extracted audio")
+            return audio_path
+
+        with time_stage("extract"):
+            await self.executor.run_ffmpeg(self.video.extract_audio, video_path, audio_path)
+        BYTES_PROCESSED.labels("audio").inc(os.path.getsize(audio_path))
+        if cache:
+            await self.executor.run_io(cache.put_file, "audio", content_hash, ".wav", audio_path)
+        return audio_path
+
+    async def _transcribe(self, audio_path: str, aligned: bool) -> SourceTranscript:
+        """Step 2: transcript of the extracted audio (silent audio fails before the STT call)"""
+        logger.info("Step 2: Transcribing audio...")
+        with time_stage("vad"):
+            speech = await self.executor.run_io(self.stt.detect_speech, audio_path)
+        source = await self._run_stt(aligned, self.stt.transcribe_segments, self.stt.transcribe, audio_path, speech)
+        source.speech = speech
+        return source
+
+    async def _transcribe_piped(self, video_path: str, aligned: bool) -> SourceTranscript:
+        """Steps 1-2 in one pass: FFmpeg's stdout is streamed into the STT request"""
+        logger.info(f"Steps 1-2: Piping {self.audio_format} audio into transcription...")
+        chunks = self.video.stream_audio(video_path, self.audio_format)
+        return await self._run_stt(
+            aligned, self.stt.transcribe_segments_stream, self.stt.transcribe_stream, chunks, self.audio_format
+        )
+
+    async def _run_stt(self, aligned: bool, transcribe_segments, transcribe, *args) -> SourceTranscript:
+        """Call the segment or plain-text STT method, mapping no-speech errors"""
+        start = time.perf_counter()
+        try:
+            if aligned:
+                segments, detected_lang, confidence = await self.executor.run_io(
+                    transcribe_segments, *args
+                )
+                original_text = " ".join(segment.text for segment in segments)
+            else:
+                segments = None
+                original_text, detected_lang, confidence = await self.executor.run_io(
+                    transcribe, *args
+                )
+            logger.debug(f"Original text: {original_text}")
+            # Piped mode includes the extraction it overlaps with
+            observe_stage("stt", time.perf_counter() - start, source_lang=detected_lang)
+
+            # Warn about mixed languages
+            if confidence < 0.7:
+                logger.warning("Possible mixed language video - translation may be inaccurate")
+
+            return SourceTranscript(
+                text=original_text,
+                lang=detected_lang,
+                confidence=confidence,
+                segments=segments
+            )
+
+        except Exception as e:
+            # Check if it's a "no speech" error
+            error_msg = str(e)
+            if "No speech detected" in error_msg or "empty transcript" in error_msg.lower():
+                raise NoSpeechError(
+                    "No speech detected in the video. Please upload a video with spoken dialogue or narration."
+                )
+            raise  # Re-raise other errors
+
+    @staticmethod
+    def output_filename(video_path: str) -> str:
+        """Download filename for a translated video"""
+        return f"translated_{Path(video_path).name}"
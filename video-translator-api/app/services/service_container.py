@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import os
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceContainer:
+    """Builds, warms and shuts down the provider-backed services
+
+    At startup (see start_background()) every service is constructed in the io pool
+    and then warmed: services with a warm() method get to open
+    connections, load models or probe their provider before the first
+    request. get() also builds on demand, under a lock so concurrent
+    first requests can't construct duplicates; that path is used when
+    the app runs without its lifespan (in-process benchmarks) and to
+    retry a service that failed at startup.
+
+    Service states: not_loaded → loading → ready | degraded (built, but
+    warm-up failed) | failed (construction failed, retried on next get()).
+    """
+
+    def __init__(self, factories: Dict[str, Callable[[], Any]], warmup: bool = None,
+                 warmup_timeout: float = None):
+        """
+        Args:
+            factories: Service name -> zero-argument constructor
+            warmup: Call each service's warm() at startup (env SERVICE_WARMUP, default true)
+            warmup_timeout: Seconds allowed per warm-up (env SERVICE_WARMUP_TIMEOUT, default 30)
+        """
+        self.factories = factories
+        if warmup is None:
+            warmup = os.getenv("SERVICE_WARMUP", "true").lower() == "true"
+        self.warmup = warmup
+        self.warmup_timeout = warmup_timeout or float(os.getenv("SERVICE_WARMUP_TIMEOUT", "30"))
+
+        self.starting = False
+        self._services: Dict[str, Any] = {}
+        self._states: Dict[str, str] = {name: "not_loaded" for name in factories}
+        self._errors: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str):
+        """The service instance, built now if it isn't yet"""
+        service = self._services.get(name)
+        if service is not None:
+            return service
+
+        with self._lock:
+            service = self._services.get(name)
+            if service is None:
+                self._states[name] = "loading"
+                try:
+                    service = self.factories[name]()
+                except Exception as e:
+                    self._states[name] = "failed"
+                    self._errors[name] = str(e)
+                    raise
+                self._services[name] = service
+                self._states[name] = "ready"
+                self._errors.pop(name, None)
+        return service
+
+    def loaded(self, name: str) -> Optional[Any]:
+        """The service if it has been built, without building it"""
+        return self._services.get(name)
+
+    def set(self, name: str, service):
+        """Use a prebuilt instance (e.g. a fake in benchmarks)"""
+        with self._lock:
+            self._services[name] = service
+            self._states[name] = "ready"
+            self._errors.pop(name, None)
+
+    def start_background(self, run_io: Callable[..., Awaitable]) -> asyncio.Task:
+        """
+        Run start() as a task on the running loop, so the server accepts
+        connections (and /health reports "starting") while services warm
+
+        starting is set before the task first runs, so no request can see
+        the container idle in between. Requests that arrive meanwhile
+        build the service they need through get().
+
+        Args:
+            run_io: Runs a blocking call off the event loop (TaskExecutor.run_io)
+
+        Returns:
+            The startup task (cancel it on shutdown)
+        """
+        self.starting = True
+        return asyncio.create_task(self.start(run_io))
+
+    async def start(self, run_io: Callable[..., Awaitable]):
+        """
+        Build and warm every service concurrently
+
+        Failures are logged and reported by status(); the app still
+        starts so the services that did load can serve requests.
+
+        Args:
+            run_io: Runs a blocking call off the event loop (TaskExecutor.run_io)
+        """
+        self.starting = True
+        try:
+            await asyncio.gather(*[self._start_one(name, run_io) for name in self.factories])
+        finally:
+            self.starting = False
+
+    async def _start_one(self, name: str, run_io: Callable[..., Awaitable]):
+        try:
+            service = await run_io(self.get, name)
+        except Exception as e:
+            logger.error(f"Service '{name}' failed to start: {e}")
+            return
+
+        warm = getattr(service, "warm", None)
+        if not self.warmup or warm is None:
+            return
+
+        try:
+            if asyncio.iscoroutinefunction(warm):
+                await asyncio.wait_for(warm(), self.warmup_timeout)
+            else:
+                await asyncio.wait_for(run_io(warm), self.warmup_timeout)
+            logger.info(f"Service '{name}' warmed up")
+        except Exception as e:
+            error = str(e) or type(e).__name__  # Timeouts have no message
+            self._states[name] = "degraded"
+            self._errors[name] = f"Warm-up failed: {error}"
+            logger.warning(f"Service '{name}' warm-up failed: {error}")
+
+    async def stop(self, run_io: Callable[..., Awaitable]):
+        """Close every built service that has a close() method"""
+        for name, service in list(self._services.items()):
+            close = getattr(service, "close", None)
+            if close is None:
+                continue
+            try:
+                if asyncio.iscoroutinefunction(close):
+                    await close()
+                else:
+                    await run_io(close)
+            except Exception as e:
+                logger.error(f"Service '{name}' failed to close: {e}")
+        with self._lock:
+            self._services.clear()
+            self._states = {name: "not_loaded" for name in self.factories}
+
+    def status(self) -> Dict[str, str]:
+        """Service name -> state"""
+        return dict(self._states)
+
+    def errors(self) -> Dict[str, str]:
+        """Service name -> last construction or warm-up error"""
+        return dict(self._errors)
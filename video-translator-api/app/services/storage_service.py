@@ -0,0 +1,232 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Iterable, List, Tuple
+
+from app.utils.metrics import STORAGE_BYTES, STORAGE_EVICTIONS, STORAGE_REJECTIONS
+
+logger = logging.getLogger(__name__)
+
+
+class InsufficientStorageError(Exception):
+    """Raised when a new job would not fit in the temp-file quota"""
+
+
+class StorageManager:
+    """Disk budget for the upload and output directories
+
+    Three kinds of files live there:
+    - pinned: owned by a running or queued job, never removed here
+    - finished outputs (track()): kept for download, expire output_ttl
+      after the last access and are evicted least recently used first
+      when the quota is exceeded
+    - everything else: removed by the pipeline or after the response is
+      sent; whatever is left (crashes, aborted downloads) is removed once
+      it is orphan_ttl old
+
+    sweep() applies the TTLs and the quota; run the janitor() task to do
+    it periodically. admit() is the admission check for new work.
+    """
+
+    def __init__(self, dirs: Iterable, quota_mb: int = None, reserve_mb: int = None, min_free_mb: int = None,
+                 output_ttl: float = None, orphan_ttl: float = None, interval: float = None):
+        """
+        Args:
+            dirs: Directories to manage (upload and output)
+            quota_mb: Total size allowed across dirs (env STORAGE_QUOTA_MB, default 2048; 0 disables)
+            reserve_mb: Space a new job needs to be admitted (env STORAGE_JOB_RESERVE_MB, default 300)
+            min_free_mb: Free space to keep on the filesystem (env STORAGE_MIN_FREE_MB, default 256)
+            output_ttl: Seconds a finished output is kept after its last access (env OUTPUT_TTL_SECONDS, default 3600)
+            orphan_ttl: Age at which untracked files are removed (env ORPHAN_TTL_SECONDS, default 21600)
+            interval: Seconds between janitor sweeps (env JANITOR_INTERVAL_SECONDS, default 60)
+        """
+        self.dirs = [Path(d) for d in dirs]
+        if quota_mb is None:
+            quota_mb = int(os.getenv("STORAGE_QUOTA_MB", "2048"))
+        self.quota = quota_mb * 1024 * 1024
+        if reserve_mb is None:
+            reserve_mb = int(os.getenv("STORAGE_JOB_RESERVE_MB", "300"))
+        self.reserve = reserve_mb * 1024 * 1024
+        if min_free_mb is None:
+            min_free_mb = int(os.getenv("STORAGE_MIN_FREE_MB", "256"))
+        self.min_free = min_free_mb * 1024 * 1024
+        self.output_ttl = output_ttl or float(os.getenv("OUTPUT_TTL_SECONDS", "3600"))
+        self.orphan_ttl = orphan_ttl or float(os.getenv("ORPHAN_TTL_SECONDS", "21600"))
+        self.interval = interval or float(os.getenv("JANITOR_INTERVAL_SECONDS", "60"))
+
+        self._lock = threading.Lock()
+        self._pinned: Dict[str, int] = {}  # path -> pin count
+        self._outputs: Dict[str, float] = {}  # path -> last access (time.time())
+        self._used = 0
+
+        for directory in self.dirs:
+            directory.mkdir(parents=True, exist_ok=True)
+        STORAGE_BYTES.set_function(lambda: self._used)
+
+    def pin(self, path: str):
+        """Protect a file from the janitor until unpin()"""
+        with self._lock:
+            self._pinned[path] = self._pinned.get(path, 0) + 1
+
+    def unpin(self, path: str):
+        with self._lock:
+            count = self._pinned.pop(path, 0) - 1
+            if count > 0:
+                self._pinned[path] = count
+
+    def track(self, path: str):
+        """Register a finished output kept for later download"""
+        with self._lock:
+            self._outputs[path] = time.time()
+
+    def touch(self, path: str):
+        """Mark a tracked output as just accessed (LRU, TTL)"""
+        with self._lock:
+            if path in self._outputs:
+                self._outputs[path] = time.time()
+
+    def forget(self, path: str):
+        """Stop tracking a file (it was deleted by its owner)"""
+        with self._lock:
+            self._outputs.pop(path, None)
+            self._pinned.pop(path, None)
+
+    def admit(self):
+        """
+        Check that a new job fits, evicting finished outputs if needed
+
+        Raises:
+            InsufficientStorageError: If the quota or the filesystem can't fit reserve_mb more
+        """
+        files = self._scan()
+        self._used = sum(size for _, size, _ in files)
+        if self._fits():
+            return
+
+        self._evict_lru(files, target=self.quota - self.reserve)
+        if self._fits():
+            return
+
+        STORAGE_REJECTIONS.inc()
+        raise InsufficientStorageError("Server storage is full, please retry later")
+
+    def sweep(self) -> dict:
+        """Remove expired outputs and orphans, then enforce the quota"""
+        now = time.time()
+        files = self._scan()
+        removed = {"ttl": 0, "orphan": 0, "quota": 0}
+        kept = []
+
+        with self._lock:
+            pinned = set(self._pinned)
+            outputs = dict(self._outputs)
+
+        for path, size, mtime in files:
+            if path in pinned:
+                kept.append((path, size, mtime))
+            elif path in outputs and now - outputs[path] > self.output_ttl:
+                removed["ttl"] += self._remove(path, "ttl")
+            elif path not in outputs and now - mtime > self.orphan_ttl:
+                removed["orphan"] += self._remove(path, "orphan")
+            else:
+                kept.append((path, size, mtime))
+
+        with self._lock:
+            for path in list(self._outputs):
+                if not os.path.exists(path):
+                    del self._outputs[path]
+
+        self._used = sum(size for _, size, _ in kept)
+        if self.quota and self._used > self.quota:
+            removed["quota"] = self._evict_lru(kept, target=self.quota)
+
+        if any(removed.values()):
+            logger.info(f"Storage sweep removed {removed}, {self._used // (1024 * 1024)} MB in use")
+        return removed
+
+    async def janitor(self, run_io: Callable[..., Awaitable]):
+        """Sweep every interval until cancelled (run as a background task)
+
+        Args:
+            run_io: Runs a blocking call off the event loop (TaskExecutor.run_io)
+        """
+        while True:
+            try:
+                await run_io(self.sweep)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Storage sweep failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> dict:
+        return {
+            "used_bytes": self._used,
+            "quota_bytes": self.quota,
+            "free_bytes": self._free_bytes(),
+            "tracked_outputs": len(self._outputs),
+            "pinned": len(self._pinned),
+        }
+
+    def _fits(self) -> bool:
+        if self.quota and self._used + self.reserve > self.quota:
+            return False
+        free = self._free_bytes()
+        return free is None or free - self.reserve >= self.min_free
+
+    def _free_bytes(self):
+        if not hasattr(os, "statvfs") or not self.dirs:
+            return None
+        stat = os.statvfs(self.dirs[0])
+        return stat.f_bavail * stat.f_frsize
+
+    def _evict_lru(self, files: List[Tuple[str, int, float]], target: int) -> int:
+        """Remove tracked outputs, least recently accessed first, until used <= target"""
+        with self._lock:
+            candidates = sorted(
+                (last_access, path) for path, last_access in self._outputs.items()
+                if path not in self._pinned
+            )
+        sizes = {path: size for path, size, _ in files}
+
+        removed = 0
+        for _, path in candidates:
+            if self._used <= target:
+                break
+            if self._remove(path, "quota"):
+                self._used -= sizes.get(path, 0)
+                removed += 1
+        return removed
+
+    def _remove(self, path: str, reason: str) -> int:
+        self.forget(path)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return 0
+        except OSError as e:
+            logger.error(f"Storage cleanup error: {e}")
+            return 0
+        STORAGE_EVICTIONS.labels(reason).inc()
+        logger.debug(f"Evicted ({reason}): {path}")
+        return 1
+
+    def _scan(self) -> List[Tuple[str, int, float]]:
+        """(path, size, mtime) of every file in the managed dirs"""
+        files = []
+        for directory in self.dirs:
+            try:
+                entries = list(os.scandir(directory))
+            except FileNotFoundError:
+                continue
+            for entry in entries:
+                try:
+                    if entry.is_file():
+                        stat = entry.stat()
+                        files.append((entry.path, stat.st_size, stat.st_mtime))
+                except FileNotFoundError:
+                    pass  # Removed while scanning
+        return files
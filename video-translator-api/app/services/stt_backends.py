@@ -0,0 +1,380 @@
+import io
+import logging
+import os
+import tempfile
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+from app.models.languages import LANGUAGES
+from app.models.schemas import Segment, Word
+from app.utils.http_pool import HTTPPool, shared_pool
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Transcription:
+    """Raw result of one STT backend call"""
+    text: str
+    language: str  # Our language code (en, zh-CN, ...)
+    confidence: float
+    segments: List[Segment] = field(default_factory=list)
+
+
+class STTBackend:
+    """A speech-to-text engine used by STTService
+
+    Implementations may be called from several threads at once.
+    """
+
+    name = "base"
+
+    def warm(self):
+        """Prepare for the first request (open connections, load models); optional"""
+
+    def transcribe(self, audio_path: str, language: Optional[str] = None) -> Transcription:
+        """
+        Transcribe an audio file
+
+        Args:
+            audio_path: Path to audio file (16 kHz mono WAV from VideoService)
+            language: Our language code to force, or None to auto-detect
+
+        Returns:
+            Transcription with time-stamped segments
+        """
+        raise NotImplementedError
+
+    def transcribe_stream(self, chunks: Iterable[bytes], audio_format: str,
+                          language: Optional[str] = None) -> Transcription:
+        """
+        Transcribe audio arriving as a byte stream (piped FFmpeg output)
+
+        The default spools the stream to a temporary file for backends
+        that can only read paths.
+
+        Args:
+            chunks: Encoded audio bytes (wav, flac or opus in ogg)
+            audio_format: Format of the stream, used as the file suffix
+            language: Our language code to force, or None to auto-detect
+
+        Returns:
+            Transcription with time-stamped segments
+        """
+        suffix = ".ogg" if audio_format == "opus" else f".{audio_format}"
+        with tempfile.NamedTemporaryFile(suffix=suffix) as spool:
+            for chunk in chunks:
+                spool.write(chunk)
+            spool.flush()
+            return self.transcribe(spool.name, language=language)
+
+
+# Audio format (file suffix or piped format) -> Content-Type of the upload
+AUDIO_CONTENT_TYPES = {
+    "wav": "audio/wav",
+    "flac": "audio/flac",
+    "opus": "audio/ogg",
+    "ogg": "audio/ogg",
+    "mp3": "audio/mpeg",
+    "m4a": "audio/mp4",
+    "mp4": "audio/mp4",
+    "webm": "audio/webm",
+}
+
+
+class DeepgramBackend(STTBackend):
+    """Deepgram prerecorded API (needs DEEPGRAM_API_KEY)
+
+    Requests go straight to the REST API over the worker's shared HTTP
+    pool (the SDK opens a new connection for every call), so keep-alive
+    connections and the TLS session are reused across transcriptions.
+    """
+
+    name = "deepgram"
+
+    API_URL = "https://api.deepgram.com"
+
+    def __init__(self, api_key: str = None, http_pool: HTTPPool = None, timeout: float = None):
+        """
+        Args:
+            api_key: Deepgram key (env DEEPGRAM_API_KEY)
+            http_pool: Shared connection pool (default: the worker's pool)
+            timeout: Read timeout per request in seconds, long audio uploads
+                slowly (env DEEPGRAM_TIMEOUT, default 600)
+        """
+        self.api_key = api_key or os.getenv("DEEPGRAM_API_KEY")
+        if not self.api_key:
+            raise ValueError("DEEPGRAM_API_KEY environment variable not set")
+
+        self.http = http_pool or shared_pool()
+        self.timeout = timeout or float(os.getenv("DEEPGRAM_TIMEOUT", "600"))
+        self.headers = {"Authorization": f"Token {self.api_key}", "Accept": "application/json"}
+
+        logger.info("Deepgram STT backend initialized")
+        logger.info(f"Loaded {len(LANGUAGES.by_deepgram_code)} STT languages")
+
+    @staticmethod
+    def _deepgram_code(language: Optional[str]) -> str:
+        lang = LANGUAGES.get(language) if language else None
+        return lang.deepgram_code if lang and lang.deepgram_code else "en"
+
+    @staticmethod
+    def _our_code(deepgram_code: str) -> str:
+        lang = LANGUAGES.by_deepgram_code.get(deepgram_code)
+        return lang.code if lang else "en"
+
+    def warm(self):
+        """
+        Open a pooled connection to the API host and check the key
+
+        Listing projects needs a key with project scope; a key limited to
+        transcription gets 403 there, which still proves the key exists,
+        so only 401 counts as a rejected key.
+        """
+        response = self.http.client.get(f"{self.API_URL}/v1/projects", headers=self.headers)
+        if response.status_code == 401:
+            raise ValueError("Deepgram rejected DEEPGRAM_API_KEY")
+        if response.status_code == 403:
+            logger.info("Deepgram key has no project scope; connection warmed")
+            return
+        response.raise_for_status()
+
+    def transcribe(self, audio_path: str, language: Optional[str] = None) -> Transcription:
+        # Stream the file handle as the request body: httpx reads it in
+        # chunks, so memory stays flat regardless of audio length
+        with open(audio_path, "rb") as audio_file:
+            return self._transcribe_body(audio_file, Path(audio_path).suffix.lstrip("."), language)
+
+    def transcribe_stream(self, chunks: Iterable[bytes], audio_format: str,
+                          language: Optional[str] = None) -> Transcription:
+        # Sent with chunked transfer encoding
+        return self._transcribe_body(chunks, audio_format, language)
+
+    def _transcribe_body(self, body, audio_format: str, language: Optional[str]) -> Transcription:
+        """Send a file handle or byte iterator to the prerecorded API"""
+        # Configure Deepgram options
+        params = {
+            "model": "nova-2",  # Best general model
+            "smart_format": "true",  # Auto punctuation and formatting
+            "utterances": "true",  # Time-stamped segments
+        }
+        if language:
+            params["language"] = self._deepgram_code(language)
+        else:
+            params["language"] = "multi"  # Auto-detect language
+            params["detect_language"] = "true"  # Return detected language
+
+        # Transcribe
+        content_type = AUDIO_CONTENT_TYPES.get(audio_format.lower(), "application/octet-stream")
+        response = self.http.client.post(
+            f"{self.API_URL}/v1/listen",
+            params=params,
+            headers={**self.headers, "Content-Type": content_type},
+            content=body,
+            timeout=self.http.timeout(self.timeout)
+        )
+        if response.status_code >= 400:
+            raise Exception(f"Deepgram returned {response.status_code}: {response.text[:200]}")
+        results = response.json()["results"]
+
+        # Extract text and language
+        channel = results["channels"][0]
+        alternative = channel["alternatives"][0]
+        transcript = alternative.get("transcript") or ""
+        detected_lang = channel.get("detected_language") or self._deepgram_code(language)
+
+        # Get language confidence
+        confidence = channel.get("language_confidence") or 1.0
+
+        segments = [
+            Segment(
+                start=utterance["start"],
+                end=utterance["end"],
+                text=utterance["transcript"].strip(),
+                speaker=utterance.get("speaker"),
+                words=[
+                    Word(start=word["start"], end=word["end"], text=word.get("punctuated_word") or word["word"])
+                    for word in utterance.get("words") or []
+                ] or None
+            )
+            for utterance in (results.get("utterances") or [])
+            if utterance.get("transcript") and utterance["transcript"].strip()
+        ]
+
+        # No utterances returned: fall back to one segment spanning the words
+        if not segments and transcript.strip():
+            words = alternative.get("words") or []
+            segments = [Segment(
+                start=words[0]["start"] if words else 0.0,
+                end=words[-1]["end"] if words else 0.0,
+                text=transcript.strip()
+            )]
+
+        logger.info(f"Language: {detected_lang} (confidence: {confidence:.2f})")
+
+        return Transcription(
+            text=transcript.strip(),
+            language=language or self._our_code(detected_lang),
+            confidence=confidence,
+            segments=segments
+        )
+
+
+# Loaded faster-whisper models, shared by every backend instance in this worker
+_whisper_models: Dict[tuple, object] = {}
+_whisper_lock = threading.Lock()
+
+
+def load_whisper_model(model_size: str, device: str, compute_type: str):
+    """Load a faster-whisper model once per process"""
+    key = (model_size, device, compute_type)
+    with _whisper_lock:
+        model = _whisper_models.get(key)
+        if model is None:
+            try:
+                from faster_whisper import WhisperModel
+            except ImportError:
+                raise ValueError("Local STT needs the faster-whisper package")
+
+            logger.info(f"Loading Whisper model '{model_size}' ({device}, {compute_type})...")
+            model = _whisper_models[key] = WhisperModel(
+                model_size,
+                device=device,
+                compute_type=compute_type,
+                cpu_threads=int(os.getenv("WHISPER_CPU_THREADS", "0")),
+            )
+            logger.info(f"Whisper model '{model_size}' loaded")
+        return model
+
+
+class WhisperBackend(STTBackend):
+    """Local faster-whisper inference (CPU, int8 by default)"""
+
+    name = "whisper"
+
+    def __init__(self, model_size: str = None, device: str = None, compute_type: str = None,
+                 batch_size: int = None):
+        """
+        Args:
+            model_size: Whisper model (env WHISPER_MODEL, default base)
+            device: cpu or cuda (env WHISPER_DEVICE, default cpu)
+            compute_type: Quantization (env WHISPER_COMPUTE_TYPE, default int8)
+            batch_size: 30-second windows decoded per batch (env WHISPER_BATCH_SIZE, default 8)
+        """
+        self.model_size = model_size or os.getenv("WHISPER_MODEL", "base")
+        self.device = device or os.getenv("WHISPER_DEVICE", "cpu")
+        self.compute_type = compute_type or os.getenv("WHISPER_COMPUTE_TYPE", "int8")
+        self.batch_size = batch_size or int(os.getenv("WHISPER_BATCH_SIZE", "8"))
+
+        self.model = load_whisper_model(self.model_size, self.device, self.compute_type)
+        self.pipeline = self._batched_pipeline(self.model)
+
+        logger.info("Whisper STT backend initialized")
+
+    def warm(self):
+        """Decode a second of silence so the first real request skips one-time setup"""
+        import numpy as np
+
+        segments, _ = self.model.transcribe(np.zeros(16000, dtype=np.float32), language="en")
+        list(segments)
+
+    @staticmethod
+    def _our_code(whisper_code: str) -> str:
+        lang = LANGUAGES.by_whisper_code.get(whisper_code)
+        return lang.code if lang else "en"
+
+    @staticmethod
+    def _batched_pipeline(model):
+        """Batched window decoding when the installed faster-whisper supports it"""
+        try:
+            from faster_whisper import BatchedInferencePipeline
+        except ImportError:
+            return None
+        return BatchedInferencePipeline(model=model)
+
+    def transcribe(self, audio_path: str, language: Optional[str] = None) -> Transcription:
+        return self._transcribe_audio(audio_path, language)
+
+    def transcribe_stream(self, chunks: Iterable[bytes], audio_format: str,
+                          language: Optional[str] = None) -> Transcription:
+        # faster-whisper decodes file objects itself; the encoded stream is
+        # small next to the decoded samples it holds anyway
+        return self._transcribe_audio(io.BytesIO(b"".join(chunks)), language)
+
+    def _transcribe_audio(self, audio, language: Optional[str]) -> Transcription:
+        """Run the model on a path or binary file object"""
+        whisper_lang = language.split("-")[0] if language else None
+
+        if self.pipeline is not None:
+            segments_iter, info = self.pipeline.transcribe(
+                audio, language=whisper_lang, batch_size=self.batch_size
+            )
+        else:
+            segments_iter, info = self.model.transcribe(
+                audio, language=whisper_lang, vad_filter=True
+            )
+
+        segments = [
+            Segment(start=segment.start, end=segment.end, text=segment.text.strip())
+            for segment in segments_iter
+            if segment.text.strip()
+        ]
+
+        logger.info(f"Language: {info.language} (confidence: {info.language_probability:.2f})")
+
+        return Transcription(
+            text=" ".join(segment.text for segment in segments),
+            language=language or self._our_code(info.language),
+            confidence=info.language_probability if not language else 1.0,
+            segments=segments
+        )
+
+
+class StubBackend(STTBackend):
+    """Deterministic offline transcript for tests and benchmarks"""
+
+    name = "stub"
+
+    TEXT = "This is a stub transcript. It is used for offline testing."
+
+    def transcribe_stream(self, chunks: Iterable[bytes], audio_format: str,
+                          language: Optional[str] = None) -> Transcription:
+        for _ in chunks:  # Drain so the producer runs to completion
+            pass
+        return self.transcribe("", language=language)
+
+    def transcribe(self, audio_path: str, language: Optional[str] = None) -> Transcription:
+        sentences = [sentence.strip() + "." for sentence in self.TEXT.split(".") if sentence.strip()]
+        segments = [
+            Segment(start=i * 2.0, end=i * 2.0 + 1.5, text=sentence)
+            for i, sentence in enumerate(sentences)
+        ]
+        return Transcription(
+            text=" ".join(sentences),
+            language=language or "en",
+            confidence=1.0,
+            segments=segments
+        )
+
+
+# Backend name -> factory, selected with STT_BACKEND
+BACKENDS: Dict[str, Callable[[], STTBackend]] = {
+    "deepgram": DeepgramBackend,
+    "whisper": WhisperBackend,
+    "stub": StubBackend,
+}
+
+
+def register_backend(name: str, factory: Callable[[], STTBackend]):
+    """Make a backend selectable by name"""
+    BACKENDS[name] = factory
+
+
+def create_backend(name: str) -> STTBackend:
+    """Instantiate a registered backend"""
+    factory = BACKENDS.get(name)
+    if factory is None:
+        raise ValueError(f"Unknown STT backend: {name}")
+    return factory()
@@ -1,160 +1,377 @@
-from deepgram import DeepgramClient, PrerecordedOptions, FileSource
+import logging
 import os
-from typing import Tuple
-from app.models.schemas import SUPPORTED_LANGUAGES
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional, Tuple
+from app.models.schemas import Segment
+from app.services.long_form import Window, aggregate_language, plan_windows, stitch
+from app.services.stt_backends import STTBackend, Transcription, create_backend
+from app.utils.metrics import STT_AUDIO_SECONDS, track_call
+from app.utils.vad import SpeechMap, VoiceActivityDetector
+
+logger = logging.getLogger(__name__)
 
 class STTService:
-    """Speech-to-Text using Deepgram API"""
-    
-    def __init__(self):
-        """Initialize Deepgram client"""
-        self.api_key = os.getenv("DEEPGRAM_API_KEY")
-        
-        if not self.api_key:
-            raise ValueError("DEEPGRAM_API_KEY environment variable not set")
-        
-        self.client = DeepgramClient(self.api_key)
-        
-        # Build reverse mapping for detected languages
-        self.REVERSE_MAP = {}
-        for code, info in SUPPORTED_LANGUAGES.items():
-            if info.get("stt_supported"):
-                deepgram_code = info.get("deepgram_code")
-                if deepgram_code:
-                    self.REVERSE_MAP[deepgram_code] = code
-        
-        print("✓ Deepgram STT service initialized")
-        print(f"✓ Loaded {len(self.REVERSE_MAP)} STT languages")
-
-    def transcribe(self, audio_path: str) -> Tuple[str, str, float]:
+    """Speech-to-Text over a pluggable backend (Deepgram or local Whisper)"""
+
+    def __init__(self, backend: STTBackend = None, vad: VoiceActivityDetector = None,
+                 long_form_seconds: float = None, window_seconds: float = None, window_overlap: float = None,
+                 window_concurrency: int = None, window_retries: int = None):
+        """
+        Initialize STT backend
+
+        Args:
+            backend: Backend instance (default: built from env STT_BACKEND,
+                "deepgram", "whisper" or "stub"; default deepgram)
+            vad: Voice activity detector run on WAV input before it is sent,
+                or False to send audio as is (default: env VAD, default true)
+            long_form_seconds: WAV audio at least this long is transcribed in windows, cut
+                at pauses with VAD and at fixed lengths without (env STT_LONG_FORM_SECONDS,
+                default 900; 0 disables)
+            window_seconds: Longest window (env STT_WINDOW_SECONDS, default 300)
+            window_overlap: Overlap where a window has to be cut inside speech
+                (env STT_WINDOW_OVERLAP, default 2)
+            window_concurrency: Windows transcribed at once per worker (env STT_WINDOW_CONCURRENCY, default 4)
+            window_retries: Extra attempts per failed window (env STT_WINDOW_RETRIES, default 2)
+        """
+        self.backend = backend or create_backend(os.getenv("STT_BACKEND", "deepgram"))
+        if vad is None and os.getenv("VAD", "true").lower() == "true":
+            vad = VoiceActivityDetector()
+        self.vad = vad or None
+
+        if long_form_seconds is None:
+            long_form_seconds = float(os.getenv("STT_LONG_FORM_SECONDS", "900"))
+        self.long_form_seconds = long_form_seconds
+        self.window_seconds = window_seconds or float(os.getenv("STT_WINDOW_SECONDS", "300"))
+        self.window_overlap = window_overlap if window_overlap is not None else float(os.getenv("STT_WINDOW_OVERLAP", "2"))
+        self.window_concurrency = window_concurrency or int(os.getenv("STT_WINDOW_CONCURRENCY", "4"))
+        self.window_retries = window_retries if window_retries is not None else int(os.getenv("STT_WINDOW_RETRIES", "2"))
+        # Own pool: the callers already run on the shared io pool
+        self._window_pool = ThreadPoolExecutor(self.window_concurrency, thread_name_prefix="stt-window")
+
+        logger.info(f"STT service initialized ({self.backend.name})")
+
+    def warm(self):
+        """Let the backend connect or load its model before the first request"""
+        self.backend.warm()
+
+    def close(self):
+        """Stop the long-form window pool"""
+        self._window_pool.shutdown(wait=False, cancel_futures=True)
+
+    def detect_speech(self, audio_path: str) -> Optional[SpeechMap]:
+        """
+        Speech regions of a WAV file (the VAD pre-pass), without calling the backend
+
+        Returns:
+            SpeechMap, or None if VAD is off or the file isn't 16-bit PCM WAV
+        """
+        if not self.vad:
+            return None
+        speech = self.vad.detect_wav(audio_path)
+        if speech is not None:
+            logger.info(
+                f"VAD: {speech.speech_seconds:.1f}s of speech in {speech.duration:.1f}s "
+                f"({len(speech.regions)} regions)"
+            )
+        return speech
+
+    def transcribe(self, audio_path: str, speech: SpeechMap = None) -> Tuple[str, str, float]:
         """
         Transcribe audio file
-        
+
+        Args:
+            audio_path: Path to audio file
+            speech: Result of detect_speech(audio_path), if already run
+
+        Returns:
+            Tuple of (transcribed_text, detected_language, language_confidence)
+        """
+        result = self._transcribe_file(audio_path, speech)
+        return result.text, result.language, result.confidence
+
+    def transcribe_segments(self, audio_path: str, speech: SpeechMap = None) -> Tuple[List[Segment], str, float]:
+        """
+        Transcribe audio file into time-stamped segments
+
+        Segments come from the backend (Deepgram utterances, Whisper segments).
+
         Args:
             audio_path: Path to audio file
-            
+            speech: Result of detect_speech(audio_path), if already run
+
+        Returns:
+            Tuple of (segments, detected_language, language_confidence)
+        """
+        if speech is None:
+            speech = self.detect_speech(audio_path)
+        return self._segments(self._transcribe_file(audio_path, speech), speech)
+
+    def transcribe_stream(self, chunks: Iterable[bytes], audio_format: str) -> Tuple[str, str, float]:
+        """
+        Transcribe audio piped from FFmpeg, without an intermediate file
+
+        Args:
+            chunks: Encoded audio bytes (see VideoService.stream_audio)
+            audio_format: wav, flac or opus
+
+        Returns:
+            Tuple of (transcribed_text, detected_language, language_confidence)
+        """
+        result = self._transcribe_chunks(chunks, audio_format)
+        return result.text, result.language, result.confidence
+
+    def transcribe_segments_stream(self, chunks: Iterable[bytes], audio_format: str) -> Tuple[List[Segment], str, float]:
+        """
+        Transcribe piped audio into time-stamped segments
+
+        Args:
+            chunks: Encoded audio bytes (see VideoService.stream_audio)
+            audio_format: wav, flac or opus
+
+        Returns:
+            Tuple of (segments, detected_language, language_confidence)
+        """
+        return self._segments(self._transcribe_chunks(chunks, audio_format))
+
+    def transcribe_window(self, audio: bytes, audio_format: str, offset: float,
+                          language: str = None, speech: SpeechMap = None) -> Transcription:
+        """
+        Transcribe one window of a longer recording
+
+        Windows may be silent, so the transcript isn't validated here;
+        check the joined transcript instead. Segment times are shifted by
+        the window's offset.
+
+        Args:
+            audio: Encoded audio of the window
+            audio_format: wav, flac or opus
+            offset: Start of the window in the recording (seconds)
+            language: Our language code to force, or None to auto-detect
+            speech: Speech map of the window when `audio` is its trimmed copy
+
+        Returns:
+            Transcription with segments on the recording's timeline
+        """
+        try:
+            with track_call(self.backend.name, "transcribe"):
+                result = self.backend.transcribe_stream([audio], audio_format, language=language)
+        except Exception as e:
+            logger.error(f"{self.backend.name} STT Error: {e}")
+            raise Exception(f"Transcription failed: {str(e)}")
+
+        segments = speech.remap(result.segments) if speech else result.segments
+        result.segments = [segment.shifted(offset) for segment in segments]
+        logger.debug(f"Window at {offset:.1f}s: {len(result.segments)} segments")
+        return result
+
+    @staticmethod
+    def _segments(result: Transcription, speech: SpeechMap = None) -> Tuple[List[Segment], str, float]:
+        """Segments of a result, or one segment for the whole text (spanning the speech, if known)"""
+        start, end = (speech.onset, speech.end) if speech else (0.0, 0.0)
+        segments = result.segments or [Segment(start=start, end=end, text=result.text)]
+        logger.debug(f"Segments: {len(segments)}")
+
+        return segments, result.language, result.confidence
+
+    def _transcribe_chunks(self, chunks: Iterable[bytes], audio_format: str) -> Transcription:
+        """
+        Send a byte stream to the backend and validate the transcript
+
+        Returns:
+            Transcription with our language code
+        """
+        try:
+            logger.debug(f"Transcribing piped {audio_format} audio")
+
+            with track_call(self.backend.name, "transcribe"):
+                result = self.backend.transcribe_stream(chunks, audio_format)
+            return self._validate(result)
+
+        except Exception as e:
+            logger.error(f"{self.backend.name} STT Error: {e}")
+            raise Exception(f"Transcription failed: {str(e)}")
+
+    def _transcribe_file(self, audio_path: str, speech: SpeechMap = None) -> Transcription:
+        """
+        Send an audio file to the backend and validate the transcript
+
+        WAV input goes through the VAD pre-pass first: silent audio is
+        rejected before the backend is called, and only the speech is sent
+        when there is enough silence to trim (segment times are mapped back).
+        Long WAV input is sent in windows, cut at fixed lengths when VAD
+        is off; other formats always go out as one request.
+
         Returns:
-            Tuple of (transcribed_text, detected_language)
+            Transcription with our language code
         """
         try:
-            print(f"Transcribing: {audio_path}")
-            
-            # 1. Check file exists and size
+            logger.debug(f"Transcribing: {audio_path}")
+
+            # 1. Check file exists
             if not os.path.exists(audio_path):
                 raise Exception(f"Audio file not found: {audio_path}")
 
-            # 2. Check file size (catches corrupted/empty files)
-            file_size = os.path.getsize(audio_path)
-            print(f"Audio file size: {file_size} bytes")
-
-            if file_size < 1000:
-                raise Exception (f"Audio file too small: {file_size} bytes - may be silent")
-                
-            # Read audio file
-            with open(audio_path, "rb") as audio_file:
-                buffer_data = audio_file.read()
-            
-            # Prepare audio payload
-            payload: FileSource = {
-                "buffer": buffer_data,
-            }
-            
-            # Configure Deepgram options
-            options = PrerecordedOptions(
-                model="nova-2",  # Best general model
-                smart_format=True,  # Auto punctuation and formatting
-                language="multi",  # Auto-detect language
-                detect_language=True,  # Return detected language
-            )
-            
-            # Transcribe
-            response = self.client.listen.prerecorded.v("1").transcribe_file(
-                payload, options
-            )
-            
-            # Extract text and language
-            transcript = response.results.channels[0].alternatives[0].transcript
-            detected_lang = response.results.channels[0].detected_language or "en"
-            
-            # Get language confidence
-            confidence = response.results.channels[0].language_confidence or 1.0
-
-            print(f"✓ Language: {detected_lang} (confidence: {confidence:.2f})")
-
-            # Check for low confidence (might indicate mixed languages)
-            if confidence < 0.7:
-                print(f"⚠ Warning: Low language confidence - video might contain mixed languages")
-
-            # 3. Handle empty transcript
-            if not transcript or transcript.strip() == "":
+            # 2. Check for speech (WAV) or at least content (other formats)
+            if speech is None:
+                speech = self.detect_speech(audio_path)
+            if speech is None:
+                file_size = os.path.getsize(audio_path)
+                logger.debug(f"Audio file size: {file_size} bytes")
+                if file_size == 0:
+                    raise Exception("Audio file is empty")
+            elif not speech.regions:
+                STT_AUDIO_SECONDS.labels("silence").inc(speech.duration)
                 raise Exception("No speech detected in the audio. Please upload a video with spoken content.")
 
-            # 4. Check min word count
-            word_count = len(transcript.strip().split())
-            if word_count < 3:
-                raise Exception(f"Very little speech detected ({word_count} words). Please ensure your video has clear audio.")
-
-            # Map Deepgram language codes to our format
-            mapped_lang = self.REVERSE_MAP.get(detected_lang, "en")
-                        
-            print(f"✓ Transcribed ({detected_lang} → {mapped_lang}): {transcript[:100]}...")
-            print(f"✓ Word count: {word_count}")
+            # Transcribe
+            long_form = self._long_form_speech(audio_path, speech)
+            if long_form is not None:
+                result = self._transcribe_long(audio_path, long_form)
+            elif speech is not None and self.vad.worth_trimming(speech):
+                result = self._transcribe_speech(audio_path, speech)
+            else:
+                if speech is not None:
+                    STT_AUDIO_SECONDS.labels("speech").inc(speech.duration)
+                with track_call(self.backend.name, "transcribe"):
+                    result = self.backend.transcribe(audio_path)
+            return self._validate(result)
 
-            return transcript.strip(), mapped_lang, confidence
-            
         except Exception as e:
-            print(f"✗ Deepgram STT Error: {e}")
+            logger.error(f"{self.backend.name} STT Error: {e}")
             raise Exception(f"Transcription failed: {str(e)}")
-    
+
+    def _long_form_speech(self, audio_path: str, speech: Optional[SpeechMap]) -> Optional[SpeechMap]:
+        """Speech map to cut windows from if the file is long enough for long-form mode, else None"""
+        if not self.long_form_seconds:
+            return None
+        if speech is None:
+            # No VAD pass: treat the whole WAV as speech, so windows are cut at fixed lengths
+            speech = SpeechMap.whole_wav(audio_path)
+            if speech is None:
+                logger.info(f"Long-form needs 16-bit PCM WAV; sending {os.path.basename(audio_path)} in one request")
+                return None
+        return speech if speech.duration >= self.long_form_seconds else None
+
+    def _transcribe_speech(self, audio_path: str, speech: SpeechMap) -> Transcription:
+        """Send only the speech regions of a WAV file, then map segment times back"""
+        trimmed_path = f"{os.path.splitext(audio_path)[0]}_speech.wav"
+        try:
+            self.vad.write_speech(audio_path, speech, trimmed_path)
+            logger.info(f"Sending {speech.speech_seconds:.1f}s of speech, skipping {speech.silence_seconds:.1f}s")
+            STT_AUDIO_SECONDS.labels("speech").inc(speech.speech_seconds)
+            STT_AUDIO_SECONDS.labels("silence").inc(speech.silence_seconds)
+
+            with track_call(self.backend.name, "transcribe"):
+                result = self.backend.transcribe(trimmed_path)
+        finally:
+            if os.path.exists(trimmed_path):
+                os.remove(trimmed_path)
+
+        result.segments = speech.remap(result.segments)
+        return result
+
+    def _transcribe_long(self, audio_path: str, speech: SpeechMap) -> Transcription:
+        """
+        Long-form mode: transcribe windows of a WAV file concurrently and stitch them
+
+        Each window is cut at a silence where possible, sent as its own
+        request and retried on its own, so one timeout costs a window
+        rather than the whole recording. Language and confidence are
+        aggregated over the windows (see long_form.aggregate_language).
+        """
+        windows = plan_windows(speech, self.window_seconds, self.window_overlap)
+        logger.info(
+            f"Long-form: {speech.duration:.0f}s in {len(windows)} windows, "
+            f"{self.window_concurrency} at a time"
+        )
+        STT_AUDIO_SECONDS.labels("silence").inc(speech.silence_seconds)
+
+        futures = [self._window_pool.submit(self._transcribe_window_file, audio_path, window) for window in windows]
+        try:
+            results = [future.result() for future in futures]
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+        segments = stitch(windows, results)
+        language, confidence = aggregate_language(windows, results)
+        logger.info(f"Long-form: {len(segments)} segments, language {language} ({confidence:.2f})")
+        return Transcription(
+            text=" ".join(segment.text for segment in segments),
+            language=language,
+            confidence=confidence,
+            segments=segments
+        )
+
+    def _transcribe_window_file(self, audio_path: str, window: Window) -> Transcription:
+        """One long-form window: write its speech, send it with retries, map segments back"""
+        window_path = f"{os.path.splitext(audio_path)[0]}_window{window.index}.wav"
+        try:
+            VoiceActivityDetector.write_speech(audio_path, window.speech, window_path)
+            for attempt in range(self.window_retries + 1):
+                try:
+                    with track_call(self.backend.name, "transcribe"):
+                        result = self.backend.transcribe(window_path)
+                    break
+                except Exception as e:
+                    if attempt == self.window_retries:
+                        raise Exception(f"Window {window.index} ({window.start:.0f}-{window.end:.0f}s) failed: {e}")
+                    logger.warning(f"Window {window.index} attempt {attempt + 1} failed ({e}), retrying...")
+                    time.sleep(0.5 * 2 ** attempt)
+        finally:
+            if os.path.exists(window_path):
+                os.remove(window_path)
+
+        STT_AUDIO_SECONDS.labels("speech").inc(window.speech.speech_seconds)
+        result.segments = window.speech.remap(result.segments)
+        return result
+
+    def _validate(self, result: Transcription) -> Transcription:
+        """Reject empty or near-empty transcripts"""
+        transcript = result.text
+
+        # Check for low confidence (might indicate mixed languages)
+        if result.confidence < 0.7:
+            logger.warning("Low language confidence - video might contain mixed languages")
+
+        # 3. Handle empty transcript
+        if not transcript or transcript.strip() == "":
+            raise Exception("No speech detected in the audio. Please upload a video with spoken content.")
+
+        # 4. Check min word count
+        word_count = len(transcript.strip().split())
+        if word_count < 3:
+            raise Exception(f"Very little speech detected ({word_count} words). Please ensure your video has clear audio.")
+
+        logger.debug(f"Transcribed ({result.language}): {transcript[:100]}...")
+        logger.debug(f"Word count: {word_count}")
+
+        result.text = transcript.strip()
+        return result
+
     def transcribe_with_language(self, audio_path: str, language: str) -> str:
         """
         Transcribe with specified language (faster, more accurate)
-        
+
         Args:
             audio_path: Path to audio file
             language: Language code (en, zh-CN, ms)
-            
+
         Returns:
             Transcribed text
         """
         try:
-            print(f"Transcribing with language hint: {language}")
-            
-            # Read audio file
-            with open(audio_path, "rb") as audio_file:
-                buffer_data = audio_file.read()
-            
-            payload: FileSource = {
-                "buffer": buffer_data,
-            }
-            
-            # Map our language codes to Deepgram's
-            lang_map = {
-                "en": "en",
-                "zh-CN": "zh",
-                "ms": "ms",
-            }
-            
-            deepgram_lang = lang_map.get(language, "en")
-            
-            # Configure options with specific language
-            options = PrerecordedOptions(
-                model="nova-2",
-                smart_format=True,
-                language=deepgram_lang,
-            )
-            
-            # Transcribe
-            response = self.client.listen.prerecorded.v("1").transcribe_file(
-                payload, options
-            )
-            
-            transcript = response.results.channels[0].alternatives[0].transcript
-            
-            print(f"✓ Transcribed: {transcript[:100]}...")
-            
-            return transcript.strip()
-            
+            logger.info(f"Transcribing with language hint: {language}")
+
+            with track_call(self.backend.name, "transcribe"):
+                result = self.backend.transcribe(audio_path, language=language)
+
+            logger.debug(f"Transcribed: {result.text[:100]}...")
+
+            return result.text.strip()
+
         except Exception as e:
-            print(f"✗ Deepgram STT Error: {e}")
-            raise Exception(f"Transcription failed: {str(e)}")
\ No newline at end of file
+            logger.error(f"{self.backend.name} STT Error: {e}")
+            raise Exception(f"Transcription failed: {str(e)}")
@@ -0,0 +1,227 @@
+from bs4 import BeautifulSoup
+from deep_translator.constants import DEEPL_LANGUAGE_TO_CODE, GOOGLE_LANGUAGES_TO_CODES
+from deep_translator.exceptions import (
+    NotValidLength, NotValidPayload, RequestError, TooManyRequests, TranslationNotFound
+)
+from typing import Callable, Dict, Optional
+import logging
+import os
+
+from app.utils.http_pool import HTTPPool, shared_pool
+
+logger = logging.getLogger(__name__)
+
+
+class UnsupportedPairError(Exception):
+    """Raised when a backend can't translate a language pair"""
+
+
+class TranslationBackend:
+    """A translation provider used by TranslationService
+
+    Implementations translate one provider-sized chunk at a time and may
+    be called from several threads at once.
+    """
+
+    name = "base"
+
+    # Pair translated by warm()
+    WARM_PAIR = ("en", "es")
+
+    def warm(self):
+        """Open a connection to the provider with a one-word request; optional"""
+        self.translate("Hello", *self.WARM_PAIR)
+
+    def supports(self, source: str, target: str) -> bool:
+        """Whether this backend can translate the pair"""
+        return True
+
+    def translate(self, text: str, source: str, target: str) -> str:
+        """Translate one chunk (source/target are our language codes)"""
+        raise NotImplementedError
+
+
+class GoogleBackend(TranslationBackend):
+    """Google Translate's free mobile web page, no key
+
+    Requests go over the worker's shared HTTP pool instead of a new
+    connection per call. Language codes are checked against Google's list
+    (deep_translator's table) and the translation is read from the page's
+    result element.
+    """
+
+    name = "google"
+
+    URL = "https://translate.google.com/m"
+
+    CODES = set(GOOGLE_LANGUAGES_TO_CODES.values())
+    # Our codes that Google spells differently
+    ALIASES = {"zh": "zh-CN", "he": "iw", "jv": "jw", "fil": "tl"}
+
+    # Longest text the page accepts
+    MAX_CHARS = 5000
+
+    def __init__(self, http_pool: HTTPPool = None):
+        """
+        Args:
+            http_pool: Shared connection pool (default: the worker's pool)
+        """
+        self.http = http_pool or shared_pool()
+
+    def supports(self, source: str, target: str) -> bool:
+        return (source == "auto" or self._code(source) in self.CODES) and self._code(target) in self.CODES
+
+    def translate(self, text: str, source: str, target: str) -> str:
+        if not isinstance(text, str):
+            raise NotValidPayload(text)
+        if len(text) > self.MAX_CHARS:
+            raise NotValidLength(text, 1, self.MAX_CHARS)
+        text = text.strip()
+        source = source if source == "auto" else self._code(source)
+        target = self._code(target)
+        if not text or source == target:
+            return text
+        if (source != "auto" and source not in self.CODES) or target not in self.CODES:
+            raise UnsupportedPairError(f"Google Translate doesn't support {source} → {target}")
+
+        response = self.http.client.get(self.URL, params={"sl": source, "tl": target, "q": text})
+        if response.status_code == 429:
+            raise TooManyRequests()
+        if response.status_code >= 400:
+            raise RequestError(f"Google Translate returned {response.status_code}")
+
+        # The result is in div.t0 on the mobile page, div.result-container on the full one
+        soup = BeautifulSoup(response.text, "html.parser")
+        element = soup.find("div", {"class": "t0"}) or soup.find("div", {"class": "result-container"})
+        if not element:
+            raise TranslationNotFound(text)
+        translated = element.get_text(strip=True)
+
+        # Names, numbers and text already in the target language come back as they were
+        if translated != text and self._alnum(translated) == self._alnum(text):
+            return text
+        return translated
+
+    def _code(self, lang: str) -> str:
+        return self.ALIASES.get(lang, lang)
+
+    @staticmethod
+    def _alnum(text: str) -> str:
+        return "".join(ch for ch in text if ch.isalnum())
+
+
+class DeeplBackend(TranslationBackend):
+    """DeepL REST API (needs DEEPL_API_KEY), over the shared HTTP pool"""
+
+    name = "deepl"
+
+    CODES = set(DEEPL_LANGUAGE_TO_CODE.values())
+    ALIASES = {"zh-CN": "zh"}
+
+    def __init__(self, api_key: str = None, use_free_api: bool = None, http_pool: HTTPPool = None):
+        """
+        Args:
+            api_key: DeepL key (env DEEPL_API_KEY)
+            use_free_api: Use the api-free endpoint (env DEEPL_FREE_API, default true)
+            http_pool: Shared connection pool (default: the worker's pool)
+        """
+        self.api_key = api_key or os.getenv("DEEPL_API_KEY")
+        if not self.api_key:
+            raise ValueError("DEEPL_API_KEY environment variable not set")
+        if use_free_api is None:
+            use_free_api = os.getenv("DEEPL_FREE_API", "true").lower() == "true"
+        self.use_free_api = use_free_api
+        self.url = f"https://{'api-free' if use_free_api else 'api'}.deepl.com/v2/translate"
+        self.http = http_pool or shared_pool()
+
+    def supports(self, source: str, target: str) -> bool:
+        return self._code(source) in self.CODES and self._code(target) in self.CODES
+
+    def translate(self, text: str, source: str, target: str) -> str:
+        response = self.http.client.post(
+            self.url,
+            headers={"Authorization": f"DeepL-Auth-Key {self.api_key}"},
+            data={
+                "text": text,
+                "source_lang": self._code(source).upper(),
+                "target_lang": self._code(target).upper(),
+            }
+        )
+        if response.status_code == 429:
+            raise TooManyRequests()
+        if response.status_code >= 400:
+            raise RequestError(f"DeepL returned {response.status_code}: {response.text[:200]}")
+        translations = response.json().get("translations") or []
+        if not translations:
+            raise TranslationNotFound(text)
+        return translations[0].get("text") or ""
+
+    def _code(self, lang: str) -> str:
+        return self.ALIASES.get(lang, lang)
+
+
+class LocalBackend(TranslationBackend):
+    """Offline translation on this machine
+
+    Uses Argos Translate (optional: `pip install argostranslate` plus the
+    language packages) unless another engine is given, e.g. a deterministic
+    stub for tests and benchmarks.
+    """
+
+    name = "local"
+
+    ALIASES = {"zh-CN": "zh"}
+
+    def __init__(self, engine: Callable[[str, str, str], str] = None):
+        """
+        Args:
+            engine: (text, source, target) -> translated text; defaults to Argos Translate
+        """
+        if engine is None:
+            try:
+                from argostranslate import translate as argos
+            except ImportError:
+                raise ValueError("Local translation needs the argostranslate package")
+            engine = argos.translate
+        self.engine = engine
+
+    def warm(self):
+        """Nothing to connect to"""
+
+    def translate(self, text: str, source: str, target: str) -> str:
+        return self.engine(
+            text,
+            self.ALIASES.get(source, source),
+            self.ALIASES.get(target, target)
+        )
+
+
+def stub_engine(text: str, source: str, target: str) -> str:
+    """Deterministic offline 'translation' for tests and benchmarks"""
+    return f"[{target}] {text}"
+
+
+# Backend name -> factory, selected with TRANSLATION_BACKENDS
+BACKENDS: Dict[str, Callable[[], TranslationBackend]] = {
+    "google": GoogleBackend,
+    "deepl": DeeplBackend,
+    "local": LocalBackend,
+    "stub": lambda: LocalBackend(engine=stub_engine),
+}
+
+
+def register_backend(name: str, factory: Callable[[], TranslationBackend]):
+    """Make a backend selectable by name"""
+    BACKENDS[name] = factory
+
+
+def create_backend(name: str) -> Optional[TranslationBackend]:
+    """Instantiate a registered backend, or None if it can't be configured"""
+    factory = BACKENDS.get(name)
+    if factory is None:
+        raise ValueError(f"Unknown translation backend: {name}")
+    try:
+        return factory()
+    except ValueError as e:
+        logger.warning(f"Translation backend '{name}' disabled: {e}")
+        return None
@@ -1,20 +1,128 @@
-from deep_translator import GoogleTranslator, DeeplTranslator
-from typing import Dict
-from app.models.schemas import SUPPORTED_LANGUAGES
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+import logging
+import os
+import threading
+import time
+from app.models.languages import LANGUAGES
+from app.services.translation_backends import TranslationBackend, create_backend
+from app.utils.lru_cache import LRUCache
+from app.utils.metrics import observe_call
+from app.utils.text_utils import split_sentences
 
-# Google Translator
-class TranslationService:
-    """Translation service using Google Translate (free)"""
+logger = logging.getLogger(__name__)
+
+class BackendStats:
+    """Latency and error counters for one translation backend"""
+    
+    # Weight of the newest sample in the moving latency average
+    EWMA_ALPHA = 0.2
     
     def __init__(self):
-        """Initialize translation service"""
-        # Build language map from SUPPORTED_LANGUAGES
-        self.LANG_MAP = {
-            lang_code: lang_code for lang_code in SUPPORTED_LANGUAGES.keys()
+        self.calls = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.unavailable_until = 0.0
+        self.pair_latency: Dict[tuple, float] = {}  # (source, target) -> EWMA seconds
+        self._lock = threading.Lock()
+    
+    def record(self, pair: tuple, seconds: float, ok: bool):
+        with self._lock:
+            self.calls += 1
+            self.total_seconds += seconds
+            if not ok:
+                self.errors += 1
+                return
+            previous = self.pair_latency.get(pair)
+            self.pair_latency[pair] = seconds if previous is None else (
+                self.EWMA_ALPHA * seconds + (1 - self.EWMA_ALPHA) * previous
+            )
+    
+    def to_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "avg_latency_ms": round(self.total_seconds / self.calls * 1000, 1) if self.calls else None,
+            "available": self.unavailable_until <= time.monotonic(),
         }
-        # Add common aliases
-        self.LANG_MAP["zh"] = "zh-CN"
-        print("✓ Translation service initialized")
+
+
+class TranslationService:
+    """Translation service over pluggable backends with failover"""
+    
+    def __init__(self, chunk_chars: int = None, concurrency: int = None,
+                 cache_size: int = None, cache_ttl: int = None,
+                 backends: Dict[str, TranslationBackend] = None, routing: str = None,
+                 failover_cooldown: float = None):
+        """
+        Initialize translation service
+        
+        Args:
+            backends: Backend name -> instance, in priority order
+                (default: built from env TRANSLATION_BACKENDS, e.g. "deepl,google")
+            routing: "priority" tries backends in order; "fastest" tries the
+                lowest-latency backend for each language pair first
+                (env TRANSLATION_ROUTING, default priority)
+            failover_cooldown: Seconds a failing backend is skipped (env TRANSLATION_FAILOVER_COOLDOWN, default 30)
+            chunk_chars: Max characters per provider request (env TRANSLATION_CHUNK_CHARS, default 4500)
+            concurrency: Chunks translated at once (env TRANSLATION_CONCURRENCY, default 4)
+            cache_size: Cached (text, source, target) entries (env TRANSLATION_CACHE_SIZE, default 10000)
+            cache_ttl: Cache entry lifetime in seconds (env TRANSLATION_CACHE_TTL, default 86400)
+        """
+        # Provider limit is 5000 characters per request
+        self.chunk_chars = chunk_chars or int(os.getenv("TRANSLATION_CHUNK_CHARS", "4500"))
+        self.concurrency = concurrency or int(os.getenv("TRANSLATION_CONCURRENCY", "4"))
+        self.cache = LRUCache(
+            max_entries=cache_size if cache_size is not None else int(os.getenv("TRANSLATION_CACHE_SIZE", "10000")),
+            ttl_seconds=cache_ttl if cache_ttl is not None else int(os.getenv("TRANSLATION_CACHE_TTL", "86400")),
+            name="translation_memory"
+        )
+        self._pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="translate")
+        
+        if backends is None:
+            names = [
+                name.strip()
+                for name in os.getenv("TRANSLATION_BACKENDS", "google").split(",")
+                if name.strip()
+            ]
+            backends = {name: create_backend(name) for name in names}
+            backends = {name: backend for name, backend in backends.items() if backend}
+        if not backends:
+            raise ValueError("No translation backend available")
+        self.backends = backends
+        self.routing = routing or os.getenv("TRANSLATION_ROUTING", "priority")
+        self.failover_cooldown = failover_cooldown if failover_cooldown is not None else float(
+            os.getenv("TRANSLATION_FAILOVER_COOLDOWN", "30")
+        )
+        self.stats = {name: BackendStats() for name in self.backends}
+        
+        logger.info("Translation service initialized")
+        logger.info(f"Translation backends: {', '.join(self.backends)} ({self.routing})")
+    
+    def warm(self):
+        """
+        Warm every backend before the first request
+        
+        A backend that fails is put in cooldown like a failed request, so
+        traffic starts on the ones that answered.
+        
+        Raises:
+            Exception: If no backend could be warmed
+        """
+        failures = {}
+        for name, backend in self.backends.items():
+            try:
+                backend.warm()
+            except Exception as e:
+                failures[name] = e
+                self.stats[name].unavailable_until = time.monotonic() + self.failover_cooldown
+                logger.warning(f"Translation backend '{name}' warm-up failed: {e}")
+        if len(failures) == len(self.backends):
+            raise Exception(f"No translation backend reachable: {failures}")
+    
+    def close(self):
+        """Stop the chunk pool"""
+        self._pool.shutdown(wait=False, cancel_futures=True)
     
     def translate(self, text: str, source_lang: str, target_lang: str) -> str:
         """
@@ -28,55 +136,124 @@ class TranslationService:
         Returns:
             Translated text
         """
+        return self.translate_batch([text], source_lang, target_lang)[0]
+    
+    def translate_batch(self, texts: List[str], source_lang: str, target_lang: str) -> List[str]:
+        """
+        Translate several texts from source to target language
+        
+        Texts are split at sentence boundaries into provider-sized chunks,
+        cached chunks are skipped, the rest are translated concurrently,
+        and each text is reassembled in order.
+        
+        Args:
+            texts: Texts to translate
+            source_lang: Source language code
+            target_lang: Target language code
+            
+        Returns:
+            Translated texts, in the same order
+        """
         try:
             # Normalize language codes
-            source = self.LANG_MAP.get(source_lang, source_lang)
-            target = self.LANG_MAP.get(target_lang, target_lang)
+            source = LANGUAGES.normalize(source_lang)
+            target = LANGUAGES.normalize(target_lang)
             
             # Skip if same language
             if source == target:
-                return text
+                return list(texts)
             
-            print(f"Translating: {source} → {target}")
-            print(f"Original: {text[:100]}...")
+            chunked = [split_sentences(text, self.chunk_chars) for text in texts]
             
-            # Translate
-            translator = GoogleTranslator(source=source, target=target)
-            translated = translator.translate(text)
+            translations = {}
+            pending = []
+            for chunk in dict.fromkeys(chunk for chunks in chunked for chunk in chunks):
+                cached = self.cache.get((chunk, source, target))
+                if cached is None:
+                    pending.append(chunk)
+                else:
+                    translations[chunk] = cached
             
-            print(f"Translated: {translated[:100]}...")
+            logger.info(f"Translating: {source} → {target} ({len(texts)} texts, {len(pending)} uncached chunks)")
             
-            return translated
+            if pending:
+                results = self._pool.map(
+                    lambda chunk: self._translate_chunk(chunk, source, target), pending
+                )
+                for chunk, translated in zip(pending, results):
+                    translations[chunk] = translated
+                    self.cache.set((chunk, source, target), translated)
+            
+            # Chunks were split at sentence ends; rejoin them the way the target script does
+            language = LANGUAGES.get(target)
+            separator = language.word_separator if language else " "
+            translated_texts = [
+                separator.join(translations[chunk] for chunk in chunks)
+                for chunks in chunked
+            ]
+            
+            logger.debug(f"Translated: {translated_texts[0][:100] if translated_texts else ''}...")
+            
+            return translated_texts
             
         except Exception as e:
-            print(f"✗ Translation Error: {e}")
+            logger.error(f"Translation Error: {e}")
             raise Exception(f"Translation failed: {str(e)}")
     
+    def _translate_chunk(self, chunk: str, source: str, target: str) -> str:
+        """Translate one provider-sized chunk, failing over between backends"""
+        last_error = None
+        
+        for name in self._candidates(source, target):
+            backend = self.backends[name]
+            stats = self.stats[name]
+            
+            start = time.perf_counter()
+            try:
+                translated = backend.translate(chunk, source, target)
+            except Exception as e:
+                elapsed = time.perf_counter() - start
+                observe_call(name, "translate", elapsed, ok=False)
+                stats.record((source, target), elapsed, ok=False)
+                stats.unavailable_until = time.monotonic() + self.failover_cooldown
+                logger.warning(f"Translation backend '{name}' failed ({e}), trying next")
+                last_error = e
+                continue
+            
+            elapsed = time.perf_counter() - start
+            observe_call(name, "translate", elapsed)
+            stats.record((source, target), elapsed, ok=True)
+            return translated
+        
+        if last_error:
+            raise last_error
+        raise Exception(f"No translation backend supports {source} → {target}")
+    
+    def _candidates(self, source: str, target: str) -> List[str]:
+        """Backend names to try for a pair, best first"""
+        names = [
+            name for name, backend in self.backends.items()
+            if backend.supports(source, target)
+        ]
+        
+        if self.routing == "fastest":
+            # Unmeasured backends sort first so each gets sampled
+            names.sort(key=lambda name: self.stats[name].pair_latency.get((source, target), 0.0))
+        
+        # Backends in cooldown go last, but are still tried if all others fail
+        now = time.monotonic()
+        names.sort(key=lambda name: self.stats[name].unavailable_until > now)
+        return names
+    
+    def backend_stats(self) -> dict:
+        """Per-backend call, error and latency counters"""
+        return {name: stats.to_dict() for name, stats in self.stats.items()}
+    
     def detect_language(self, text: str) -> str:
         """Detect language of text"""
         try:
             from deep_translator import single_detection
             lang = single_detection(text, api_key=None)
-            return self.LANG_MAP.get(lang, lang)
+            return LANGUAGES.normalize(lang)
         except:
             return "en"  # Default to English
-
-# DeepL Translator
-class TranslationService2:
-    def __init__(self, use_deepl: bool = False, deepl_api_key: str = None):
-        self.use_deepl = use_deepl
-        self.deepl_api_key = deepl_api_key
-    
-    def translate(self, text: str, source_lang: str, target_lang: str) -> str:
-        if self.use_deepl and self.deepl_api_key:
-            # Use DeepL (better quality)
-            translator = DeeplTranslator(
-                api_key=self.deepl_api_key,
-                source=source_lang,
-                target=target_lang
-            )
-        else:
-            # Use Google (free)
-            translator = GoogleTranslator(source=source_lang, target=target_lang)
-        
-        return translator.translate(text)
\ No newline at end of file
@@ -1,22 +1,67 @@
 import edge_tts
 import asyncio
+import logging
 import os
-from app.models.schemas import SUPPORTED_LANGUAGES
+import uuid
+import weakref
+from app.models.languages import LANGUAGES
+from app.utils.http_pool import HTTPPool, shared_pool
+from app.utils.metrics import track_call
+from app.utils.text_utils import split_sentences
+
+logger = logging.getLogger(__name__)
 
 class TTSService:
     """Text-to-Speech using Edge-TTS (Microsoft voices)"""
     
-    def __init__(self):
-        """Initialize TTS service with voice mapping from registry"""
-        # Build voice map from SUPPORTED_LANGUAGES
-        self.VOICE_MAP = {
-            lang_code: lang_data["tts_voice"]
-            for lang_code, lang_data in SUPPORTED_LANGUAGES.items()
-        }
-        print("✓ Edge-TTS service initialized")
-        print(f"✓ Loaded {len(self.VOICE_MAP)} language voices")
+    def __init__(self, concurrency: int = None, retries: int = None, chunk_chars: int = None,
+                 communicate_factory=None, http_pool: HTTPPool = None):
+        """
+        Initialize TTS service with voice mapping from registry
+        
+        Args:
+            concurrency: Edge-TTS connections open at once across all requests (env TTS_CONCURRENCY, default 4)
+            retries: Extra attempts per failed synthesis (env TTS_RETRIES, default 2)
+            chunk_chars: Max characters per chunk in batch synthesis (env TTS_CHUNK_CHARS, default 400)
+            communicate_factory: (text, voice, rate) -> object with async save(path), rate being
+                Edge-TTS's "+25%" form; defaults to edge_tts.Communicate, replaceable by a local fake backend
+            http_pool: Shared connection pool whose aiohttp connector Edge-TTS uses
+                (default: the worker's pool)
+        """
+        # Language code -> voice, shared from the registry
+        self.VOICE_MAP = LANGUAGES.voices
+        self.concurrency = concurrency or int(os.getenv("TTS_CONCURRENCY", "4"))
+        self.retries = retries if retries is not None else int(os.getenv("TTS_RETRIES", "2"))
+        self.chunk_chars = chunk_chars or int(os.getenv("TTS_CHUNK_CHARS", "400"))
+        self.http = http_pool or shared_pool()
+        self.uses_edge_tts = communicate_factory is None
+        self.communicate_factory = communicate_factory or self._edge_communicate
+        # Event loop -> semaphore. A semaphore that had to wait references its loop, so
+        # closed loops are also dropped on the next lookup (weak keys alone wouldn't free them)
+        self._limits = weakref.WeakKeyDictionary()
+        logger.info("Edge-TTS service initialized")
+        logger.info(f"Loaded {len(self.VOICE_MAP)} language voices")
+    
+    async def warm(self):
+        """
+        Probe Edge-TTS: fetch the voice list and check every mapped voice exists
+        
+        Skipped when a custom backend is configured.
+        
+        Raises:
+            Exception: If the voice list can't be fetched
+        """
+        if not self.uses_edge_tts:
+            return
+        
+        with track_call("edge_tts", "list_voices"):
+            voices = await edge_tts.list_voices(connector=self.http.aiohttp_connector())
+        available = {voice["ShortName"] for voice in voices}
+        missing = sorted(set(self.VOICE_MAP.values()) - available)
+        if missing:
+            logger.warning(f"Edge-TTS voices not available: {', '.join(missing)}")
     
-    async def generate_speech_async(self, text: str, language: str, output_path: str) -> str:
+    async def generate_speech_async(self, text: str, language: str, output_path: str, rate: float = 1.0) -> str:
         """
         Async method to generate speech (for use in FastAPI)
         
@@ -24,32 +69,132 @@ class TTSService:
             text: Text to convert
             language: Language code (en, zh-CN, ms)
             output_path: Output audio file path
+            rate: Speaking rate, 1.0 is the voice's normal speed (1.25: 25% faster)
             
         Returns:
             Path to generated audio file
         """
         try:
-            print(f"Generating speech ({language}): {text[:50]}...")
+            logger.debug(f"Generating speech ({language}): {text[:50]}...")
             
             voice = self.VOICE_MAP.get(language, self.VOICE_MAP["en"])
             
-            communicate = edge_tts.Communicate(text, voice)
-            await communicate.save(output_path)
+            await self._synthesize(text, voice, output_path, rate)
             
             if os.path.exists(output_path):
                 file_size = os.path.getsize(output_path)
                 if file_size < 1000:
                     raise Exception(f"Audio file too small ({file_size} bytes)")
                 
-                print(f"✓ Speech generated: {output_path}")
+                logger.info(f"Speech generated: {output_path}")
                 return output_path
             else:
                 raise Exception("Audio file not created")
                 
         except Exception as e:
-            print(f"✗ TTS Error: {e}")
+            logger.error(f"TTS Error: {e}")
             raise Exception(f"TTS generation failed: {str(e)}")
     
+    async def generate_speech_batch(self, text: str, language: str, output_path: str, rate: float = 1.0) -> str:
+        """
+        Generate speech for long text by synthesizing sentence chunks concurrently
+        
+        Chunks are split at sentence boundaries, synthesized in parallel
+        (bounded by the shared connection limit, each retried on failure)
+        and joined in order. Edge-TTS returns raw MP3 frames in one fixed
+        format, so the chunks are concatenated byte-wise without re-encoding.
+        
+        Args:
+            text: Text to convert
+            language: Language code (en, zh-CN, ms)
+            output_path: Output audio file path
+            rate: Speaking rate, 1.0 is the voice's normal speed
+            
+        Returns:
+            Path to generated audio file
+        """
+        chunks = split_sentences(text, self.chunk_chars)
+        if len(chunks) <= 1:
+            return await self.generate_speech_async(text, language, output_path, rate)
+        
+        try:
+            logger.debug(f"Generating speech ({language}) in {len(chunks)} chunks: {text[:50]}...")
+            
+            voice = self.VOICE_MAP.get(language, self.VOICE_MAP["en"])
+            chunk_paths = [f"{output_path}.{uuid.uuid4().hex[:8]}.part{i}" for i in range(len(chunks))]
+            
+            try:
+                await asyncio.gather(*[
+                    self._synthesize(chunk, voice, chunk_path, rate)
+                    for chunk, chunk_path in zip(chunks, chunk_paths)
+                ])
+                
+                with open(output_path, "wb") as output:
+                    for chunk_path in chunk_paths:
+                        with open(chunk_path, "rb") as part:
+                            output.write(part.read())
+            finally:
+                for chunk_path in chunk_paths:
+                    if os.path.exists(chunk_path):
+                        os.remove(chunk_path)
+            
+            file_size = os.path.getsize(output_path)
+            if file_size < 1000:
+                raise Exception(f"Audio file too small ({file_size} bytes)")
+            
+            logger.info(f"Speech generated: {output_path}")
+            return output_path
+            
+        except Exception as e:
+            logger.error(f"TTS Error: {e}")
+            raise Exception(f"TTS generation failed: {str(e)}")
+    
+    async def _synthesize(self, text: str, voice: str, output_path: str, rate: float = 1.0):
+        """One Edge-TTS request under the shared connection limit, with retries"""
+        rate = self.edge_rate(rate)
+        for attempt in range(self.retries + 1):
+            try:
+                async with self._limit():
+                    with track_call("edge_tts", "synthesize"):
+                        communicate = self.communicate_factory(text, voice, rate)
+                        await communicate.save(output_path)
+                        
+                        if not os.path.exists(output_path) or os.path.getsize(output_path) == 0:
+                            raise Exception("No audio received")
+                return
+                
+            except Exception as e:
+                if attempt == self.retries:
+                    raise
+                logger.warning(f"TTS attempt {attempt + 1} failed ({e}), retrying...")
+                await asyncio.sleep(0.5 * 2 ** attempt)
+    
+    @staticmethod
+    def edge_rate(rate: float) -> str:
+        """Speaking rate as Edge-TTS takes it (1.25 -> +25%)"""
+        return f"{round((rate - 1) * 100):+d}%"
+    
+    def _edge_communicate(self, text: str, voice: str, rate: str = "+0%") -> edge_tts.Communicate:
+        """Edge-TTS request on the shared connector (called on the event loop)"""
+        return edge_tts.Communicate(
+            text,
+            voice,
+            rate=rate,
+            connector=self.http.aiohttp_connector(),
+            connect_timeout=int(self.http.connect_timeout),
+            receive_timeout=int(self.http.read_timeout)
+        )
+    
+    def _limit(self) -> asyncio.Semaphore:
+        """Connection limit for the running event loop"""
+        loop = asyncio.get_running_loop()
+        for closed in [other for other in self._limits if other.is_closed()]:
+            del self._limits[closed]
+        limit = self._limits.get(loop)
+        if limit is None:
+            limit = self._limits[loop] = asyncio.Semaphore(self.concurrency)
+        return limit
+    
     def generate_speech(self, text: str, language: str, output_path: str) -> str:
         """
         Convert text to speech
@@ -74,19 +219,19 @@ class TTSService:
                 # # If we're here, there's a running loop - shouldn't happen in sync context
                 # raise Exception("Cannot use sync method in async context. Use generate_speech_async() instead.")
 
-            print(f"Generating speech ({language}): {text[:50]}...")
+            logger.debug(f"Generating speech ({language}): {text[:50]}...")
             
             # # Run async function
             # asyncio.run(self._generate_speech_async(text, language, output_path))
             
             if os.path.exists(output_path):
-                print(f"✓ Speech generated: {output_path}")
+                logger.info(f"Speech generated: {output_path}")
                 return output_path
             else:
                 raise Exception("Audio file not created")
                 
         except Exception as e:
-            print(f"✗ TTS Error: {e}")
+            logger.error(f"TTS Error: {e}")
             raise Exception(f"TTS generation failed: {str(e)}")
     
     def get_available_voices(self, language: str = None):
@@ -1,6 +1,43 @@
+import asyncio
 import ffmpeg
+import io
+import logging
 import os
+import wave
 from pathlib import Path
+from typing import Iterator, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# atempo accepts 0.5-2.0 per instance on older FFmpeg builds; chain for more
+ATEMPO_MIN = 0.5
+ATEMPO_MAX = 2.0
+
+# Piped extraction formats -> FFmpeg output options (all mono 16 kHz).
+# FLAC is lossless at roughly half the size of PCM; Opus is ~10x smaller still.
+AUDIO_STREAM_FORMATS = {
+    "wav": {"format": "wav", "acodec": "pcm_s16le"},
+    "flac": {"format": "flac", "acodec": "flac"},
+    "opus": {"format": "ogg", "acodec": "libopus", "audio_bitrate": "24k"},
+}
+
+# Bytes read from the FFmpeg pipe at a time
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Raw PCM produced by open_pcm_pipe: 16 kHz mono s16le
+PCM_SAMPLE_RATE = 16000
+PCM_BYTES_PER_SECOND = PCM_SAMPLE_RATE * 2
+
+# Largest amix per filter; more clips are summed in a tree of amix filters
+AMIX_MAX_INPUTS = 32
+
+# Output container -> text subtitle codec it can hold
+SUBTITLE_CODECS = {
+    ".mp4": "mov_text",
+    ".mov": "mov_text",
+    ".mkv": "srt",
+    ".webm": "webvtt",
+}
 
 class VideoService:
     """Video processing using FFmpeg"""
@@ -17,7 +54,7 @@ class VideoService:
             Path to extracted audio
         """
         try:
-            print(f"Extracting audio from: {video_path}")
+            logger.info(f"Extracting audio from: {video_path}")
             
             # Extract audio using ffmpeg
             (
@@ -29,34 +66,150 @@ class VideoService:
             )
             
             if os.path.exists(output_path):
-                print(f"✓ Audio extracted: {output_path}")
+                logger.info(f"Audio extracted: {output_path}")
                 return output_path
             else:
                 raise Exception("Audio extraction failed")
                 
         except ffmpeg.Error as e:
-            print(f"✗ FFmpeg Error: {e.stderr.decode()}")
+            logger.error(f"FFmpeg Error: {e.stderr.decode()}")
             raise Exception(f"Audio extraction failed: {e.stderr.decode()}")
     
-    def replace_audio(self, video_path: str, audio_path: str, output_path: str) -> str:
+    def stream_audio(self, video_path: str, audio_format: str = "wav",
+                     chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+        """
+        Extract audio through a pipe instead of an intermediate file
+        
+        FFmpeg writes the encoded audio to stdout and the chunks are yielded
+        as they arrive, so nothing touches the disk. Closing the generator
+        early stops FFmpeg.
+        
+        Args:
+            video_path: Input video file
+            audio_format: One of AUDIO_STREAM_FORMATS (wav, flac, opus)
+            chunk_size: Bytes per yielded chunk
+            
+        Yields:
+            Encoded audio bytes
+        """
+        options = AUDIO_STREAM_FORMATS.get(audio_format)
+        if options is None:
+            raise ValueError(f"Unsupported audio stream format: {audio_format}")
+        
+        logger.info(f"Piping {audio_format} audio from: {video_path}")
+        
+        process = (
+            ffmpeg
+            .input(video_path)
+            .output("pipe:", ac=1, ar="16k", **options)
+            .global_args("-loglevel", "error")  # Keep stderr small: it is read after stdout
+            .run_async(pipe_stdout=True, pipe_stderr=True)
+        )
+        
+        try:
+            total = 0
+            while True:
+                chunk = process.stdout.read(chunk_size)
+                if not chunk:
+                    break
+                total += len(chunk)
+                yield chunk
+            
+            stderr = process.stderr.read().decode()
+            if process.wait() != 0:
+                logger.error(f"FFmpeg Error: {stderr}")
+                raise Exception(f"Audio extraction failed: {stderr}")
+            
+            logger.info(f"Audio piped: {total} bytes ({audio_format})")
+        
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            process.stdout.close()
+            process.stderr.close()
+    
+    async def open_pcm_pipe(self, input_path: str = "pipe:") -> asyncio.subprocess.Process:
+        """
+        Start FFmpeg decoding a video's audio to raw PCM on stdout
+        
+        With the default "pipe:" input the container is written to stdin
+        as it arrives, so decoding starts before the file is complete. That
+        needs a streamable container (MKV/WebM, MPEG-TS, faststart or
+        fragmented MP4); FFmpeg exits with an error otherwise.
+        
+        Args:
+            input_path: Video file, or "pipe:" to feed stdin
+            
+        Returns:
+            Running process; stdout yields 16 kHz mono s16le samples
+        """
+        args = (
+            ffmpeg
+            .input(input_path)
+            .output("pipe:", format="s16le", acodec="pcm_s16le", ac=1, ar=PCM_SAMPLE_RATE)
+            .global_args("-loglevel", "error")
+            .compile()
+        )
+        return await asyncio.create_subprocess_exec(
+            *args,
+            stdin=asyncio.subprocess.PIPE if input_path == "pipe:" else asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+    
+    @staticmethod
+    def wav_bytes(pcm: bytes) -> bytes:
+        """Wrap raw 16 kHz mono s16le samples in a WAV header"""
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(PCM_SAMPLE_RATE)
+            wav.writeframes(pcm)
+        return buffer.getvalue()
+    
+    def replace_audio(self, video_path: str, audio_path: str, output_path: str,
+                      duck_regions: List[Tuple[float, float]] = None, duck_db: float = None,
+                      duck_fade: float = None) -> str:
         """
         Replace video audio with new audio
         
+        With duck_regions the original track is kept instead: it is turned
+        down by duck_db over each region (fading over duck_fade) and the
+        new audio is mixed on top, in the same FFmpeg pass as the merge.
+        A video without an audio track is merged as without ducking.
+        
         Args:
             video_path: Original video file
             audio_path: New audio file
             output_path: Output video file
+            duck_regions: (start, end) seconds of the original to duck; None replaces the audio
+            duck_db: Ducking depth in dB, negative (env DUCK_DB, default -15)
+            duck_fade: Seconds to fade into and out of each region (env DUCK_FADE_MS, default 250 ms)
             
         Returns:
             Path to output video
         """
         try:
-            print(f"Replacing audio in video...")
-            
-            # Get video input
-            video_stream = ffmpeg.input(video_path).video
+            video = ffmpeg.input(video_path)
+            video_stream = video.video
             audio_stream = ffmpeg.input(audio_path).audio
             
+            if duck_regions is not None and self.has_audio(video_path):
+                logger.info(f"Mixing audio into video, ducking {len(duck_regions)} regions...")
+                if duck_db is None:
+                    duck_db = float(os.getenv("DUCK_DB", "-15"))
+                if duck_fade is None:
+                    duck_fade = int(os.getenv("DUCK_FADE_MS", "250")) / 1000
+                bed = video.audio.filter(
+                    "volume", volume=self.duck_volume(duck_regions, duck_db, duck_fade), eval="frame"
+                )
+                # The dub sits on top of the bed
+                audio_stream = self._sum([bed, audio_stream])
+            else:
+                logger.info("Replacing audio in video...")
+            
             # Combine video and new audio
             (
                 ffmpeg
@@ -73,20 +226,223 @@ class VideoService:
             )
             
             if os.path.exists(output_path):
-                print(f"✓ Video created: {output_path}")
+                logger.info(f"Video created: {output_path}")
                 return output_path
             else:
                 raise Exception("Video merge failed")
                 
         except ffmpeg.Error as e:
-            print(f"✗ FFmpeg Error: {e.stderr.decode()}")
+            logger.error(f"FFmpeg Error: {e.stderr.decode()}")
             raise Exception(f"Video merge failed: {e.stderr.decode()}")
     
+    def add_subtitles(self, video_path: str, subtitle_path: str, output_path: str, language: str = None) -> str:
+        """
+        Add a soft subtitle track without re-encoding
+        
+        Video and audio streams are copied as they are; only the subtitle
+        file is converted to a codec the output container holds (mov_text
+        for MP4), so this takes about as long as copying the file.
+        
+        Args:
+            video_path: Input video file
+            subtitle_path: SRT or VTT file
+            output_path: Output video file (.mp4, .mov, .mkv or .webm)
+            language: ISO 639-2 code for the track metadata (e.g. spa)
+            
+        Returns:
+            Path to output video
+        """
+        codec = SUBTITLE_CODECS.get(Path(output_path).suffix.lower())
+        if codec is None:
+            raise ValueError(f"Unsupported container for subtitles: {output_path}")
+        
+        metadata = {"metadata:s:s:0": f"language={language}"} if language else {}
+        
+        try:
+            logger.info("Adding subtitle track...")
+            
+            video = ffmpeg.input(video_path)
+            subtitles = ffmpeg.input(subtitle_path)
+            (
+                ffmpeg
+                .output(video["v"], video["a?"], subtitles, output_path, c="copy", **{"c:s": codec}, **metadata)
+                .overwrite_output()
+                .run(capture_stdout=True, capture_stderr=True)
+            )
+            
+            if os.path.exists(output_path):
+                logger.info(f"Video created: {output_path}")
+                return output_path
+            else:
+                raise Exception("Subtitle muxing failed")
+                
+        except ffmpeg.Error as e:
+            logger.error(f"FFmpeg Error: {e.stderr.decode()}")
+            raise Exception(f"Subtitle muxing failed: {e.stderr.decode()}")
+    
+    def build_dub_track(self, clips: List[Tuple[float, float, str]], output_path: str, max_tempo: float = None,
+                        tempos: List[float] = None, duration: float = None) -> str:
+        """
+        Place speech clips on a timeline in one FFmpeg pass
+        
+        Each clip is delayed to its start time. A clip longer than its slot
+        is sped up with atempo (up to max_tempo) so it ends on time, unless
+        tempos from a fitting stage are given, which are applied as they are.
+        
+        Args:
+            clips: (start_seconds, slot_seconds, audio_path) per segment
+            output_path: Output audio file (.wav keeps it lossless until the merge encodes AAC)
+            max_tempo: Largest allowed speed-up (env MAX_DUB_TEMPO, default 1.5)
+            tempos: atempo factor per clip (the clips aren't measured then)
+            duration: Pad with silence or cut the track to this many seconds (e.g. the video's)
+            
+        Returns:
+            Path to the dubbed audio track
+        """
+        if max_tempo is None:
+            max_tempo = float(os.getenv("MAX_DUB_TEMPO", "1.5"))
+        
+        try:
+            logger.info(f"Building dub track from {len(clips)} clips...")
+            
+            placed = []
+            for i, (start, slot, clip_path) in enumerate(clips):
+                stream = ffmpeg.input(clip_path).audio
+                
+                if tempos is not None:
+                    if abs(tempos[i] - 1.0) > 0.005:
+                        stream = self._atempo(stream, tempos[i])
+                else:
+                    clip_duration = self.get_audio_duration(clip_path)
+                    if slot > 0 and clip_duration > slot:
+                        tempo = min(clip_duration / slot, max_tempo)
+                        stream = self._atempo(stream, tempo)
+                
+                delay_ms = int(round(start * 1000))
+                stream = stream.filter("adelay", delays=delay_ms, all=1)
+                placed.append(stream)
+            
+            mixed = self._sum(placed)
+            
+            if duration:
+                mixed = mixed.filter("apad").filter("atrim", end=round(duration, 3))
+            
+            (
+                ffmpeg
+                .output(mixed, output_path)
+                .overwrite_output()
+                .run(capture_stdout=True, capture_stderr=True)
+            )
+            
+            if os.path.exists(output_path):
+                logger.info(f"Dub track created: {output_path}")
+                return output_path
+            else:
+                raise Exception("Dub track creation failed")
+                
+        except ffmpeg.Error as e:
+            logger.error(f"FFmpeg Error: {e.stderr.decode()}")
+            raise Exception(f"Dub track creation failed: {e.stderr.decode()}")
+    
+    @staticmethod
+    def duck_volume(regions: List[Tuple[float, float]], depth_db: float, fade: float) -> str:
+        """
+        Volume expression (evaluated per frame) that ducks the given regions
+        
+        Gain is 1 outside the regions and depth_db inside, with linear
+        fades of `fade` seconds before each start and after each end.
+        Regions closer than two fades are ducked as one, so the bed
+        doesn't pump up between sentences.
+        
+        Args:
+            regions: (start, end) seconds
+            depth_db: Gain inside the regions in dB (e.g. -15)
+            fade: Fade length in seconds
+            
+        Returns:
+            FFmpeg expression for the volume filter
+        """
+        merged = []
+        for start, end in sorted(regions):
+            if end <= start:
+                continue
+            if merged and start - merged[-1][1] < 2 * fade:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        if not merged:
+            return "1"
+        
+        depth = 1 - 10 ** (min(depth_db, 0.0) / 20)
+        if fade <= 0:
+            ducked = "+".join(f"between(t,{start:.3f},{end:.3f})" for start, end in merged)
+        else:
+            # One trapezoid per region; merged regions don't overlap, so the sum stays within 0-1
+            ducked = "+".join(
+                f"clip((t-{start - fade:.3f})/{fade:.3f},0,1)*clip(({end + fade:.3f}-t)/{fade:.3f},0,1)"
+                for start, end in merged
+            )
+        return f"1-{depth:.4f}*min(1,{ducked})"
+    
+    def has_audio(self, video_path: str) -> bool:
+        """Whether the file has an audio stream (assumed so if it can't be probed)"""
+        try:
+            probe = ffmpeg.probe(video_path)
+            return any(stream.get("codec_type") == "audio" for stream in probe["streams"])
+        except Exception:
+            return True
+    
+    @staticmethod
+    def _sum(streams: list):
+        """
+        Sum audio streams at their own levels, in amix groups of at most AMIX_MAX_INPUTS
+        
+        normalize=0 turns off amix's 1/N level scaling (FFmpeg 5.1+). A long
+        video's hundreds of clips become a shallow tree of bounded amix
+        filters instead of one filter with hundreds of inputs.
+        """
+        while len(streams) > 1:
+            streams = [
+                group[0] if len(group) == 1 else
+                ffmpeg.filter(group, "amix", inputs=len(group), duration="longest", normalize=0)
+                for group in (streams[i:i + AMIX_MAX_INPUTS] for i in range(0, len(streams), AMIX_MAX_INPUTS))
+            ]
+        return streams[0]
+    
+    def _atempo(self, stream, tempo: float):
+        """Apply a tempo change as a chain of in-range atempo filters"""
+        while tempo > ATEMPO_MAX:
+            stream = stream.filter("atempo", ATEMPO_MAX)
+            tempo /= ATEMPO_MAX
+        while tempo < ATEMPO_MIN:
+            stream = stream.filter("atempo", ATEMPO_MIN)
+            tempo /= ATEMPO_MIN
+        return stream.filter("atempo", round(tempo, 4))
+    
+    def get_audio_duration(self, audio_path: str) -> float:
+        """Get audio duration in seconds"""
+        try:
+            probe = ffmpeg.probe(audio_path)
+            return float(probe['format']['duration'])
+        except:
+            return 0.0
+    
     def get_video_duration(self, video_path: str) -> float:
-        """Get video duration in seconds"""
+        """
+        Get video duration in seconds (0.0 if unknown)
+        
+        MKV and WebM keep no duration on their streams, so the container's
+        duration is used when the first stream has none.
+        """
         try:
             probe = ffmpeg.probe(video_path)
-            duration = float(probe['streams'][0]['duration'])
-            return duration
         except:
-            return 0.0
\ No newline at end of file
+            return 0.0
+        streams = probe.get('streams') or [{}]
+        for duration in (streams[0].get('duration'), probe.get('format', {}).get('duration')):
+            try:
+                if float(duration) > 0:
+                    return float(duration)
+            except (TypeError, ValueError):
+                continue
+        return 0.0
\ No newline at end of file
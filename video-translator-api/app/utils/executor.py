@@ -0,0 +1,50 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TaskExecutor:
+    """Run blocking work off the event loop
+
+    Two bounded pools keep slow work from starving each other:
+    - io: network-bound provider calls (Deepgram, Google Translate, DeepL) and file copies
+    - ffmpeg: FFmpeg/ffprobe invocations. Each call spawns its own ffmpeg
+      subprocess, so a thread only waits on it; the pool size caps how many
+      encodes run at once (default: one per CPU).
+    """
+
+    def __init__(self, io_workers: int = None, ffmpeg_workers: int = None):
+        """
+        Args:
+            io_workers: Threads for network calls (env IO_POOL_WORKERS, default 16)
+            ffmpeg_workers: Concurrent FFmpeg processes (env FFMPEG_POOL_WORKERS, default CPU count)
+        """
+        self.io_workers = io_workers or int(os.getenv("IO_POOL_WORKERS", "16"))
+        self.ffmpeg_workers = ffmpeg_workers or int(
+            os.getenv("FFMPEG_POOL_WORKERS", str(os.cpu_count() or 2))
+        )
+
+        self._io_pool = ThreadPoolExecutor(
+            max_workers=self.io_workers, thread_name_prefix="io"
+        )
+        self._ffmpeg_pool = ThreadPoolExecutor(
+            max_workers=self.ffmpeg_workers, thread_name_prefix="ffmpeg"
+        )
+
+    async def run_io(self, func, *args, **kwargs):
+        """Run a blocking network/file call in the io pool"""
+        return await self._run(self._io_pool, func, *args, **kwargs)
+
+    async def run_ffmpeg(self, func, *args, **kwargs):
+        """Run a blocking FFmpeg call in the ffmpeg pool"""
+        return await self._run(self._ffmpeg_pool, func, *args, **kwargs)
+
+    async def _run(self, pool, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(pool, functools.partial(func, *args, **kwargs))
+
+    def shutdown(self):
+        """Stop accepting work and wait for running calls"""
+        self._io_pool.shutdown(wait=True, cancel_futures=True)
+        self._ffmpeg_pool.shutdown(wait=True, cancel_futures=True)
@@ -1,56 +1,150 @@
+import logging
 import os
 import uuid
-import shutil
+import hashlib
+import zipfile
+import aiofiles
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import AsyncIterator, Dict, Optional
 from fastapi import UploadFile
 
+from app.utils.metrics import BYTES_PROCESSED, time_stage
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds the configured size limit"""
+
+
+@dataclass
+class SavedUpload:
+    """A file written to the upload directory"""
+    path: str
+    sha256: str
+    size: int
+
+
 class FileHandler:
     """Handle file uploads and cleanup"""
     
-    def __init__(self, upload_dir: str = "/tmp/uploads", output_dir: str = "/tmp/outputs"):
+    def __init__(self, upload_dir: str = "/tmp/uploads", output_dir: str = "/tmp/outputs", max_upload_mb: int = None):
         self.upload_dir = Path(upload_dir)
         self.output_dir = Path(output_dir)
+        self.max_upload_bytes = (max_upload_mb or int(os.getenv("MAX_UPLOAD_MB", "500"))) * 1024 * 1024
         
         # Create directories if they don't exist
         self.upload_dir.mkdir(parents=True, exist_ok=True)
         self.output_dir.mkdir(parents=True, exist_ok=True)
     
-    def save_upload(self, file: UploadFile, prefix: str = "video") -> str:
+    async def save_upload_async(self, file: UploadFile, prefix: str = "video") -> SavedUpload:
         """
-        Save uploaded file with unique name
+        Stream an uploaded file to disk in chunks without blocking the event loop
         
         Args:
             file: Uploaded file from FastAPI
             prefix: Filename prefix
             
         Returns:
-            Path to saved file
+            SavedUpload with path, SHA-256 content hash and size
+            
+        Raises:
+            UploadTooLargeError: If the upload exceeds max_upload_bytes
+        """
+        # Reject early when the client sent a size
+        if file.size is not None and file.size > self.max_upload_bytes:
+            raise UploadTooLargeError(self._too_large_message())
+        
+        async def chunks():
+            while True:
+                chunk = await file.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+        
+        return await self.save_stream(chunks(), Path(file.filename or "").suffix, prefix)
+    
+    async def save_stream(self, chunks: AsyncIterator[bytes], file_ext: str, prefix: str = "video") -> SavedUpload:
+        """
+        Write an async byte stream to the upload directory
+        
+        The size limit is enforced and the SHA-256 hash computed while the
+        bytes arrive, so the file is written once and never re-read.
+        
+        Args:
+            chunks: Async iterator of byte chunks (UploadFile reads, request.stream())
+            file_ext: File extension including the dot
+            prefix: Filename prefix
+            
+        Returns:
+            SavedUpload with path, SHA-256 content hash and size
+            
+        Raises:
+            UploadTooLargeError: If the stream exceeds max_upload_bytes (partial file is removed)
         """
-        # Generate unique filename
-        file_ext = Path(file.filename).suffix
         unique_name = f"{prefix}_{uuid.uuid4().hex[:8]}{file_ext}"
         file_path = self.upload_dir / unique_name
         
-        # Save file
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        digest = hashlib.sha256()
+        size = 0
         
-        return str(file_path)
+        try:
+            with time_stage("save"):
+                async with aiofiles.open(file_path, "wb") as buffer:
+                    async for chunk in chunks:
+                        size += len(chunk)
+                        if size > self.max_upload_bytes:
+                            raise UploadTooLargeError(self._too_large_message())
+                        digest.update(chunk)
+                        await buffer.write(chunk)
+        except BaseException:
+            self.cleanup_file(str(file_path))
+            raise
+        
+        BYTES_PROCESSED.labels("upload").inc(size)
+        return SavedUpload(path=str(file_path), sha256=digest.hexdigest(), size=size)
+    
+    def _too_large_message(self) -> str:
+        return f"File too large (max {self.max_upload_bytes // (1024 * 1024)} MB, set by MAX_UPLOAD_MB)"
     
     def get_output_path(self, prefix: str, extension: str) -> str:
         """Generate output file path"""
         unique_name = f"{prefix}_{uuid.uuid4().hex[:8]}{extension}"
         return str(self.output_dir / unique_name)
     
+    def create_zip(self, prefix: str, files: Dict[str, str], texts: Dict[str, str] = None) -> str:
+        """
+        Bundle output files into a zip archive
+        
+        Args:
+            prefix: Filename prefix of the archive
+            files: Archive name -> path on disk (stored, media is already compressed)
+            texts: Archive name -> text content (e.g. a JSON manifest)
+            
+        Returns:
+            Path to the zip file
+        """
+        zip_path = self.get_output_path(prefix, ".zip")
+        
+        with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_STORED) as archive:
+            for name, path in files.items():
+                archive.write(path, arcname=name)
+            for name, content in (texts or {}).items():
+                archive.writestr(name, content, compress_type=zipfile.ZIP_DEFLATED)
+        
+        return zip_path
+    
     def cleanup_file(self, file_path: str):
         """Delete file if exists"""
         try:
             if os.path.exists(file_path):
                 os.remove(file_path)
-                print(f"✓ Cleaned up: {file_path}")
+                logger.debug(f"Cleaned up: {file_path}")
         except Exception as e:
-            print(f"✗ Cleanup error: {e}")
+            logger.error(f"Cleanup error: {e}")
     
     def cleanup_files(self, *file_paths):
         """Delete multiple files"""
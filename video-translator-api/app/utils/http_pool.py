@@ -0,0 +1,262 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+import weakref
+from typing import Callable, Dict, Optional
+
+import httpx
+
+from app.utils.metrics import HTTP_POOL_CONNECTIONS, HTTP_POOL_IN_FLIGHT, HTTP_POOL_WAIT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+def http2_available() -> bool:
+    """httpx speaks HTTP/2 only with the optional h2 package"""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class _ReleasingStream(httpx.SyncByteStream):
+    """Response body that gives the host slot back when it is closed"""
+
+    def __init__(self, stream: httpx.SyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release = release
+
+    def __iter__(self):
+        yield from self._stream
+
+    def close(self):
+        try:
+            self._stream.close()
+        finally:
+            self._release()
+
+
+class _HostLimitedTransport(httpx.BaseTransport):
+    """Caps concurrent requests per host on top of the shared connection pool
+
+    A slot is held from sending the request until its body is closed;
+    callers past the limit wait up to the pool timeout.
+    """
+
+    def __init__(self, transport: httpx.HTTPTransport, max_per_host: int, pool_timeout: float):
+        self._transport = transport
+        self._max_per_host = max_per_host
+        self._pool_timeout = pool_timeout
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        slot = self._slot(host)
+
+        start = time.perf_counter()
+        if not slot.acquire(timeout=self._pool_timeout):
+            raise httpx.PoolTimeout(f"No free connection slot for {host}", request=request)
+        HTTP_POOL_WAIT_SECONDS.labels(host).observe(time.perf_counter() - start)
+        HTTP_POOL_IN_FLIGHT.labels(host).inc()
+
+        released = False
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                HTTP_POOL_IN_FLIGHT.labels(host).dec()
+                slot.release()
+
+        try:
+            response = self._transport.handle_request(request)
+        except BaseException:
+            release()
+            raise
+
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_ReleasingStream(response.stream, release),
+            extensions=response.extensions,
+        )
+
+    def close(self):
+        self._transport.close()
+
+    def connection_counts(self) -> Dict[str, int]:
+        """Open connections by state (best effort, reads httpcore's pool)"""
+        pool = getattr(self._transport, "_pool", None)
+        connections = list(getattr(pool, "connections", []))
+        idle = sum(1 for connection in connections if connection.is_idle())
+        return {"active": len(connections) - idle, "idle": idle}
+
+    def _slot(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            slot = self._slots.get(host)
+            if slot is None:
+                slot = self._slots[host] = threading.BoundedSemaphore(self._max_per_host)
+            return slot
+
+
+class HTTPPool:
+    """Connections shared by every external client in this worker
+
+    - client: one httpx.Client (thread-safe) for the blocking provider
+      calls made from the io pool: Deepgram and Google Translate. Keep-alive
+      connections are reused across requests, so the TLS handshake is paid
+      once per host instead of once per call, and HTTP/2 is used when the
+      h2 package is installed.
+    - aiohttp_connector(): one aiohttp connector per event loop for
+      Edge-TTS. Its websockets can't be reused (one synthesis per socket),
+      but DNS results and the per-host limit are shared.
+    """
+
+    def __init__(self, max_connections: int = None, max_per_host: int = None, keepalive: float = None,
+                 connect_timeout: float = None, read_timeout: float = None, http2: bool = None):
+        """
+        Args:
+            max_connections: Open connections across all hosts (env HTTP_MAX_CONNECTIONS, default 100)
+            max_per_host: Concurrent requests per host (env HTTP_MAX_PER_HOST, default 20)
+            keepalive: Seconds an idle connection is kept (env HTTP_KEEPALIVE_SECONDS, default 30)
+            connect_timeout: Connect and pool-wait timeout (env HTTP_CONNECT_TIMEOUT, default 10)
+            read_timeout: Default read/write timeout (env HTTP_READ_TIMEOUT, default 60)
+            http2: Negotiate HTTP/2 (env HTTP2, default: when h2 is installed)
+        """
+        self.max_connections = max_connections or int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+        self.max_per_host = max_per_host or int(os.getenv("HTTP_MAX_PER_HOST", "20"))
+        self.keepalive = keepalive or float(os.getenv("HTTP_KEEPALIVE_SECONDS", "30"))
+        self.connect_timeout = connect_timeout or float(os.getenv("HTTP_CONNECT_TIMEOUT", "10"))
+        self.read_timeout = read_timeout or float(os.getenv("HTTP_READ_TIMEOUT", "60"))
+        if http2 is None:
+            http2 = os.getenv("HTTP2", "auto").lower()
+            http2 = http2_available() if http2 == "auto" else http2 == "true"
+        self.http2 = http2
+
+        self._client: Optional[httpx.Client] = None
+        self._transport: Optional[_HostLimitedTransport] = None
+        # Event loop -> connector. A connector references its loop, so weak keys alone never
+        # let go: connectors of closed loops are also dropped on the next lookup.
+        self._connectors = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+        HTTP_POOL_CONNECTIONS.labels("httpx", "active").set_function(lambda: self._counts()["active"])
+        HTTP_POOL_CONNECTIONS.labels("httpx", "idle").set_function(lambda: self._counts()["idle"])
+
+    @property
+    def client(self) -> httpx.Client:
+        """The shared blocking client, created on first use"""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._transport = _HostLimitedTransport(
+                        httpx.HTTPTransport(
+                            http2=self.http2,
+                            limits=httpx.Limits(
+                                max_connections=self.max_connections,
+                                max_keepalive_connections=self.max_connections,
+                                keepalive_expiry=self.keepalive,
+                            ),
+                        ),
+                        self.max_per_host,
+                        self.connect_timeout,
+                    )
+                    self._client = httpx.Client(
+                        transport=self._transport,
+                        timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout,
+                                              pool=self.connect_timeout),
+                        follow_redirects=True,
+                    )
+                    logger.info(
+                        f"HTTP pool: {self.max_connections} connections, {self.max_per_host} per host"
+                        f"{', HTTP/2' if self.http2 else ''}"
+                    )
+        return self._client
+
+    def timeout(self, read: float) -> httpx.Timeout:
+        """The pool's connect timeout with a longer read timeout (large uploads)"""
+        return httpx.Timeout(read, connect=self.connect_timeout, pool=self.connect_timeout)
+
+    def aiohttp_connector(self):
+        """The shared aiohttp connector for the running event loop"""
+        loop = asyncio.get_running_loop()
+        for closed in [other for other in self._connectors if other.is_closed()]:
+            del self._connectors[closed]  # Its sockets died with the loop
+        connector = self._connectors.get(loop)
+        if connector is None or connector.closed:
+            connector = self._connectors[loop] = _shared_connector_class()(
+                limit=self.max_connections,
+                limit_per_host=self.max_per_host,
+                keepalive_timeout=self.keepalive,
+                ttl_dns_cache=300,
+            )
+        return connector
+
+    def stats(self) -> dict:
+        return {
+            "http2": self.http2,
+            "max_connections": self.max_connections,
+            "max_per_host": self.max_per_host,
+            "connections": self._counts(),
+        }
+
+    async def aclose(self):
+        """Close every connection (call once, at shutdown)"""
+        for connector in list(self._connectors.values()):
+            await connector.shutdown()
+        self._connectors.clear()
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+                self._transport = None
+
+    def _counts(self) -> Dict[str, int]:
+        if self._transport is None:
+            return {"active": 0, "idle": 0}
+        try:
+            return self._transport.connection_counts()
+        except Exception:
+            return {"active": 0, "idle": 0}
+
+
+_connector_class = None
+
+
+def _shared_connector_class():
+    """aiohttp.TCPConnector that ignores close() from the sessions using it
+
+    aiohttp sessions close their connector when they exit, and Edge-TTS
+    opens a session per synthesis; only HTTPPool.aclose() really closes it.
+    aiohttp is imported lazily since only Edge-TTS needs it.
+    """
+    global _connector_class
+    if _connector_class is None:
+        import aiohttp
+
+        class SharedTCPConnector(aiohttp.TCPConnector):
+            async def close(self):
+                pass
+
+            async def shutdown(self):
+                await super().close()
+
+        _connector_class = SharedTCPConnector
+    return _connector_class
+
+
+_shared_pool: Optional[HTTPPool] = None
+_shared_lock = threading.Lock()
+
+
+def shared_pool() -> HTTPPool:
+    """The worker's HTTPPool, created on first use"""
+    global _shared_pool
+    with _shared_lock:
+        if _shared_pool is None:
+            _shared_pool = HTTPPool()
+        return _shared_pool
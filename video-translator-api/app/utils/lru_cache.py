@@ -0,0 +1,64 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from app.utils.metrics import count_lookup
+
+
+class LRUCache:
+    """Thread-safe in-memory LRU cache with an optional time-to-live"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float = None, name: str = None):
+        """
+        Args:
+            max_entries: Entries kept before the least recently used is dropped
+            ttl_seconds: Entry lifetime (None keeps entries until evicted)
+            name: Label for the cache_lookups_total metric (None: not exported)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (expires_at, value)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None when missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            hit = entry is not None and (entry[0] is None or entry[0] > time.monotonic())
+            if hit:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+
+        if self.name:
+            count_lookup(self.name, hit)
+        return entry[1] if hit else None
+
+    def set(self, key: Hashable, value: Any):
+        """Store a value, evicting the least recently used entry if full"""
+        if self.max_entries <= 0:
+            return
+
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size"""
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -0,0 +1,152 @@
+import asyncio
+import time
+from contextlib import contextmanager
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# Label value for stages that aren't tied to one language
+ANY_LANG = "any"
+
+# Sub-second API calls up to multi-minute FFmpeg runs
+DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+STAGE_SECONDS = Histogram(
+    "pipeline_stage_seconds",
+    "Time spent in a pipeline stage (save, extract, vad, stt, translate, tts, fit, subtitles, mix, merge)",
+    ["stage", "source_lang", "target_lang"],
+    buckets=DURATION_BUCKETS
+)
+
+PIPELINE_RUNS = Counter(
+    "pipeline_runs_total",
+    "Video translations per target language by outcome (completed, cached, failed)",
+    ["target_lang", "status"]
+)
+
+BYTES_PROCESSED = Counter(
+    "pipeline_bytes_total",
+    "Bytes handled by the pipeline (upload, audio, output)",
+    ["kind"]
+)
+
+CACHE_LOOKUPS = Counter(
+    "cache_lookups_total",
+    "Cache lookups by cache and result (hit, miss)",
+    ["cache", "result"]
+)
+
+EXTERNAL_SECONDS = Histogram(
+    "external_api_seconds",
+    "Latency of calls to STT, translation and TTS providers",
+    ["provider", "operation"],
+    buckets=DURATION_BUCKETS
+)
+
+EXTERNAL_ERRORS = Counter(
+    "external_api_errors_total",
+    "Failed calls to STT, translation and TTS providers",
+    ["provider", "operation"]
+)
+
+STT_AUDIO_SECONDS = Counter(
+    "stt_audio_seconds_total",
+    "Audio seen by the VAD pre-pass by kind (speech sent to STT, silence skipped)",
+    ["kind"]
+)
+
+DUB_CLIPS_FITTED = Counter(
+    "dub_clips_fitted_total",
+    "Dub clips by how they were fitted to the source timing (none, atempo, rate)",
+    ["method"]
+)
+
+JOB_QUEUE_DEPTH = Gauge(
+    "job_queue_depth",
+    "Background jobs waiting for a worker"
+)
+
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "How late the event loop runs a scheduled wake-up (blocking work on the loop)",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+)
+
+STORAGE_BYTES = Gauge(
+    "storage_used_bytes",
+    "Bytes in the upload and output directories as of the last scan"
+)
+
+STORAGE_EVICTIONS = Counter(
+    "storage_evictions_total",
+    "Temp files removed by the storage janitor by reason (ttl, orphan, quota)",
+    ["reason"]
+)
+
+STORAGE_REJECTIONS = Counter(
+    "storage_rejections_total",
+    "Requests rejected because the temp-file quota or disk was full"
+)
+
+HTTP_POOL_CONNECTIONS = Gauge(
+    "http_pool_connections",
+    "Open connections in the shared HTTP pool by state (active, idle)",
+    ["client", "state"]
+)
+
+HTTP_POOL_IN_FLIGHT = Gauge(
+    "http_pool_in_flight",
+    "Requests holding a per-host slot in the shared HTTP pool",
+    ["host"]
+)
+
+HTTP_POOL_WAIT_SECONDS = Histogram(
+    "http_pool_wait_seconds",
+    "Time spent waiting for a per-host slot in the shared HTTP pool",
+    ["host"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10)
+)
+
+
+def observe_stage(stage: str, seconds: float, source_lang: str = ANY_LANG, target_lang: str = ANY_LANG):
+    """Record one run of a pipeline stage"""
+    STAGE_SECONDS.labels(stage, source_lang, target_lang).observe(seconds)
+
+
+@contextmanager
+def time_stage(stage: str, source_lang: str = ANY_LANG, target_lang: str = ANY_LANG):
+    """Time a pipeline stage; failed runs aren't recorded (see the error counters)"""
+    start = time.perf_counter()
+    yield
+    observe_stage(stage, time.perf_counter() - start, source_lang, target_lang)
+
+
+def observe_call(provider: str, operation: str, seconds: float, ok: bool = True):
+    """Record one call to an external provider"""
+    EXTERNAL_SECONDS.labels(provider, operation).observe(seconds)
+    if not ok:
+        EXTERNAL_ERRORS.labels(provider, operation).inc()
+
+
+@contextmanager
+def track_call(provider: str, operation: str):
+    """Time a call to an external provider and count it as an error if it raises"""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        observe_call(provider, operation, time.perf_counter() - start, ok=False)
+        raise
+    observe_call(provider, operation, time.perf_counter() - start)
+
+
+def count_lookup(cache: str, hit: bool):
+    """Record a cache hit or miss"""
+    CACHE_LOOKUPS.labels(cache, "hit" if hit else "miss").inc()
+
+
+async def monitor_event_loop(interval: float = 0.1):
+    """Sample event loop lag until cancelled (run as a background task)"""
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(0.0, time.perf_counter() - start - interval))
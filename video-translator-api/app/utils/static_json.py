@@ -0,0 +1,31 @@
+import hashlib
+import json
+
+from fastapi import Request, Response
+
+
+class StaticJSON:
+    """A JSON body serialized once, served with an ETag and Cache-Control
+
+    For responses that only change on deploy (e.g. the language lists):
+    no per-request serialization, and clients that send If-None-Match
+    get a 304 without a body.
+    """
+
+    def __init__(self, content, max_age: int = 3600):
+        """
+        Args:
+            content: JSON-serializable value
+            max_age: Seconds clients and proxies may cache the response
+        """
+        # Same encoding as FastAPI's JSONResponse
+        self.body = json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+        self.headers = {"ETag": self.etag, "Cache-Control": f"public, max-age={max_age}"}
+
+    def response(self, request: Request) -> Response:
+        """200 with the body, or 304 if the client already has this version"""
+        if_none_match = request.headers.get("if-none-match", "")
+        if self.etag in (tag.strip() for tag in if_none_match.split(",")) or if_none_match.strip() == "*":
+            return Response(status_code=304, headers=self.headers)
+        return Response(self.body, media_type="application/json", headers=self.headers)
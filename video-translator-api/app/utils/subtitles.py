@@ -0,0 +1,165 @@
+import math
+from dataclasses import dataclass
+from typing import List
+
+from app.models.schemas import Segment
+from app.utils.text_utils import split_sentences
+
+# Format -> media type of the subtitle file
+SUBTITLE_FORMATS = {
+    "srt": "application/x-subrip",
+    "vtt": "text/vtt",
+}
+
+# Reading speed used to time segments that carry no timing of their own
+CHARS_PER_SECOND = 15
+
+
+@dataclass
+class Cue:
+    """One subtitle on screen"""
+    start: float
+    end: float
+    text: str  # Lines separated by "\n"
+
+
+def build_cues(segments: List[Segment], max_chars: int = 42, max_lines: int = 2,
+               max_duration: float = 7.0, min_duration: float = 1.0) -> List[Cue]:
+    """
+    Cut translated segments into subtitle cues
+
+    A segment whose text doesn't fit one cue (max_lines of max_chars) or
+    stays on screen longer than max_duration is split at sentence ends,
+    then spaces. Each piece is timed by its share of the text: with
+    source word timings the boundary snaps to the nearest word, otherwise
+    it is interpolated across the segment (also when a short piece would
+    snap to a single instant). Cues last at least min_duration where the
+    next cue leaves room.
+
+    Args:
+        segments: Translated segments (their words are the source's timings)
+        max_chars: Characters per line
+        max_lines: Lines per cue
+        max_duration: Longest time a cue stays on screen
+        min_duration: Shortest time a cue stays on screen
+
+    Returns:
+        Cues in order, not overlapping, each ending after it starts
+    """
+    cues: List[Cue] = []
+    position = 0.0
+    for segment in segments:
+        text = " ".join(segment.text.split())
+        if not text:
+            continue
+
+        start, end = segment.start, segment.end
+        if end <= start:  # Untimed: place after the previous cue at reading speed
+            start = max(start, position)
+            end = start + max(len(text) / CHARS_PER_SECOND, min_duration)
+
+        # Aim for equal pieces; the slack keeps a short tail from spilling into a piece of its own
+        pieces = max(math.ceil(len(text) / (max_chars * max_lines)), math.ceil((end - start) / max_duration), 1)
+        limit = max(math.ceil(len(text) / pieces * 1.15), max_chars)
+        chunks = split_sentences(text, min(max_chars * max_lines, limit))
+
+        total = sum(len(chunk) for chunk in chunks)
+        done = 0
+        for chunk in chunks:
+            first, last = done / total, (done + len(chunk)) / total
+            done += len(chunk)
+            cue_start = _time_at(segment, first, start, end, edge="start")
+            cue_end = _time_at(segment, last, start, end, edge="end")
+            if cue_end <= cue_start:  # A short chunk snapped to one word: time it by its share instead
+                cue_start, cue_end = start + first * (end - start), start + last * (end - start)
+            cues.append(Cue(start=cue_start, end=cue_end, text=_wrap(chunk, max_chars, max_lines)))
+        position = cues[-1].end
+
+    # Enforce order, minimum duration and no overlaps
+    ordered: List[Cue] = []
+    for cue in cues:
+        if ordered:
+            cue.start = max(cue.start, ordered[-1].end)
+            if cue.end <= cue.start:  # Nothing left of it on screen: show its text with the previous cue
+                previous = ordered[-1]
+                previous.text = _wrap(" ".join(f"{previous.text} {cue.text}".split()), max_chars, max_lines)
+                continue
+        ordered.append(cue)
+    for i, cue in enumerate(ordered):
+        limit = ordered[i + 1].start if i + 1 < len(ordered) else math.inf
+        cue.end = max(cue.end, min(cue.start + min_duration, max(limit, cue.start)))
+    return ordered
+
+
+def format_srt(cues: List[Cue]) -> str:
+    """SubRip text"""
+    blocks = [
+        f"{i}\n{_timestamp(cue.start, ',')} --> {_timestamp(cue.end, ',')}\n{cue.text}\n"
+        for i, cue in enumerate(cues, 1)
+    ]
+    return "\n".join(blocks)
+
+
+def format_vtt(cues: List[Cue]) -> str:
+    """WebVTT text"""
+    blocks = [f"{_timestamp(cue.start, '.')} --> {_timestamp(cue.end, '.')}\n{cue.text}\n" for cue in cues]
+    return "\n".join(["WEBVTT\n", *blocks])
+
+
+def write_subtitles(cues: List[Cue], subtitle_format: str, output_path: str) -> str:
+    """Write cues as srt or vtt (UTF-8)"""
+    if subtitle_format not in SUBTITLE_FORMATS:
+        raise ValueError(f"Unsupported subtitle format: {subtitle_format}")
+    text = format_srt(cues) if subtitle_format == "srt" else format_vtt(cues)
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return output_path
+
+
+def _time_at(segment: Segment, fraction: float, start: float, end: float, edge: str) -> float:
+    """Time at a fraction of the segment's text, snapped to a word boundary when words are known"""
+    words = segment.words
+    if not words:
+        return start + fraction * (end - start)
+
+    # Word boundaries by share of the source characters
+    lengths = [len(word.text) + 1 for word in words]
+    total = sum(lengths)
+    target = fraction * total
+    boundary, position = 0, 0
+    for i, length in enumerate(lengths):
+        if abs(position + length - target) < abs(position - target):
+            boundary = i + 1
+        position += length
+
+    if edge == "start":
+        return words[boundary].start if boundary < len(words) else words[-1].end
+    return words[boundary - 1].end if boundary > 0 else words[0].start
+
+
+def _wrap(text: str, max_chars: int, max_lines: int) -> str:
+    """Break a cue into lines of about equal length, at spaces where there are any"""
+    lines_needed = min(math.ceil(len(text) / max_chars), max_lines)
+    if lines_needed <= 1:
+        return text
+    width = math.ceil(len(text) / lines_needed)
+    if " " not in text:  # e.g. Chinese
+        return "\n".join(text[i:i + width] for i in range(0, len(text), width))
+
+    lines, current = [], ""
+    for word in text.split():
+        if current and len(current) + 1 + len(word) > width and len(lines) < lines_needed - 1:
+            lines.append(current)
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+    lines.append(current)
+    return "\n".join(lines)
+
+
+def _timestamp(seconds: float, separator: str) -> str:
+    millis = max(int(round(seconds * 1000)), 0)
+    hours, millis = divmod(millis, 3_600_000)
+    minutes, millis = divmod(millis, 60_000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
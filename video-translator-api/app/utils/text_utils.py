@@ -0,0 +1,41 @@
+import re
+from typing import List
+
+# Sentence ends: Latin punctuation followed by whitespace, or CJK/Devanagari/Arabic full stops
+SENTENCE_END = re.compile(r"(?<=[.!?;])\s+|(?<=[。！？；।؟])")
+
+
+def split_sentences(text: str, max_chars: int) -> List[str]:
+    """
+    Split text at sentence boundaries into chunks of at most max_chars
+    
+    Consecutive short sentences are packed into one chunk; a single
+    sentence longer than max_chars is split at the last space before the limit.
+    """
+    chunks = []
+    current = ""
+    
+    for sentence in SENTENCE_END.split(text.strip()):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars)
+            if cut <= 0:
+                cut = max_chars
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    
+    if current:
+        chunks.append(current)
+    return chunks
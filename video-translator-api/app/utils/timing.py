@@ -0,0 +1,69 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+
+class StageTimer:
+    """Wall-clock spans of pipeline stages, relative to when the timer was created
+
+    A stage entered several times (once per window or segment) spans from
+    its first start to its last end, and its busy time sums the individual
+    runs, so overlapping stages show up as overlapping spans.
+    """
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._spans: Dict[str, list] = {}  # stage -> [first_start, last_end, busy, runs]
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time one run of a stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter())
+
+    def record(self, name: str, start: float, end: float):
+        """Add one run of a stage (perf_counter timestamps)"""
+        with self._lock:
+            span = self._spans.get(name)
+            if span is None:
+                self._spans[name] = [start, end, end - start, 1]
+            else:
+                span[0] = min(span[0], start)
+                span[1] = max(span[1], end)
+                span[2] += end - start
+                span[3] += 1
+
+    def elapsed(self) -> float:
+        """Seconds since the timer was created"""
+        return time.perf_counter() - self.origin
+
+    def report(self) -> Dict[str, dict]:
+        """Stage -> start/end offsets, busy seconds and run count, in start order"""
+        with self._lock:
+            spans = sorted(self._spans.items(), key=lambda item: item[1][0])
+            return {
+                name: {
+                    "start": round(start - self.origin, 3),
+                    "end": round(end - self.origin, 3),
+                    "busy": round(busy, 3),
+                    "runs": runs,
+                }
+                for name, (start, end, busy, runs) in spans
+            }
+
+    def log_report(self):
+        """Log the breakdown as a timeline"""
+        lines = [
+            f"  {name:<12} {span['start']:8.2f} → {span['end']:8.2f}  busy {span['busy']:7.2f}  runs {span['runs']}"
+            for name, span in self.report().items()
+        ]
+        lines.append(f"  {'total':<12} {self.elapsed():8.2f}")
+        logger.info("Stage timings (s from start):\n" + "\n".join(lines))
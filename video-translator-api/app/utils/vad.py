@@ -0,0 +1,279 @@
+import bisect
+import logging
+import os
+import wave
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.models.schemas import Segment
+
+logger = logging.getLogger(__name__)
+
+# Frames read from a WAV file per block; energies are kept, samples are not
+READ_BLOCK_SECONDS = 10
+
+
+@dataclass
+class SpeechMap:
+    """Speech regions of a recording, and how its trimmed copy lines up with it
+
+    The trimmed copy (see VoiceActivityDetector.write_speech / speech_pcm)
+    is the regions back to back with `gap` seconds of silence between
+    them, so the STT engine still hears a pause between sentences.
+    to_source() maps a time in the trimmed copy back to the recording.
+    """
+    regions: List[Tuple[float, float]]
+    duration: float
+    gap: float = 0.3
+    _trimmed_starts: List[float] = field(default_factory=list, init=False, repr=False)
+
+    def __post_init__(self):
+        position = 0.0
+        for start, end in self.regions:
+            self._trimmed_starts.append(position)
+            position += end - start + self.gap
+
+    @property
+    def speech_seconds(self) -> float:
+        return sum(end - start for start, end in self.regions)
+
+    @property
+    def silence_seconds(self) -> float:
+        return max(self.duration - self.speech_seconds, 0.0)
+
+    @property
+    def onset(self) -> float:
+        """Start of the first speech, 0.0 without speech"""
+        return self.regions[0][0] if self.regions else 0.0
+
+    @property
+    def end(self) -> float:
+        """End of the last speech, 0.0 without speech"""
+        return self.regions[-1][1] if self.regions else 0.0
+
+    def silences(self) -> List[Tuple[float, float]]:
+        """The gaps between (and around) the speech regions"""
+        silences = []
+        position = 0.0
+        for start, end in self.regions:
+            if start > position:
+                silences.append((position, start))
+            position = end
+        if self.duration > position:
+            silences.append((position, self.duration))
+        return silences
+
+    def to_source(self, t: float, forward: bool = False) -> float:
+        """
+        Map a time in the trimmed copy to the recording
+
+        A time inside an inserted gap snaps to the end of the region
+        before it, or with forward=True to the start of the next one.
+        """
+        if not self.regions:
+            return t
+        i = max(bisect.bisect_right(self._trimmed_starts, t) - 1, 0)
+        start, end = self.regions[i]
+        offset = max(t - self._trimmed_starts[i], 0.0)
+        if offset <= end - start:
+            return start + offset
+        if forward and i + 1 < len(self.regions):
+            return self.regions[i + 1][0]
+        return end
+
+    def remap(self, segments: Iterable[Segment]) -> List[Segment]:
+        """Segments timed on the trimmed copy, moved to the recording's timeline"""
+        return [self._remap_span(segment, words=True) for segment in segments]
+
+    def _remap_span(self, span, words: bool = False):
+        """A copy of a segment or word with start/end (and its words) mapped back"""
+        start = self.to_source(span.start, forward=True)
+        update = {"start": round(start, 3), "end": round(max(self.to_source(span.end), start), 3)}
+        if words and span.words:
+            update["words"] = [self._remap_span(word) for word in span.words]
+        return span.model_copy(update=update)
+
+    def to_dict(self) -> dict:
+        return {"regions": [list(region) for region in self.regions], "duration": self.duration, "gap": self.gap}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SpeechMap":
+        return cls([tuple(region) for region in data["regions"]], data["duration"], data.get("gap", 0.3))
+
+    @classmethod
+    def whole_wav(cls, path: str) -> Optional["SpeechMap"]:
+        """
+        A 16-bit PCM WAV file as one speech region, without detection (VAD off)
+
+        Returns:
+            SpeechMap, or None if the file isn't 16-bit PCM WAV
+        """
+        try:
+            with wave.open(path, "rb") as wav:
+                if wav.getsampwidth() != 2:
+                    return None
+                duration = wav.getnframes() / wav.getframerate()
+        except (wave.Error, EOFError):
+            return None
+        return cls([(0.0, duration)] if duration > 0 else [], duration)
+
+
+class VoiceActivityDetector:
+    """Energy-based voice activity detection over 16-bit PCM, vectorized with NumPy
+
+    The audio is cut into frames and each frame's RMS level (dBFS) is
+    compared to a threshold: threshold_db, raised to margin_db above the
+    noise floor (10th percentile of frame levels) when the recording has
+    a steady background such as a music bed. A recording with almost no
+    dynamic range is treated as all speech, since loudness alone can't
+    tell there. Speech runs closer than min_silence are joined, runs
+    shorter than min_speech dropped, and the rest padded on both sides.
+
+    This is a cost filter, not a transcript: it errs towards keeping audio.
+    """
+
+    def __init__(self, frame_ms: int = None, threshold_db: float = None, margin_db: float = None,
+                 min_speech_ms: int = None, min_silence_ms: int = None, padding_ms: int = None,
+                 gap_ms: int = None, min_trim: float = None):
+        """
+        Args:
+            frame_ms: Analysis frame length (env VAD_FRAME_MS, default 30)
+            threshold_db: Level below which a frame is silence, in dBFS (env VAD_THRESHOLD_DB, default -45)
+            margin_db: Level above the noise floor speech must reach (env VAD_MARGIN_DB, default 8)
+            min_speech_ms: Shorter speech runs are dropped (env VAD_MIN_SPEECH_MS, default 200)
+            min_silence_ms: Shorter pauses are kept as speech (env VAD_MIN_SILENCE_MS, default 600)
+            padding_ms: Audio kept before and after each region (env VAD_PADDING_MS, default 200)
+            gap_ms: Silence between regions in the trimmed copy (env VAD_GAP_MS, default 300)
+            min_trim: Fraction of silence below which audio is sent untrimmed (env VAD_MIN_TRIM, default 0.1)
+        """
+        self.frame_ms = frame_ms or int(os.getenv("VAD_FRAME_MS", "30"))
+        self.threshold_db = threshold_db if threshold_db is not None else float(os.getenv("VAD_THRESHOLD_DB", "-45"))
+        self.margin_db = margin_db if margin_db is not None else float(os.getenv("VAD_MARGIN_DB", "8"))
+        self.min_speech = (min_speech_ms or int(os.getenv("VAD_MIN_SPEECH_MS", "200"))) / 1000
+        self.min_silence = (min_silence_ms or int(os.getenv("VAD_MIN_SILENCE_MS", "600"))) / 1000
+        self.padding = (padding_ms if padding_ms is not None else int(os.getenv("VAD_PADDING_MS", "200"))) / 1000
+        self.gap = (gap_ms if gap_ms is not None else int(os.getenv("VAD_GAP_MS", "300"))) / 1000
+        self.min_trim = min_trim if min_trim is not None else float(os.getenv("VAD_MIN_TRIM", "0.1"))
+
+    def detect_pcm(self, pcm: bytes, sample_rate: int = 16000, channels: int = 1) -> SpeechMap:
+        """Speech regions of raw s16le samples"""
+        frame = self._frame_size(sample_rate)
+        samples = np.frombuffer(pcm[:len(pcm) - len(pcm) % 2], dtype="<i2")
+        levels = self._levels(samples[:len(samples) - len(samples) % (frame * channels)], frame, channels)
+        return self._speech_map(levels, len(samples) / channels / sample_rate)
+
+    def detect_wav(self, path: str) -> Optional[SpeechMap]:
+        """
+        Speech regions of a 16-bit PCM WAV file, read in blocks
+
+        Returns:
+            SpeechMap, or None if the file isn't 16-bit PCM WAV (e.g. an MP3 upload)
+        """
+        try:
+            with wave.open(path, "rb") as wav:
+                if wav.getsampwidth() != 2:
+                    return None
+                rate, channels = wav.getframerate(), wav.getnchannels()
+                frame = self._frame_size(rate)
+                block = frame * max(READ_BLOCK_SECONDS * rate // frame, 1)
+
+                levels = []
+                total = wav.getnframes()
+                remaining = total - total % frame
+                while remaining > 0:
+                    data = wav.readframes(min(block, remaining))
+                    if not data:
+                        break
+                    samples = np.frombuffer(data, dtype="<i2")
+                    remaining -= len(samples) // channels
+                    levels.append(self._levels(samples, frame, channels))
+        except (wave.Error, EOFError):
+            return None
+
+        levels = np.concatenate(levels) if levels else np.zeros(0)
+        return self._speech_map(levels, total / rate)
+
+    def worth_trimming(self, speech: SpeechMap) -> bool:
+        """Enough silence that sending only the speech pays for the extra pass"""
+        return speech.duration > 0 and speech.silence_seconds / speech.duration >= self.min_trim
+
+    @staticmethod
+    def write_speech(path: str, speech: SpeechMap, output_path: str) -> str:
+        """Write the trimmed copy of a WAV file (see SpeechMap), region by region"""
+        with wave.open(path, "rb") as src, wave.open(output_path, "wb") as dst:
+            rate, channels = src.getframerate(), src.getnchannels()
+            dst.setparams(src.getparams())
+            silence = b"\0" * (round(speech.gap * rate) * channels * 2)
+            for i, (first, count) in enumerate(VoiceActivityDetector._spans(speech, rate)):
+                if i:
+                    dst.writeframes(silence)
+                src.setpos(first)
+                dst.writeframes(src.readframes(count))
+        return output_path
+
+    def speech_pcm(self, pcm: bytes, speech: SpeechMap, sample_rate: int = 16000) -> bytes:
+        """The trimmed copy (see SpeechMap) of raw mono s16le samples"""
+        silence = b"\0" * (round(speech.gap * sample_rate) * 2)
+        return silence.join(
+            pcm[first * 2:(first + count) * 2] for first, count in self._spans(speech, sample_rate)
+        )
+
+    def _frame_size(self, sample_rate: int) -> int:
+        return max(sample_rate * self.frame_ms // 1000, 1)
+
+    @staticmethod
+    def _levels(samples: np.ndarray, frame: int, channels: int) -> np.ndarray:
+        """RMS level in dBFS of each whole frame (channels averaged)"""
+        samples = samples.astype(np.float32) / 32768.0
+        if channels > 1:
+            samples = samples.reshape(-1, channels).mean(axis=1)
+        frames = samples[:len(samples) - len(samples) % frame].reshape(-1, frame)
+        rms = np.sqrt(np.mean(np.square(frames), axis=1))
+        return 20 * np.log10(rms + 1e-10)
+
+    def _speech_map(self, levels: np.ndarray, duration: float) -> SpeechMap:
+        """Threshold frame levels and turn the speech frames into smoothed regions"""
+        frame_seconds = self.frame_ms / 1000
+        if not len(levels):
+            return SpeechMap([], duration, self.gap)
+
+        floor, peak = np.percentile(levels, [10, 90])
+        if peak - floor < self.margin_db:
+            threshold = self.threshold_db  # Steady level: no floor to rise above
+        else:
+            threshold = max(self.threshold_db, floor + self.margin_db)
+        speech = levels > threshold
+
+        # Runs of speech frames as [start, end) frame indices
+        edges = np.diff(np.concatenate(([0], speech.astype(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1) * frame_seconds
+        ends = np.flatnonzero(edges == -1) * frame_seconds
+
+        starts, ends = self._join(starts, ends, self.min_silence)
+        keep = ends - starts >= self.min_speech
+        starts, ends = starts[keep], ends[keep]
+        starts = np.maximum(starts - self.padding, 0.0)
+        ends = np.minimum(ends + self.padding, duration)
+        starts, ends = self._join(starts, ends, 0.0)
+
+        regions = [(round(float(start), 3), round(float(end), 3)) for start, end in zip(starts, ends)]
+        return SpeechMap(regions, duration, self.gap)
+
+    @staticmethod
+    def _join(starts: np.ndarray, ends: np.ndarray, min_gap: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Merge runs separated by less than min_gap (or overlapping)"""
+        if len(starts) < 2:
+            return starts, ends
+        separate = starts[1:] - ends[:-1] > min_gap
+        return starts[np.concatenate(([True], separate))], ends[np.concatenate((separate, [True]))]
+
+    @staticmethod
+    def _spans(speech: SpeechMap, sample_rate: int) -> List[Tuple[int, int]]:
+        """(first_sample, sample_count) of each region"""
+        spans = []
+        for start, end in speech.regions:
+            first = round(start * sample_rate)
+            spans.append((first, round(end * sample_rate) - first))
+        return spans
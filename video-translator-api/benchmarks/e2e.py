@@ -0,0 +1,186 @@
+"""End-to-end dubbing pipeline benchmark with stubbed providers
+
+Generates synthetic videos (test pattern plus a tone) of each length with
+FFmpeg, replaces Deepgram, Google Translate and Edge-TTS with local fakes
+of configurable latency, and measures with real FFmpeg:
+
+- endpoint: POST /api/translate-video against the in-process app
+- extract, stt, translate, tts, dub_track, merge: each service on its own
+
+Every scenario reports throughput, p50/p95/p99 latency, peak RSS (this
+process and the largest FFmpeg child) and peak disk usage of the upload,
+output and cache directories, plus what was left on disk afterwards.
+The result is one JSON document, so runs can be diffed across commits.
+
+Usage (from video-translator-api/, FFmpeg on PATH):
+    python -m benchmarks.e2e --durations 10 30 60 --runs 5 --output e2e.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import httpx
+
+os.environ.setdefault("LOG_LEVEL", "WARNING")  # Before app.main configures logging
+
+import app.main as main
+from benchmarks.fakes import install_fakes, make_video
+from benchmarks.report import ResourceSampler, environment, latency_summary
+
+
+async def timed(func, *args) -> float:
+    start = time.perf_counter()
+    await func(*args)
+    return time.perf_counter() - start
+
+
+async def run_scenario(name: str, duration: float, runs: int, concurrency: int, step, dirs) -> dict:
+    """Run `step` (an async callable) `runs` times, `concurrency` at a time"""
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with limit:
+            return await timed(step)
+
+    with ResourceSampler(dirs) as sampler:
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*[one() for _ in range(runs)])
+        wall = time.perf_counter() - start
+
+    result = {"scenario": name, "video_seconds": duration, "concurrency": concurrency}
+    result.update(latency_summary(latencies, wall))
+    result.update(sampler.summary())
+    print(json.dumps(result), file=sys.stderr)
+    return result
+
+
+async def bench_endpoint(video_path: str, duration: float, args, dirs) -> dict:
+    with open(video_path, "rb") as f:
+        video = f.read()
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def step():
+            response = await client.post(
+                "/api/translate-video",
+                files={"file": ("bench.mp4", video, "video/mp4")},
+                data={"target_lang": "es"}
+            )
+            if response.status_code != 200:
+                raise RuntimeError(f"translate-video returned {response.status_code}: {response.text[:200]}")
+
+        return await run_scenario("endpoint", duration, args.runs, args.concurrency, step, dirs)
+
+
+async def bench_services(video_path: str, duration: float, args, dirs, workdir: str) -> list:
+    """Each stage alone, fed with the previous stage's real output"""
+    video = main.video_service
+    stt = main.get_stt_service()
+    translator = main.get_translation_service()
+    tts = main.get_tts_service()
+    run_io = main.executor.run_io
+    run_ffmpeg = main.executor.run_ffmpeg
+
+    audio_path = os.path.join(workdir, "audio.wav")
+    await run_ffmpeg(video.extract_audio, video_path, audio_path)
+    segments, lang, _ = await run_io(stt.transcribe_segments, audio_path)
+    texts = [segment.text for segment in segments]
+    translated = await run_io(translator.translate_batch, texts, lang, "es")
+    clip_paths = [os.path.join(workdir, f"clip_{i}.mp3") for i in range(len(translated))]
+    await asyncio.gather(*[
+        tts.generate_speech_batch(text, "es", path) for text, path in zip(translated, clip_paths)
+    ])
+    clips = [(segment.start, segment.end - segment.start, path) for segment, path in zip(segments, clip_paths)]
+    track_path = os.path.join(workdir, "track.wav")
+    await run_ffmpeg(video.build_dub_track, clips, track_path)
+
+    scratch = os.path.join(workdir, "scratch")
+    steps = {
+        "extract": lambda: run_ffmpeg(video.extract_audio, video_path, scratch + ".wav"),
+        "stt": lambda: run_io(stt.transcribe_segments, audio_path),
+        "translate": lambda: run_io(translator.translate_batch, texts, lang, "es"),
+        "tts": lambda: asyncio.gather(*[
+            tts.generate_speech_batch(text, "es", f"{scratch}_{i}.mp3") for i, text in enumerate(translated)
+        ]),
+        "dub_track": lambda: run_ffmpeg(video.build_dub_track, clips, scratch + ".wav"),
+        "merge": lambda: run_ffmpeg(video.replace_audio, video_path, track_path, scratch + ".mp4"),
+    }
+    results = []
+    for name, step in steps.items():
+        # Services write to fixed scratch paths, so they run one at a time
+        results.append(await run_scenario(name, duration, args.runs, 1, step, dirs))
+    return results
+
+
+async def run(args) -> dict:
+    dirs = [main.file_handler.upload_dir, main.file_handler.output_dir, main.pipeline_cache.cache_dir]
+    scenarios = []
+    with tempfile.TemporaryDirectory(prefix="bench_e2e_") as workdir:
+        for duration in args.durations:
+            video_path = os.path.join(workdir, f"video_{duration}s.mp4")
+            make_video(video_path, duration)
+            if not args.services_only:
+                scenarios.append(await bench_endpoint(video_path, duration, args, dirs))
+            if not args.endpoint_only:
+                scenarios.extend(await bench_services(video_path, duration, args, dirs, workdir))
+
+    return {
+        "benchmark": "e2e",
+        "environment": environment(),
+        "config": {
+            "durations": args.durations,
+            "runs": args.runs,
+            "concurrency": args.concurrency,
+            "stt_latency": args.stt_latency,
+            "translate_latency": args.translate_latency,
+            "tts_latency": args.tts_latency,
+            "segment_seconds": args.segment_seconds,
+        },
+        "scenarios": scenarios,
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--durations", type=float, nargs="+", default=[10, 30, 60], help="video lengths (s)")
+    parser.add_argument("--runs", type=int, default=5, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=1, help="endpoint requests in flight")
+    parser.add_argument("--stt-latency", type=float, default=0.5)
+    parser.add_argument("--translate-latency", type=float, default=0.1)
+    parser.add_argument("--tts-latency", type=float, default=0.3)
+    parser.add_argument("--segment-seconds", type=float, default=4.0, help="fake transcript density")
+    parser.add_argument("--endpoint-only", action="store_true")
+    parser.add_argument("--services-only", action="store_true")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    if not shutil.which("ffmpeg"):
+        parser.error("ffmpeg must be on PATH")
+
+    install_fakes(
+        main,
+        stt_latency=args.stt_latency,
+        translate_latency=args.translate_latency,
+        tts_latency=args.tts_latency,
+        real_ffmpeg=True,
+        segment_seconds=args.segment_seconds,
+    )
+
+    report = asyncio.run(run(args))
+    main.executor.shutdown()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main_cli()
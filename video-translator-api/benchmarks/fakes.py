@@ -0,0 +1,245 @@
+"""Local stand-ins for the external providers, with configurable latency
+
+The fakes block exactly like the real clients do (sync HTTP through the
+shared httpx pool for Deepgram and Google Translate, a subprocess wait for
+FFmpeg), so benchmarks exercise
+the same scheduling behaviour as production without network access.
+"""
+import asyncio
+import os
+import random
+import shutil
+import threading
+import time
+import wave
+
+import ffmpeg
+
+from app.models.schemas import Segment
+from app.services.stt_backends import StubBackend, Transcription
+from app.services.video_service import VideoService
+from app.services.stt_service import STTService
+from app.services.cache_service import PipelineCache
+from app.services.translation_backends import LocalBackend, stub_engine
+from app.services.translation_service import TranslationService
+from app.services.tts_service import TTSService
+
+
+class FakeSTTBackend(StubBackend):
+    """Stub transcript after a blocking delay, like a Deepgram /v1/listen request
+
+    With segment_seconds, a WAV input gets one sentence per that many
+    seconds of audio, so downstream work grows with video length.
+    per_second adds latency per second of WAV audio (provider processing
+    time). Injected failures: every fail_every-th call raises after its
+    delay, and a call whose latency would exceed timeout raises after
+    timeout seconds, like a request that times out.
+    """
+
+    def __init__(self, latency: float = 0.5, segment_seconds: float = None, per_second: float = 0.0,
+                 fail_every: int = 0, timeout: float = None):
+        self.latency = latency
+        self.segment_seconds = segment_seconds
+        self.per_second = per_second
+        self.fail_every = fail_every
+        self.timeout = timeout
+        self.calls = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    def transcribe(self, audio_path: str, language: str = None):
+        with self._lock:
+            self.calls += 1
+            fail = self.fail_every and self.calls % self.fail_every == 0
+        duration = wav_duration(audio_path) if self.segment_seconds or self.per_second else 0.0
+        delay = self.latency + self.per_second * duration
+        if self.timeout is not None and delay > self.timeout:
+            delay, fail = self.timeout, True
+        time.sleep(delay)
+        if fail:
+            with self._lock:
+                self.failures += 1
+            raise TimeoutError("fake STT backend timed out")
+        if not self.segment_seconds:
+            duration = 0.0
+        if not duration:
+            return super().transcribe(audio_path, language)
+
+        segments = []
+        start = 0.0
+        while start < duration:
+            segments.append(Segment(
+                start=start,
+                end=min(start + self.segment_seconds * 0.8, duration),
+                text=f"This is synthetic sentence number {len(segments) + 1}."
+            ))
+            start += self.segment_seconds
+        return Transcription(
+            text=" ".join(segment.text for segment in segments),
+            language=language or "en",
+            confidence=1.0,
+            segments=segments
+        )
+
+
+def wav_duration(path: str) -> float:
+    """Duration of a WAV file, or 0.0 if it isn't one"""
+    try:
+        with wave.open(path, "rb") as wav:
+            return wav.getnframes() / wav.getframerate()
+    except (wave.Error, OSError, EOFError):
+        return 0.0
+
+
+def fake_stt_service(latency: float = 0.5, segment_seconds: float = None, **kwargs) -> STTService:
+    """Real STTService (validation, segments, VAD, long-form) over the fake backend"""
+    return STTService(backend=FakeSTTBackend(latency, segment_seconds), **kwargs)
+
+
+def fake_translation_service(latency: float = 0.2) -> TranslationService:
+    """Real TranslationService (chunking, cache, failover) over a blocking stub backend"""
+    def engine(text: str, source: str, target: str) -> str:
+        time.sleep(latency)
+        return stub_engine(text, source, target)
+
+    return TranslationService(backends={"stub": LocalBackend(engine=engine)}, cache_size=0)
+
+
+class FakeCommunicate:
+    """Drop-in for edge_tts.Communicate: async save() after a latency
+
+    Latency is `latency` per request plus `per_char` per character, and
+    the written size grows with the text like real MP3 output does. With
+    `audio` (one second of MP3, see silent_mp3) the output is playable,
+    about one second per CHARS_PER_SECOND characters (fewer at a faster
+    Edge-TTS rate such as "+25%"), so real FFmpeg can mix it.
+    """
+
+    CHARS_PER_SECOND = 15
+
+    def __init__(self, text: str, voice: str, rate: str = "+0%", latency: float = 0.5, per_char: float = 0.0,
+                 fail_every: int = 0, audio: bytes = None):
+        self.text = text
+        self.speed = 1 + int(rate.rstrip("%")) / 100
+        self.latency = latency
+        self.per_char = per_char
+        self.fail_every = fail_every
+        self.audio = audio
+
+    calls = 0
+
+    async def save(self, output_path: str):
+        FakeCommunicate.calls += 1
+        await asyncio.sleep(self.latency + self.per_char * len(self.text))
+        if self.fail_every and FakeCommunicate.calls % self.fail_every == 0:
+            raise ConnectionError("fake TTS backend dropped the connection")
+        with open(output_path, "wb") as f:
+            if self.audio:
+                f.write(self.audio * max(1, int(len(self.text) / self.CHARS_PER_SECOND / self.speed)))
+            else:
+                f.write(b"\xff\xf3" * int((512 + 16 * len(self.text)) / self.speed))
+
+
+def silent_mp3(seconds: float = 1.0) -> bytes:
+    """Raw MP3 frames of silence in Edge-TTS's format (24 kHz mono, 48 kbps)"""
+    out, _ = (
+        ffmpeg
+        .input("anullsrc=r=24000:cl=mono", f="lavfi", t=seconds)
+        .output("pipe:", format="mp3", acodec="libmp3lame", audio_bitrate="48k",
+                write_xing=0, id3v2_version=0)
+        .run(capture_stdout=True, capture_stderr=True)
+    )
+    return out
+
+
+def make_video(path: str, seconds: float):
+    """Small H.264/AAC test video with a continuous tone"""
+    video = ffmpeg.input(f"testsrc2=size=320x240:rate=15:duration={seconds}", f="lavfi")
+    audio = ffmpeg.input(f"sine=frequency=440:sample_rate=44100:duration={seconds}", f="lavfi")
+    (
+        ffmpeg
+        .output(video, audio, path, vcodec="libx264", preset="ultrafast", acodec="aac", shortest=None)
+        .overwrite_output()
+        .run(capture_stdout=True, capture_stderr=True)
+    )
+
+
+def make_wav(path: str, seconds: float, rate: int = 16000):
+    """Mono 16-bit WAV of low-level noise (large enough to pass STT validation)"""
+    rng = random.Random(0)
+    frames = bytes(rng.randrange(256) & 0x0F for _ in range(int(seconds * rate) * 2))
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(frames)
+
+
+def fake_tts_service(latency: float = 0.5, per_char: float = 0.0, fail_every: int = 0,
+                     audio: bytes = None, **kwargs) -> TTSService:
+    """Real TTSService (chunking, limits, retries) over the fake backend"""
+    return TTSService(
+        communicate_factory=lambda text, voice, rate: FakeCommunicate(
+            text, voice, rate, latency=latency, per_char=per_char, fail_every=fail_every, audio=audio
+        ),
+        **kwargs
+    )
+
+
+class FakeVideoService:
+    """Blocking FFmpeg operations that copy the input instead of encoding"""
+
+    def __init__(self, latency: float = 1.0):
+        self.latency = latency
+
+    def extract_audio(self, video_path: str, output_path: str) -> str:
+        time.sleep(self.latency)
+        shutil.copyfile(video_path, output_path)
+        return output_path
+
+    def stream_audio(self, video_path: str, audio_format: str = "wav"):
+        time.sleep(self.latency)
+        with open(video_path, "rb") as f:
+            yield f.read()
+
+    def replace_audio(self, video_path: str, audio_path: str, output_path: str,
+                      duck_regions=None, duck_db: float = None, duck_fade: float = None) -> str:
+        time.sleep(self.latency)
+        shutil.copyfile(video_path, output_path)
+        return output_path
+
+    def add_subtitles(self, video_path: str, subtitle_path: str, output_path: str, language: str = None) -> str:
+        time.sleep(self.latency)
+        shutil.copyfile(video_path, output_path)
+        return output_path
+
+    def build_dub_track(self, clips, output_path: str, tempos=None, duration: float = None) -> str:
+        time.sleep(self.latency)
+        with open(output_path, "wb") as f:
+            f.write(b"\0" * 2048)
+        return output_path
+
+    def get_audio_duration(self, audio_path: str) -> float:
+        return os.path.getsize(audio_path) / 6000  # Edge-TTS MP3 is 48 kbps
+
+    def get_video_duration(self, video_path: str) -> float:
+        return 4.0
+
+
+def install_fakes(main_module, stt_latency=0.5, translate_latency=0.2, tts_latency=0.5, ffmpeg_latency=1.0,
+                  real_ffmpeg=False, segment_seconds=None):
+    """Swap the services used by app.main for fakes (and disable the pipeline cache)
+
+    With real_ffmpeg the real VideoService is kept and the fake TTS writes
+    playable MP3, so the FFmpeg stages do their actual work.
+    """
+    services = main_module.services
+    services.set("stt", fake_stt_service(stt_latency, segment_seconds))
+    services.set("translation", fake_translation_service(translate_latency))
+    if real_ffmpeg:
+        services.set("tts", fake_tts_service(tts_latency, audio=silent_mp3()))
+        main_module.video_service = VideoService()
+    else:
+        services.set("tts", fake_tts_service(tts_latency))
+        main_module.video_service = FakeVideoService(ffmpeg_latency)
+    main_module.pipeline_cache = PipelineCache(max_size_mb=0)
@@ -0,0 +1,100 @@
+"""/health latency while videos are being translated
+
+Drives N concurrent /api/translate-video requests against the in-process
+app (stub providers, blocking latencies) and samples /health on the same
+event loop. With the pipeline off the loop, /health stays in the
+low-millisecond range regardless of N.
+
+Usage (from video-translator-api/):
+    python -m benchmarks.health_latency --videos 1 4 8
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+import app.main as main
+from benchmarks.fakes import install_fakes
+
+
+async def sample_health(client: httpx.AsyncClient, stop: asyncio.Event, interval: float):
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/health")
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def run(videos: int, interval: float) -> dict:
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        stop = asyncio.Event()
+        sampler = asyncio.create_task(sample_health(client, stop, interval))
+
+        start = time.perf_counter()
+        responses = await asyncio.gather(*[
+            client.post(
+                "/api/translate-video",
+                files={"file": ("bench.mp4", b"\0" * 4096, "video/mp4")},
+                data={"target_lang": "es"}
+            )
+            for _ in range(videos)
+        ])
+        elapsed = time.perf_counter() - start
+
+        stop.set()
+        latencies = await sampler
+
+    latencies.sort()
+    return {
+        "videos": videos,
+        "ok": sum(r.status_code == 200 for r in responses),
+        "wall_s": round(elapsed, 3),
+        "health_samples": len(latencies),
+        "health_p50_ms": round(statistics.median(latencies), 2),
+        "health_p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 2),
+        "health_max_ms": round(latencies[-1], 2),
+    }
+
+
+async def idle_baseline(interval: float) -> dict:
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        stop = asyncio.Event()
+        sampler = asyncio.create_task(sample_health(client, stop, interval))
+        await asyncio.sleep(1.0)
+        stop.set()
+        latencies = sorted(await sampler)
+    return {
+        "videos": 0,
+        "health_samples": len(latencies),
+        "health_p50_ms": round(statistics.median(latencies), 2),
+        "health_max_ms": round(latencies[-1], 2),
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--videos", type=int, nargs="+", default=[0, 1, 4, 8])
+    parser.add_argument("--interval", type=float, default=0.02, help="seconds between /health probes")
+    parser.add_argument("--ffmpeg-latency", type=float, default=1.0)
+    parser.add_argument("--stt-latency", type=float, default=0.5)
+    args = parser.parse_args()
+
+    install_fakes(main, stt_latency=args.stt_latency, ffmpeg_latency=args.ffmpeg_latency)
+
+    for n in args.videos:
+        if n == 0:
+            result = asyncio.run(idle_baseline(args.interval))
+        else:
+            result = asyncio.run(run(n, args.interval))
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main_cli()
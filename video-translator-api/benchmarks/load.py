@@ -0,0 +1,417 @@
+"""Load test: where does a worker saturate for a given request mix?
+
+Launches the app under uvicorn with the local fake providers (see
+benchmarks/stub_app.py, FFmpeg is real) for every combination of
+--workers and --io-threads, then replays a weighted mix of
+/api/translate, /api/tts, /api/stt and /api/translate-video at each
+--rps step. Arrivals are open-loop (a fixed schedule, not "send when the
+previous one returns"), so a slow server shows up as growing latency and
+in-flight requests instead of a lower offered load.
+
+Every step reports throughput, p50/p95/p99 latency overall and per
+endpoint, status codes, peak in-flight requests and server event loop
+lag (from event_loop_lag_seconds on /metrics). A step is saturated when
+throughput falls below 90% of the offered rate, more than 1% of requests
+fail, or p95 exceeds --slo; it is queuing once p50 doubles from the
+first step. The report ends with the highest sustained rate per
+configuration and the smallest configuration that sustains --target-rps.
+
+Usage (from video-translator-api/, FFmpeg on PATH):
+    python -m benchmarks.load --workers 1 2 4 --io-threads 8 16 \\
+        --rps 2 4 8 16 --mix translate=50 tts=20 stt=20 video=10 --output load.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+
+import httpx
+
+from benchmarks.fakes import make_video, make_wav
+from benchmarks.report import environment, latency_summary
+
+ENDPOINTS = ("translate", "tts", "stt", "video")
+
+SAMPLE_TEXT = "This is a short sentence for the load test. It has two sentences."
+
+# Lag histogram series scraped from /metrics, per worker process
+LAG_METRIC = "event_loop_lag_seconds"
+
+
+def parse_mix(items) -> dict:
+    """["translate=50", "video=10"] -> {"translate": 50.0, "video": 10.0}"""
+    mix = {}
+    for item in items:
+        name, _, weight = item.partition("=")
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint {name!r} (expected one of {', '.join(ENDPOINTS)})")
+        mix[name] = float(weight or 1)
+    if not any(mix.values()):
+        raise ValueError("The mix needs at least one endpoint with a positive weight")
+    return mix
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class Server:
+    """benchmarks.stub_app under uvicorn in a subprocess"""
+
+    def __init__(self, workers: int, io_threads: int, ffmpeg_threads: int, latencies: dict):
+        self.workers = workers
+        self.port = free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self.env = dict(
+            os.environ,
+            LOG_LEVEL="WARNING",
+            IO_POOL_WORKERS=str(io_threads),
+            FFMPEG_POOL_WORKERS=str(ffmpeg_threads),
+            BENCH_STT_LATENCY=str(latencies["stt"]),
+            BENCH_TRANSLATE_LATENCY=str(latencies["translate"]),
+            BENCH_TTS_LATENCY=str(latencies["tts"]),
+        )
+        self.process = None
+
+    async def __aenter__(self):
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "benchmarks.stub_app:app",
+             "--port", str(self.port), "--workers", str(self.workers), "--log-level", "warning"],
+            env=self.env
+        )
+        async with httpx.AsyncClient(base_url=self.base_url) as client:
+            for _ in range(300):
+                if self.process.poll() is not None:
+                    raise RuntimeError(f"uvicorn exited with code {self.process.returncode}")
+                try:
+                    if (await client.get("/health")).status_code == 200:
+                        return self
+                except httpx.TransportError:
+                    pass
+                await asyncio.sleep(0.1)
+        raise RuntimeError("uvicorn did not become healthy within 30s")
+
+    async def __aexit__(self, *exc):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+def parse_loop_lag(text: str):
+    """(worker key, lag sum, lag count) from one /metrics scrape
+
+    Workers are told apart by process_start_time_seconds, which every
+    process exports from the default registry.
+    """
+    worker, lag_sum, lag_count = None, 0.0, 0.0
+    for line in text.splitlines():
+        if line.startswith("process_start_time_seconds "):
+            worker = line.split()[1]
+        elif line.startswith(f"{LAG_METRIC}_sum "):
+            lag_sum = float(line.split()[1])
+        elif line.startswith(f"{LAG_METRIC}_count "):
+            lag_count = float(line.split()[1])
+    return worker, lag_sum, lag_count
+
+
+async def scrape_loop_lag(client: httpx.AsyncClient, workers: int) -> dict:
+    """Lag totals per worker; each scrape lands on one worker, so scrape a few times"""
+    totals = {}
+    for _ in range(workers * 4):
+        try:
+            response = await client.get("/metrics")
+        except httpx.TransportError:
+            continue
+        worker, lag_sum, lag_count = parse_loop_lag(response.text)
+        totals[worker] = (lag_sum, lag_count)
+    return totals
+
+
+def loop_lag_delta(before: dict, after: dict) -> dict:
+    """Mean and worst-worker mean event loop lag between two scrapes"""
+    means = []
+    total_sum = total_count = 0.0
+    for worker, (lag_sum, lag_count) in after.items():
+        if worker not in before:
+            continue
+        d_sum = lag_sum - before[worker][0]
+        d_count = lag_count - before[worker][1]
+        if d_count > 0:
+            means.append(d_sum / d_count)
+            total_sum += d_sum
+            total_count += d_count
+    return {
+        "loop_lag_mean_ms": round(total_sum / total_count * 1000, 2) if total_count else None,
+        "loop_lag_worst_worker_ms": round(max(means) * 1000, 2) if means else None,
+        "workers_sampled": len(means),
+    }
+
+
+class LoadGenerator:
+    """Open-loop request schedule for one mix"""
+
+    def __init__(self, client: httpx.AsyncClient, mix: dict, files: dict, timeout: float, seed: int = 0):
+        self.client = client
+        self.names = list(mix)
+        self.weights = list(mix.values())
+        self.files = files
+        self.timeout = timeout
+        self.rng = random.Random(seed)
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def request(self, name: str):
+        if name == "translate":
+            return self.client.post("/api/translate", json={
+                "text": SAMPLE_TEXT, "source_lang": "en", "target_lang": "es"
+            })
+        if name == "tts":
+            return self.client.post("/api/tts", json={"text": SAMPLE_TEXT, "language": "es"})
+        if name == "stt":
+            return self.client.post("/api/stt", files={"file": ("load.wav", self.files["stt"], "audio/wav")})
+        return self.client.post(
+            "/api/translate-video",
+            files={"file": ("load.mp4", self.files["video"], "video/mp4")},
+            data={"target_lang": "es"}
+        )
+
+    async def send(self, name: str):
+        """(endpoint, status or error name, latency)"""
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        start = time.perf_counter()
+        try:
+            response = await asyncio.wait_for(self.request(name), self.timeout)
+            status = str(response.status_code)
+        except asyncio.TimeoutError:
+            status = "timeout"
+        except httpx.TransportError as e:
+            status = type(e).__name__
+        finally:
+            self.in_flight -= 1
+        return name, status, time.perf_counter() - start
+
+    async def run(self, rps: float, seconds: float):
+        """Fire int(rps * seconds) requests on schedule; returns results, wall time, worst send delay"""
+        self.peak_in_flight = 0
+        tasks = []
+        send_delay = 0.0
+        start = time.perf_counter()
+        for i in range(max(1, int(rps * seconds))):
+            due = start + i / rps
+            await asyncio.sleep(max(0.0, due - time.perf_counter()))
+            send_delay = max(send_delay, time.perf_counter() - due)
+            name = self.rng.choices(self.names, self.weights)[0]
+            tasks.append(asyncio.create_task(self.send(name)))
+        results = await asyncio.gather(*tasks)
+        return results, time.perf_counter() - start, send_delay
+
+
+def step_summary(rps: float, results, wall: float, send_delay: float) -> dict:
+    ok = [latency for _, status, latency in results if status == "200"]
+    statuses = Counter(status for _, status, _ in results)
+    summary = {"offered_rps": rps}
+    summary.update(latency_summary(ok, wall))
+    summary["throughput_rps"] = round(len(ok) / wall, 3) if wall else 0.0
+    summary["error_rate"] = round(1 - len(ok) / len(results), 4) if results else 0.0
+    summary["statuses"] = dict(statuses)
+    # A late schedule means the load generator itself was the bottleneck
+    summary["client_send_delay_max_s"] = round(send_delay, 4)
+
+    per_endpoint = defaultdict(list)
+    for name, status, latency in results:
+        if status == "200":
+            per_endpoint[name].append(latency)
+    summary["endpoints"] = {
+        name: latency_summary(latencies, wall) for name, latencies in sorted(per_endpoint.items())
+    }
+    return summary
+
+
+def classify(steps: list, slo: float) -> dict:
+    """Mark saturated/queuing steps and find the highest sustained rate"""
+    baseline_p50 = steps[0]["p50_s"] if steps else 0.0
+    sustained = 0.0
+    saturated_at = queuing_at = None
+    for step in steps:
+        reasons = []
+        if step["throughput_rps"] < 0.9 * step["offered_rps"]:
+            reasons.append("throughput")
+        if step["error_rate"] > 0.01:
+            reasons.append("errors")
+        if step["p95_s"] > slo:
+            reasons.append("p95_slo")
+        step["saturated"] = reasons
+        step["queuing"] = bool(baseline_p50) and step["p50_s"] > 2 * baseline_p50
+        if step["queuing"] and queuing_at is None:
+            queuing_at = step["offered_rps"]
+        if reasons:
+            if saturated_at is None:
+                saturated_at = step["offered_rps"]
+        elif saturated_at is None:
+            sustained = step["offered_rps"]
+    return {"max_sustained_rps": sustained, "saturated_at_rps": saturated_at, "queuing_at_rps": queuing_at}
+
+
+def bottleneck_hint(config: dict) -> str:
+    """Rough reading of the first saturated step"""
+    step = next((s for s in config["steps"] if s["saturated"]), None)
+    if step is None:
+        return "not saturated; extend --rps"
+    if step["client_send_delay_max_s"] > 0.1:
+        return "load generator fell behind; results above this rate are unreliable"
+    lag = step.get("loop_lag_worst_worker_ms") or 0.0
+    if lag > 50:
+        return "event loop busy (high loop lag); add uvicorn workers"
+    if "errors" in step["saturated"]:
+        return "requests failing; check statuses (503/500) and timeouts"
+    return "loop is responsive; waiting on pool threads or FFmpeg, raise --io-threads/--ffmpeg-threads"
+
+
+def recommend(configs: list, target_rps: float) -> dict:
+    """Smallest workers x threads that sustains the target (or the best one if none does)"""
+    ranked = sorted(configs, key=lambda c: (c["workers"], c["io_threads"]))
+    for config in ranked:
+        if config["max_sustained_rps"] >= target_rps:
+            return {
+                "target_rps": target_rps,
+                "workers": config["workers"],
+                "io_threads": config["io_threads"],
+                "ffmpeg_threads": config["ffmpeg_threads"],
+                "max_sustained_rps": config["max_sustained_rps"],
+                "meets_target": True,
+            }
+    best = max(configs, key=lambda c: (c["max_sustained_rps"], -c["workers"], -c["io_threads"]))
+    return {
+        "target_rps": target_rps,
+        "workers": best["workers"],
+        "io_threads": best["io_threads"],
+        "ffmpeg_threads": best["ffmpeg_threads"],
+        "max_sustained_rps": best["max_sustained_rps"],
+        "meets_target": False,
+    }
+
+
+async def run_config(workers: int, io_threads: int, args, mix: dict, files: dict) -> dict:
+    server = Server(workers, io_threads, args.ffmpeg_threads, {
+        "stt": args.stt_latency, "translate": args.translate_latency, "tts": args.tts_latency
+    })
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with server, httpx.AsyncClient(base_url=server.base_url, limits=limits, timeout=None) as client:
+        generator = LoadGenerator(client, mix, files, args.timeout, args.seed)
+        # Warm up every endpoint in the mix once per worker
+        await asyncio.gather(*[generator.send(name) for name in mix for _ in range(workers)])
+
+        steps = []
+        for rps in args.rps:
+            lag_before = await scrape_loop_lag(client, workers)
+            results, wall, send_delay = await generator.run(rps, args.seconds)
+            lag_after = await scrape_loop_lag(client, workers)
+
+            step = step_summary(rps, results, wall, send_delay)
+            step["peak_in_flight"] = generator.peak_in_flight
+            step.update(loop_lag_delta(lag_before, lag_after))
+            steps.append(step)
+            print(json.dumps({"workers": workers, "io_threads": io_threads, **{
+                k: v for k, v in step.items() if k != "endpoints"
+            }}), file=sys.stderr)
+
+    config = {
+        "workers": workers,
+        "io_threads": io_threads,
+        "ffmpeg_threads": args.ffmpeg_threads,
+        "steps": steps,
+    }
+    config.update(classify(steps, args.slo))
+    config["bottleneck"] = bottleneck_hint(config)
+    return config
+
+
+async def run(args, mix: dict) -> dict:
+    with tempfile.TemporaryDirectory(prefix="bench_load_") as workdir:
+        video_path = os.path.join(workdir, "load.mp4")
+        wav_path = os.path.join(workdir, "load.wav")
+        make_video(video_path, args.video_seconds)
+        make_wav(wav_path, args.audio_seconds)
+        files = {}
+        for name, path in (("video", video_path), ("stt", wav_path)):
+            with open(path, "rb") as f:
+                files[name] = f.read()
+
+        configs = []
+        for workers in args.workers:
+            for io_threads in args.io_threads:
+                configs.append(await run_config(workers, io_threads, args, mix, files))
+
+    return {
+        "benchmark": "load",
+        "environment": environment(),
+        "config": {
+            "mix": mix,
+            "rps": args.rps,
+            "seconds_per_step": args.seconds,
+            "slo_p95_s": args.slo,
+            "video_seconds": args.video_seconds,
+            "audio_seconds": args.audio_seconds,
+            "stt_latency": args.stt_latency,
+            "translate_latency": args.translate_latency,
+            "tts_latency": args.tts_latency,
+        },
+        "configs": configs,
+        "recommendation": recommend(configs, args.target_rps or max(args.rps)),
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2], help="uvicorn worker counts to try")
+    parser.add_argument("--io-threads", type=int, nargs="+", default=[16], help="IO_POOL_WORKERS values to try")
+    parser.add_argument("--ffmpeg-threads", type=int, default=os.cpu_count() or 2, help="FFMPEG_POOL_WORKERS")
+    parser.add_argument("--rps", type=float, nargs="+", default=[1, 2, 4, 8, 16], help="offered load steps")
+    parser.add_argument("--seconds", type=float, default=20, help="duration of each step")
+    parser.add_argument("--mix", nargs="+", default=["translate=50", "tts=20", "stt=20", "video=10"],
+                        help="endpoint=weight for translate, tts, stt, video")
+    parser.add_argument("--slo", type=float, default=10.0, help="p95 latency (s) above which a step is saturated")
+    parser.add_argument("--target-rps", type=float, help="rate to size for (default: highest --rps)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-request timeout (s)")
+    parser.add_argument("--video-seconds", type=float, default=10.0)
+    parser.add_argument("--audio-seconds", type=float, default=5.0)
+    parser.add_argument("--stt-latency", type=float, default=0.5)
+    parser.add_argument("--translate-latency", type=float, default=0.1)
+    parser.add_argument("--tts-latency", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=0, help="seed for the request mix")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    if not shutil.which("ffmpeg"):
+        parser.error("ffmpeg must be on PATH")
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    report = asyncio.run(run(args, mix))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main_cli()
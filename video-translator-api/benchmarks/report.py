@@ -0,0 +1,131 @@
+"""Measurement helpers shared by the benchmarks"""
+import os
+import platform
+import resource
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, List
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(q / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def latency_summary(latencies: Iterable[float], wall_seconds: float) -> dict:
+    """Throughput and p50/p95/p99 of per-request latencies (seconds)"""
+    values = sorted(latencies)
+    return {
+        "requests": len(values),
+        "throughput_rps": round(len(values) / wall_seconds, 3) if wall_seconds else 0.0,
+        "p50_s": round(percentile(values, 50), 4),
+        "p95_s": round(percentile(values, 95), 4),
+        "p99_s": round(percentile(values, 99), 4),
+        "max_s": round(values[-1], 4) if values else 0.0,
+    }
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process now (Linux), else the peak so far"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE / 1024 / 1024
+    except OSError:
+        return max_rss_mb(resource.RUSAGE_SELF)
+
+
+def max_rss_mb(who=resource.RUSAGE_SELF) -> float:
+    """Peak RSS (RUSAGE_CHILDREN: largest waited-for child, e.g. FFmpeg)"""
+    rss = resource.getrusage(who).ru_maxrss
+    return rss / 1024 / (1024 if sys.platform == "darwin" else 1)
+
+
+def dir_size_mb(path) -> float:
+    """Total size of the files under a directory"""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass  # Removed while walking
+    return total / 1024 / 1024
+
+
+class ResourceSampler:
+    """Peak RSS and disk usage while a scenario runs
+
+    A background thread samples this process's RSS and the size of the
+    given directories; use as a context manager around one scenario.
+    """
+
+    def __init__(self, dirs: Iterable, interval: float = 0.05):
+        self.dirs = [Path(d) for d in dirs]
+        self.interval = interval
+        self.peak_rss_mb = 0.0
+        self.peak_disk_mb = 0.0
+        self.disk_after_mb = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._sample()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+        self.disk_after_mb = self._disk()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def _sample(self):
+        self.peak_rss_mb = max(self.peak_rss_mb, current_rss_mb())
+        self.peak_disk_mb = max(self.peak_disk_mb, self._disk())
+
+    def _disk(self) -> float:
+        return sum(dir_size_mb(d) for d in self.dirs if d.exists())
+
+    def summary(self) -> dict:
+        return {
+            "peak_rss_mb": round(self.peak_rss_mb, 1),
+            "ffmpeg_peak_rss_mb": round(max_rss_mb(resource.RUSAGE_CHILDREN), 1),
+            "peak_disk_mb": round(self.peak_disk_mb, 2),
+            "disk_left_mb": round(self.disk_after_mb, 2),
+        }
+
+
+def environment() -> dict:
+    """Machine and version details to store next to the numbers"""
+    try:
+        ffmpeg_version = subprocess.run(
+            ["ffmpeg", "-version"], capture_output=True, text=True
+        ).stdout.split("\n")[0]
+    except OSError:
+        ffmpeg_version = None
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "ffmpeg": ffmpeg_version,
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
@@ -0,0 +1,122 @@
+"""Long-form (windowed, parallel) transcription against one request per file
+
+Writes a synthetic lecture: 16 kHz mono WAV of speech-like tone bursts
+(2-12 s) separated by pauses (0.2-2 s), with an occasional stretch of
+continuous speech longer than a window so some cuts land inside speech.
+It is then transcribed by STTService over FakeSTTBackend, whose latency
+grows with the seconds of audio sent, which times out requests slower
+than --timeout and which fails every Nth call:
+
+- single: long-form off, the whole file in one request (no retries)
+- windows: long-form on, at each --concurrency
+
+Each run reports wall time, windows, backend calls and injected failures,
+segment count, and whether the stitched segments are in order without
+overlaps.
+
+Usage (from video-translator-api/):
+    python -m benchmarks.stt_long_form --minutes 30 90 --concurrency 1 4 8 --fail-every 7 --timeout 8
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import wave
+
+import numpy as np
+
+from app.services.stt_service import STTService
+from app.utils.vad import VoiceActivityDetector
+from benchmarks.fakes import FakeSTTBackend
+
+SAMPLE_RATE = 16000
+
+
+def write_lecture(path: str, seconds: float, seed: int = 0):
+    """Speech-like bursts and pauses, written burst by burst"""
+    rng = np.random.default_rng(seed)
+    written = 0.0
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        while written < seconds:
+            # One burst in 40 is a long uninterrupted stretch
+            burst = rng.uniform(400, 500) if rng.random() < 0.025 else rng.uniform(2, 12)
+            pause = rng.uniform(0.2, 2.0)
+            burst = min(burst, seconds - written)
+            t = np.arange(int(burst * SAMPLE_RATE)) / SAMPLE_RATE
+            voice = 0.3 * np.sin(2 * np.pi * rng.uniform(120, 250) * t) * (0.6 + 0.4 * np.sin(2 * np.pi * 4 * t))
+            quiet = 0.0005 * rng.standard_normal(int(pause * SAMPLE_RATE))
+            wav.writeframes((np.concatenate([voice, quiet]) * 32767).astype("<i2").tobytes())
+            written += burst + pause
+
+
+def check_order(segments) -> bool:
+    """Segments sorted by start and not overlapping"""
+    return all(a.end <= b.start + 1e-6 for a, b in zip(segments, segments[1:]))
+
+
+def run(audio_path: str, long_form: bool, concurrency: int, args) -> dict:
+    backend = FakeSTTBackend(
+        latency=args.latency, segment_seconds=5, per_second=args.per_second,
+        fail_every=args.fail_every, timeout=args.timeout
+    )
+    stt = STTService(
+        backend=backend,
+        vad=VoiceActivityDetector(),
+        long_form_seconds=1 if long_form else 0,
+        window_seconds=args.window,
+        window_concurrency=concurrency,
+        window_retries=args.retries,
+    )
+    start = time.perf_counter()
+    try:
+        segments, language, confidence = stt.transcribe_segments(audio_path)
+        outcome = {
+            "status": "ok",
+            "segments": len(segments),
+            "ordered": check_order(segments),
+            "language": language,
+            "confidence": confidence,
+        }
+    except Exception as e:
+        outcome = {"status": "failed", "error": str(e)[:120]}
+    finally:
+        stt.close()
+    return {
+        "mode": "windows" if long_form else "single",
+        "concurrency": concurrency if long_form else 1,
+        "seconds": round(time.perf_counter() - start, 2),
+        "backend_calls": backend.calls,
+        "injected_failures": backend.failures,
+        **outcome,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--minutes", type=float, nargs="+", default=[30, 90])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--window", type=float, default=300, help="Window seconds")
+    parser.add_argument("--retries", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.2, help="Fixed seconds per request")
+    parser.add_argument("--per-second", type=float, default=0.002,
+                        help="Seconds of latency per second of audio sent")
+    parser.add_argument("--fail-every", type=int, default=0, help="Fail every Nth backend call (0: never)")
+    parser.add_argument("--timeout", type=float, default=None, help="Fail backend calls slower than this")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for minutes in args.minutes:
+            audio_path = os.path.join(tmp, f"lecture_{minutes}.wav")
+            write_lecture(audio_path, minutes * 60)
+            print(json.dumps({"minutes": minutes, **run(audio_path, False, 1, args)}))
+            for concurrency in args.concurrency:
+                print(json.dumps({"minutes": minutes, **run(audio_path, True, concurrency, args)}))
+            os.remove(audio_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Peak RSS of the Deepgram STT hand-off against audio duration
+
+Each measurement runs in a fresh subprocess: it writes a 16 kHz mono WAV
+of the given duration, then sends it through DeepgramBackend.transcribe
+with httpx routed to a local mock transport that drains the request body
+and returns a canned response. `--mode read` loads the file into memory
+first (the old hand-off) for comparison.
+
+Usage (from video-translator-api/):
+    python -m benchmarks.stt_memory --minutes 1 10 30 60
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import wave
+
+SAMPLE_RATE = 16000
+
+CANNED_RESPONSE = {
+    "metadata": {},
+    "results": {
+        "channels": [{
+            "detected_language": "en",
+            "language_confidence": 0.99,
+            "alternatives": [{"transcript": "benchmark transcript here", "confidence": 0.9, "words": []}],
+        }],
+        "utterances": [],
+    },
+}
+
+
+def write_wav(path: str, seconds: float):
+    """Silent 16 kHz mono PCM WAV, written in 1-second blocks"""
+    block = b"\0\0" * SAMPLE_RATE
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        for _ in range(int(seconds)):
+            wav.writeframes(block)
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 / (1024 if sys.platform == "darwin" else 1)
+
+
+def child(audio_path: str, mode: str):
+    """Run one transcription and print peak RSS (subprocess entry point)"""
+    import httpx
+
+    received = {"bytes": 0}
+
+    class DrainTransport(httpx.BaseTransport):
+        # httpx.MockTransport calls request.read(), which would buffer the
+        # whole body; drain the stream chunk by chunk like a socket would
+        def handle_request(self, request: httpx.Request) -> httpx.Response:
+            for chunk in request.stream:
+                received["bytes"] += len(chunk)
+            return httpx.Response(200, json=CANNED_RESPONSE)
+
+    real_client = httpx.Client
+
+    class MockClient(real_client):
+        def __init__(self, *args, **kwargs):
+            kwargs["transport"] = DrainTransport()
+            super().__init__(*args, **kwargs)
+
+    httpx.Client = MockClient
+
+    os.environ.setdefault("DEEPGRAM_API_KEY", "benchmark")
+    from app.services.stt_backends import DeepgramBackend
+
+    backend = DeepgramBackend()
+    baseline = peak_rss_mb()
+
+    if mode == "read":
+        # Previous behaviour: whole file as one bytes object
+        with open(audio_path, "rb") as f:
+            payload = {"buffer": f.read()}
+        backend.client.listen.prerecorded.v("1").transcribe_file(payload, {"model": "nova-2"})
+    else:
+        backend.transcribe(audio_path)
+
+    print(json.dumps({
+        "sent_mb": round(received["bytes"] / 1024 / 1024, 1),
+        "baseline_rss_mb": round(baseline, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--minutes", type=float, nargs="+", default=[1, 10, 30, 60])
+    parser.add_argument("--mode", choices=["stream", "read", "both"], default="both")
+    parser.add_argument("--child", nargs=2, metavar=("AUDIO", "MODE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    modes = ["stream", "read"] if args.mode == "both" else [args.mode]
+    with tempfile.TemporaryDirectory() as tmp:
+        for minutes in args.minutes:
+            audio_path = os.path.join(tmp, f"audio_{minutes}.wav")
+            write_wav(audio_path, minutes * 60)
+            for mode in modes:
+                output = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.stt_memory", "--child", audio_path, mode],
+                    capture_output=True, text=True, check=True
+                ).stdout.strip().splitlines()[-1]
+                result = {"minutes": minutes, "mode": mode, **json.loads(output)}
+                print(json.dumps(result))
+            os.remove(audio_path)
+
+
+if __name__ == "__main__":
+    main()
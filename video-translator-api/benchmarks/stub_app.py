@@ -0,0 +1,24 @@
+"""app.main with the local fake providers, for running under uvicorn
+
+FFmpeg is real; provider latencies come from the environment (seconds):
+BENCH_STT_LATENCY (default 0.5), BENCH_TRANSLATE_LATENCY (0.1) and
+BENCH_TTS_LATENCY (0.3). Each uvicorn worker imports this module, so the
+fakes are installed in every worker.
+
+    uvicorn benchmarks.stub_app:app --workers 2
+"""
+import os
+
+import app.main as main
+from benchmarks.fakes import install_fakes
+
+install_fakes(
+    main,
+    stt_latency=float(os.getenv("BENCH_STT_LATENCY", "0.5")),
+    translate_latency=float(os.getenv("BENCH_TRANSLATE_LATENCY", "0.1")),
+    tts_latency=float(os.getenv("BENCH_TTS_LATENCY", "0.3")),
+    real_ffmpeg=True,
+    segment_seconds=4.0,
+)
+
+app = main.app
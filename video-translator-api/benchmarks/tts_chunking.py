@@ -0,0 +1,62 @@
+"""Batch TTS speed-up against chunk count
+
+Synthesizes one long text through TTSService.generate_speech_batch over
+the fake Edge-TTS backend (fixed per-request latency plus per-character
+latency) for several chunk sizes and reports wall time and speed-up
+relative to a single request.
+
+Usage (from video-translator-api/):
+    python -m benchmarks.tts_chunking --sentences 120 --concurrency 4 8
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from benchmarks.fakes import fake_tts_service
+from app.utils.text_utils import split_sentences
+
+SENTENCE = "This is a benchmark sentence for the dubbing pipeline."
+
+
+async def measure(text: str, chunk_chars: int, concurrency: int, latency: float, per_char: float) -> float:
+    tts = fake_tts_service(
+        latency=latency, per_char=per_char, concurrency=concurrency, chunk_chars=chunk_chars
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        await tts.generate_speech_batch(text, "en", os.path.join(tmp, "out.mp3"))
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sentences", type=int, default=120)
+    parser.add_argument("--chunk-chars", type=int, nargs="+", default=[100000, 2000, 800, 400, 200])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[4, 8])
+    parser.add_argument("--latency", type=float, default=0.3, help="fixed seconds per request")
+    parser.add_argument("--per-char", type=float, default=0.0005, help="seconds per character")
+    args = parser.parse_args()
+
+    text = " ".join([SENTENCE] * args.sentences)
+
+    for concurrency in args.concurrency:
+        baseline = None
+        for chunk_chars in args.chunk_chars:
+            chunks = len(split_sentences(text, chunk_chars))
+            elapsed = asyncio.run(measure(text, chunk_chars, concurrency, args.latency, args.per_char))
+            baseline = baseline or elapsed
+            print(json.dumps({
+                "chars": len(text),
+                "concurrency": concurrency,
+                "chunk_chars": chunk_chars,
+                "chunks": chunks,
+                "wall_s": round(elapsed, 3),
+                "speedup": round(baseline / elapsed, 2),
+            }))
+
+
+if __name__ == "__main__":
+    main()
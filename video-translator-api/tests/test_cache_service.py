@@ -0,0 +1,39 @@
+import os
+
+from app.services.cache_service import PipelineCache
+
+
+def test_hit_returns_path_and_counts(tmp_path):
+    cache = PipelineCache(cache_dir=str(tmp_path), max_size_mb=1)
+    cache.put_json("transcript", "abc", {"text": "Hello"})
+
+    assert cache.get_json("transcript", "abc") == {"text": "Hello"}
+    assert cache.stats()["stages"]["transcript"] == {"hits": 1, "misses": 0}
+
+
+def test_entry_removed_behind_the_index_is_a_miss(tmp_path):
+    cache = PipelineCache(cache_dir=str(tmp_path), max_size_mb=1)
+    src = tmp_path / "track.wav"
+    src.write_bytes(b"\0" * 1024)
+    path = cache.put_file("audio", "abc", ".wav", str(src))
+    os.remove(path)  # e.g. evicted by another worker after the index lookup
+
+    assert cache.get_file("audio", "abc", ".wav") is None
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["size_bytes"] == 0
+    assert cache.stats()["stages"]["audio"] == {"hits": 0, "misses": 1}
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = PipelineCache(cache_dir=str(tmp_path), max_size_mb=1)
+    src = tmp_path / "clip.mp3"
+    src.write_bytes(b"\0" * (400 * 1024))
+    cache.put_file("tts", "first", ".mp3", str(src))
+    cache.put_file("tts", "second", ".mp3", str(src))
+    assert cache.get_file("tts", "first", ".mp3")  # Now the most recently used
+
+    cache.put_file("tts", "third", ".mp3", str(src))
+
+    assert cache.get_file("tts", "second", ".mp3") is None
+    assert cache.get_file("tts", "first", ".mp3")
+    assert cache.get_file("tts", "third", ".mp3")
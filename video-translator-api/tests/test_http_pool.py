@@ -0,0 +1,22 @@
+import asyncio
+
+from app.utils.http_pool import HTTPPool
+
+
+def test_connectors_of_closed_loops_are_dropped():
+    pool = HTTPPool(http2=False)
+
+    async def connector():
+        return pool.aiohttp_connector()
+
+    for _ in range(3):
+        asyncio.run(connector())
+
+    async def current():
+        first, second = pool.aiohttp_connector(), pool.aiohttp_connector()
+        assert first is second  # One connector per running loop
+        assert len(pool._connectors) == 1
+        await pool.aclose()
+
+    asyncio.run(current())
+    assert len(pool._connectors) == 0
@@ -0,0 +1,141 @@
+import asyncio
+
+import pytest
+
+from app.services.job_service import JobService, QueueFullError
+from app.services.pipeline_service import PipelineResult
+
+
+def result_for(video_path: str, target_lang: str) -> PipelineResult:
+    return PipelineResult(
+        output_file=f"{video_path}.{target_lang}.mp4",
+        original_text="Hello",
+        translated_text=f"[{target_lang}] Hello",
+        detected_lang="en",
+        confidence=1.0
+    )
+
+
+async def wait_finished(service, job):
+    while service.get(job.job_id).status not in ("completed", "failed"):
+        await asyncio.sleep(0.01)
+
+
+def test_submit_runs_job_and_stores_result():
+    cleaned = []
+    calls = []
+
+    async def runner(video_path, target_lang, content_hash):
+        calls.append((video_path, target_lang, content_hash))
+        return result_for(video_path, target_lang)
+
+    async def scenario():
+        service = JobService(runner, cleaned.append, workers=1, max_queue_size=4, max_finished_jobs=10)
+        job = service.submit("/tmp/upload.mp4", "es", content_hash="abc")
+        assert job.status == "queued"
+        assert service.get(job.job_id) is job
+
+        await wait_finished(service, job)
+        await service.stop()
+        return job
+
+    job = asyncio.run(scenario())
+    assert job.status == "completed"
+    assert job.error is None
+    assert job.result.output_file == "/tmp/upload.mp4.es.mp4"
+    assert calls == [("/tmp/upload.mp4", "es", "abc")]
+    # The upload is released once the job has run
+    assert cleaned == ["/tmp/upload.mp4"]
+
+
+def test_failed_job_keeps_error_and_cleans_upload():
+    cleaned = []
+
+    async def runner(video_path, target_lang, content_hash):
+        raise RuntimeError("no speech")
+
+    async def scenario():
+        service = JobService(runner, cleaned.append, workers=1, max_queue_size=4, max_finished_jobs=10)
+        job = service.submit("/tmp/silent.mp4", "fr")
+        await wait_finished(service, job)
+        await service.stop()
+        return job
+
+    job = asyncio.run(scenario())
+    assert job.status == "failed"
+    assert job.error == "no speech"
+    assert job.result is None
+    assert cleaned == ["/tmp/silent.mp4"]
+
+
+def test_submit_rejects_when_queue_full():
+    release = None
+
+    async def runner(video_path, target_lang, content_hash):
+        await release.wait()
+        return result_for(video_path, target_lang)
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        service = JobService(runner, lambda path: None, workers=1, max_queue_size=1, max_finished_jobs=10)
+        service.submit("/tmp/a.mp4", "es")
+        await asyncio.sleep(0.01)  # The worker takes the first job
+        service.submit("/tmp/b.mp4", "es")
+        assert service.queue_depth() == 1
+        with pytest.raises(QueueFullError):
+            service.submit("/tmp/c.mp4", "es")
+        # A rejected submit leaves no job behind
+        assert len(service.jobs) == 2
+
+        release.set()
+        await service.stop()
+
+    asyncio.run(scenario())
+
+
+def test_prune_forgets_oldest_finished_jobs_and_their_outputs():
+    cleaned = []
+
+    async def runner(video_path, target_lang, content_hash):
+        return result_for(video_path, target_lang)
+
+    async def scenario():
+        service = JobService(runner, cleaned.append, workers=1, max_queue_size=10, max_finished_jobs=2)
+        finished = []
+        for name in ("a", "b", "c"):
+            job = service.submit(f"/tmp/{name}.mp4", "es")
+            await wait_finished(service, job)
+            finished.append(job)
+        # Pruning happens on submit: three finished jobs, two kept
+        latest = service.submit("/tmp/d.mp4", "es")
+        await wait_finished(service, latest)
+        await service.stop()
+        return service, finished, latest
+
+    service, finished, latest = asyncio.run(scenario())
+    assert service.get(finished[0].job_id) is None
+    assert service.get(finished[1].job_id) is not None
+    assert service.get(finished[2].job_id) is not None
+    assert service.get(latest.job_id) is not None
+    assert "/tmp/a.mp4.es.mp4" in cleaned
+    assert "/tmp/b.mp4.es.mp4" not in cleaned
+
+
+def test_stop_fails_queued_jobs():
+    async def runner(video_path, target_lang, content_hash):
+        await asyncio.sleep(10)
+
+    async def scenario():
+        service = JobService(runner, lambda path: None, workers=1, max_queue_size=4, max_finished_jobs=10)
+        running = service.submit("/tmp/a.mp4", "es")
+        queued = service.submit("/tmp/b.mp4", "es")
+        await asyncio.sleep(0.01)
+        await service.stop()
+        return running, queued
+
+    running, queued = asyncio.run(scenario())
+    assert running.status == "failed"
+    assert running.error == "Job cancelled"
+    assert queued.status == "failed"
+    assert queued.error == "Server shutting down"
@@ -0,0 +1,166 @@
+import pytest
+
+from app.models.schemas import Segment
+from app.services.long_form import plan_windows, stitch
+from app.services.stt_backends import Transcription
+from app.services.stt_service import STTService
+from app.utils.vad import SpeechMap, VoiceActivityDetector
+from benchmarks.fakes import FakeSTTBackend
+from benchmarks.stt_long_form import check_order, write_lecture
+
+
+def result(*segments: Segment) -> Transcription:
+    return Transcription(
+        text=" ".join(segment.text for segment in segments),
+        language="en",
+        confidence=1.0,
+        segments=list(segments)
+    )
+
+
+def test_windows_cut_in_silences_do_not_overlap():
+    speech = SpeechMap([(0.0, 8.0), (10.0, 18.0), (20.0, 28.0)], duration=30.0)
+
+    windows = plan_windows(speech, window_seconds=12.0, overlap=2.0)
+
+    # Each cut is the middle of the last pause in the second half of the window
+    assert [(window.start, window.end) for window in windows] == [(0.0, 9.0), (9.0, 19.0), (19.0, 30.0)]
+    assert not any(window.overlaps_previous for window in windows)
+    assert [(window.keep_from, window.keep_until) for window in windows] == [
+        (0.0, 9.0), (9.0, 19.0), (19.0, float("inf"))
+    ]
+    assert windows[1].speech.regions == [(10.0, 18.0)]
+
+
+def test_windows_cut_in_speech_overlap_and_split_in_the_middle():
+    speech = SpeechMap([(0.0, 30.0)], duration=30.0)
+
+    windows = plan_windows(speech, window_seconds=12.0, overlap=2.0)
+
+    assert [(window.start, window.end) for window in windows] == [(0.0, 12.0), (10.0, 22.0), (20.0, 30.0)]
+    assert [window.overlaps_previous for window in windows] == [False, True, True]
+    assert windows[0].keep_until == windows[1].keep_from == 11.0
+    assert windows[1].keep_until == windows[2].keep_from == 21.0
+
+
+def test_windows_without_speech_are_skipped():
+    speech = SpeechMap([(0.0, 5.0), (40.0, 45.0)], duration=50.0)
+
+    windows = plan_windows(speech, window_seconds=12.0, overlap=2.0)
+
+    assert all(window.speech.regions for window in windows)
+    assert [window.index for window in windows] == list(range(len(windows)))
+    assert windows[-1].end == 50.0
+
+
+def test_stitch_keeps_overlap_from_one_side_and_drops_repeated_words():
+    windows = plan_windows(SpeechMap([(0.0, 30.0)], duration=30.0), window_seconds=12.0, overlap=2.0)
+    results = [
+        result(
+            Segment(start=0.0, end=5.0, text="We start here."),
+            Segment(start=5.0, end=11.8, text="one two three four"),
+        ),
+        result(
+            Segment(start=10.0, end=10.8, text="two"),  # Midpoint before the split: the first window's
+            Segment(start=10.5, end=13.0, text="three four five six"),
+            Segment(start=13.0, end=21.5, text="seven eight"),
+        ),
+        result(
+            Segment(start=20.0, end=21.5, text="eight"),
+            Segment(start=21.5, end=29.0, text="nine ten"),
+        ),
+    ]
+
+    segments = stitch(windows, results)
+
+    assert [segment.text for segment in segments] == [
+        "We start here.", "one two three four", "five six", "seven eight", "nine ten"
+    ]
+    # The seam's first segment starts after the previous window's last one
+    assert segments[2].start == 11.8
+    assert check_order(segments)
+
+
+def test_stitch_uses_text_when_window_has_no_segments():
+    windows = plan_windows(SpeechMap([(2.0, 8.0)], duration=10.0), window_seconds=12.0, overlap=2.0)
+
+    segments = stitch(windows, [Transcription(text=" Hello there. ", language="en", confidence=0.9)])
+
+    assert segments == [Segment(start=2.0, end=8.0, text="Hello there.")]
+
+
+def make_stt(backend: FakeSTTBackend, retries: int) -> STTService:
+    return STTService(
+        backend=backend,
+        vad=VoiceActivityDetector(),
+        long_form_seconds=1,
+        window_seconds=60,
+        window_concurrency=1,
+        window_retries=retries,
+    )
+
+
+def test_failed_windows_are_retried(tmp_path):
+    audio_path = str(tmp_path / "lecture.wav")
+    write_lecture(audio_path, seconds=180)
+    backend = FakeSTTBackend(latency=0.0, segment_seconds=5, fail_every=3)
+    stt = make_stt(backend, retries=2)
+
+    segments, language, confidence = stt.transcribe_segments(audio_path)
+
+    assert backend.failures > 0
+    assert backend.calls == len(plan_windows(stt.detect_speech(audio_path), 60, stt.window_overlap)) + backend.failures
+    assert segments and check_order(segments)
+    assert segments[-1].end <= 180 + 2.0
+    assert language == "en"
+    stt.close()
+
+
+def test_window_failing_every_attempt_fails_the_transcription(tmp_path):
+    audio_path = str(tmp_path / "lecture.wav")
+    write_lecture(audio_path, seconds=90)
+    backend = FakeSTTBackend(latency=0.0, segment_seconds=5, fail_every=1)
+    stt = make_stt(backend, retries=1)
+
+    with pytest.raises(Exception, match=r"Window \d+ .* failed"):
+        stt.transcribe_segments(audio_path)
+
+    # The first window is tried once plus one retry before the transcription gives up
+    assert backend.failures >= 2
+    stt.close()
+
+
+def test_long_wav_without_vad_is_cut_into_fixed_windows(tmp_path):
+    audio_path = str(tmp_path / "lecture.wav")
+    write_lecture(audio_path, seconds=150)
+    backend = FakeSTTBackend(latency=0.0, segment_seconds=5)
+    stt = STTService(
+        backend=backend,
+        vad=False,
+        long_form_seconds=60,
+        window_seconds=60,
+        window_overlap=2,
+        window_concurrency=2,
+        window_retries=0,
+    )
+
+    segments, language, confidence = stt.transcribe_segments(audio_path)
+
+    # 0-60, 58-118 and 116 to the end, each sent as its own request
+    assert backend.calls == 3
+    assert segments and check_order(segments)
+    assert segments[-1].end > 120
+    stt.close()
+
+
+def test_non_wav_input_is_sent_in_one_request(tmp_path):
+    audio_path = str(tmp_path / "lecture.mp3")
+    with open(audio_path, "wb") as f:
+        f.write(b"\xff\xfb" + b"\0" * 4096)
+    backend = FakeSTTBackend(latency=0.0)
+    stt = STTService(backend=backend, vad=False, long_form_seconds=1, window_seconds=60)
+
+    stt.transcribe_segments(audio_path)
+
+    assert backend.calls == 1
+    stt.close()
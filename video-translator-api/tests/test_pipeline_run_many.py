@@ -0,0 +1,42 @@
+import asyncio
+import os
+
+import pytest
+
+from app.services.cache_service import PipelineCache
+from app.services.pipeline_service import PipelineService
+from app.utils.executor import TaskExecutor
+from app.utils.file_handler import FileHandler
+from benchmarks.fakes import FakeVideoService, fake_stt_service, fake_translation_service, fake_tts_service
+from benchmarks.stt_long_form import write_lecture
+
+
+def make_pipeline(tmp_path, cache: PipelineCache) -> PipelineService:
+    files = FileHandler(upload_dir=str(tmp_path / "uploads"), output_dir=str(tmp_path / "outputs"))
+    return PipelineService(
+        fake_stt_service(0.0, 2), fake_translation_service(0.0), fake_tts_service(0.0),
+        FakeVideoService(0), files, TaskExecutor(io_workers=4, ffmpeg_workers=2), cache=cache
+    )
+
+
+def test_cached_outputs_are_removed_when_transcription_fails(tmp_path):
+    video_path = str(tmp_path / "input.wav")
+    write_lecture(video_path, seconds=10)
+    cache = PipelineCache(cache_dir=str(tmp_path / "cache"), max_size_mb=50)
+    pipeline = make_pipeline(tmp_path, cache)
+
+    async def scenario():
+        first = await pipeline.run(video_path, "es", "video-hash")
+        os.remove(first.output_file)
+
+        async def no_transcript(*args, **kwargs):
+            raise RuntimeError("STT provider down")
+
+        # es is served from the cache and linked into the output directory, fr needs a transcript
+        pipeline._source_transcript = no_transcript
+        with pytest.raises(RuntimeError, match="STT provider down"):
+            await pipeline.run_many(video_path, ["es", "fr"], "video-hash")
+
+    asyncio.run(scenario())
+    assert cache.stats()["stages"]["video"]["hits"] == 1
+    assert os.listdir(tmp_path / "outputs") == []
@@ -0,0 +1,62 @@
+import asyncio
+
+from app.services.service_container import ServiceContainer
+
+
+async def run_io(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+
+class SlowService:
+    def __init__(self, release: asyncio.Event):
+        self.release = release
+
+    async def warm(self):
+        await self.release.wait()
+
+
+class BrokenService:
+    def warm(self):
+        raise ConnectionError("provider unreachable")
+
+
+def test_starting_until_background_warmup_finishes():
+    async def scenario():
+        release = asyncio.Event()
+        services = ServiceContainer({"slow": lambda: SlowService(release)}, warmup=True)
+
+        startup = services.start_background(run_io)
+        assert services.starting  # Before the task has run at all
+        await asyncio.sleep(0.05)
+        assert services.starting
+        assert services.status() == {"slow": "ready"}
+
+        release.set()
+        await startup
+        assert not services.starting
+
+    asyncio.run(scenario())
+
+
+def test_warmup_failure_marks_service_degraded():
+    async def scenario():
+        services = ServiceContainer({"broken": BrokenService}, warmup=True)
+        await services.start_background(run_io)
+        return services
+
+    services = asyncio.run(scenario())
+    assert not services.starting
+    assert services.status() == {"broken": "degraded"}
+    assert services.errors() == {"broken": "Warm-up failed: provider unreachable"}
+
+
+def test_cancelled_startup_is_not_left_starting():
+    async def scenario():
+        services = ServiceContainer({"slow": lambda: SlowService(asyncio.Event())}, warmup=True)
+        startup = services.start_background(run_io)
+        await asyncio.sleep(0.05)
+        startup.cancel()
+        await asyncio.gather(startup, return_exceptions=True)
+        return services
+
+    assert not asyncio.run(scenario()).starting
@@ -0,0 +1,65 @@
+from app.models.schemas import Segment, Word
+from app.utils.subtitles import build_cues, format_srt
+
+
+def timed_words(count: int, spacing: float = 0.5) -> list:
+    return [Word(start=i * spacing, end=i * spacing + 0.4, text=f"word{i}") for i in range(count)]
+
+
+def assert_well_formed(cues):
+    assert all(cue.end > cue.start for cue in cues)
+    assert all(a.end <= b.start for a, b in zip(cues, cues[1:]))
+
+
+def test_short_first_chunk_snapped_to_one_word_keeps_a_span():
+    text = (
+        "Sí. Creo que deberíamos ir al mercado más tarde hoy porque cierra pronto "
+        "y no quiero llegar tarde otra vez, de verdad."
+    )
+    segment = Segment(start=0.0, end=8.0, text=text, words=timed_words(16))
+
+    cues = build_cues([segment])
+
+    assert cues[0].text == "Sí."
+    assert_well_formed(cues)
+    assert cues[1].start >= cues[0].end > 0.0
+    assert "00:00:00,000 --> 00:00:00,000" not in format_srt(cues)
+
+
+def test_long_segment_is_split_at_word_timings():
+    text = " ".join(f"Sentence number {i} is here." for i in range(8))
+    segment = Segment(start=0.0, end=20.0, text=text, words=timed_words(40))
+
+    cues = build_cues([segment])
+
+    assert len(cues) > 1
+    assert_well_formed(cues)
+    word_edges = {word.start for word in segment.words} | {word.end for word in segment.words}
+    assert all(cue.start in word_edges for cue in cues[1:])
+    assert " ".join(" ".join(cue.text.split()) for cue in cues) == text
+
+
+def test_cue_hidden_by_previous_one_is_merged_into_it():
+    segments = [
+        Segment(start=0.0, end=5.0, text="Hello there."),
+        Segment(start=1.0, end=2.0, text="Hi."),
+        Segment(start=6.0, end=8.0, text="Goodbye."),
+    ]
+
+    cues = build_cues(segments)
+
+    assert [cue.text for cue in cues] == ["Hello there. Hi.", "Goodbye."]
+    assert_well_formed(cues)
+
+
+def test_untimed_segments_follow_the_previous_cue():
+    segments = [
+        Segment(start=0.0, end=2.0, text="First line."),
+        Segment(start=0.0, end=0.0, text="Second line without timing."),
+    ]
+
+    cues = build_cues(segments, min_duration=1.0)
+
+    assert cues[1].start == cues[0].end == 2.0
+    assert cues[1].end - cues[1].start >= 1.0
+    assert_well_formed(cues)
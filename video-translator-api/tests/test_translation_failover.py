@@ -0,0 +1,141 @@
+import threading
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.services.translation_backends import LocalBackend, stub_engine
+from app.services.translation_service import TranslationService
+
+
+class FailingEngine:
+    """Engine that raises for its first `failures` calls, then answers like stub_engine"""
+
+    def __init__(self, failures: int = 10 ** 9):
+        self.failures = failures
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, text: str, source: str, target: str) -> str:
+        with self._lock:
+            self.calls += 1
+            if self.calls <= self.failures:
+                raise ConnectionError("provider unreachable")
+        return stub_engine(text, source, target)
+
+
+def sample(name: str, provider: str) -> float:
+    return REGISTRY.get_sample_value(name, {"provider": provider, "operation": "translate"}) or 0.0
+
+
+def make_service(backends: dict, **kwargs) -> TranslationService:
+    kwargs.setdefault("failover_cooldown", 60)
+    return TranslationService(backends=backends, cache_size=0, concurrency=1, **kwargs)
+
+
+def test_fails_over_to_next_backend():
+    primary = FailingEngine()
+    service = make_service({
+        "primary-down": LocalBackend(engine=primary),
+        "secondary-up": LocalBackend(engine=stub_engine),
+    })
+    errors_before = sample("external_api_errors_total", "primary-down")
+    calls_before = sample("external_api_seconds_count", "secondary-up")
+
+    assert service.translate("Hello there.", "en", "es") == "[es] Hello there."
+
+    stats = service.backend_stats()
+    assert stats["primary-down"]["calls"] == 1
+    assert stats["primary-down"]["errors"] == 1
+    assert stats["primary-down"]["available"] is False
+    assert stats["secondary-up"]["calls"] == 1
+    assert stats["secondary-up"]["errors"] == 0
+    assert stats["secondary-up"]["available"] is True
+    assert stats["secondary-up"]["avg_latency_ms"] is not None
+
+    assert sample("external_api_errors_total", "primary-down") == errors_before + 1
+    assert sample("external_api_seconds_count", "secondary-up") == calls_before + 1
+    service.close()
+
+
+def test_backend_in_cooldown_is_tried_last():
+    primary = FailingEngine(failures=1)
+    service = make_service({
+        "primary-cooling": LocalBackend(engine=primary),
+        "secondary-warm": LocalBackend(engine=stub_engine),
+    })
+
+    service.translate("First.", "en", "es")
+    # The primary failed once and is skipped while cooling down, even though it would answer now
+    service.translate("Second.", "en", "es")
+
+    stats = service.backend_stats()
+    assert primary.calls == 1
+    assert stats["primary-cooling"]["calls"] == 1
+    assert stats["secondary-warm"]["calls"] == 2
+    service.close()
+
+
+def test_backend_is_retried_after_cooldown():
+    primary = FailingEngine(failures=1)
+    service = make_service({
+        "primary-recovers": LocalBackend(engine=primary),
+        "secondary-fallback": LocalBackend(engine=stub_engine),
+    }, failover_cooldown=0)
+
+    service.translate("First.", "en", "es")
+    service.translate("Second.", "en", "es")
+
+    stats = service.backend_stats()
+    assert primary.calls == 2
+    assert stats["primary-recovers"]["calls"] == 2
+    assert stats["primary-recovers"]["errors"] == 1
+    assert stats["primary-recovers"]["available"] is True
+    assert stats["secondary-fallback"]["calls"] == 1
+    service.close()
+
+
+def test_all_backends_failing_raises():
+    service = make_service({
+        "first-down": LocalBackend(engine=FailingEngine()),
+        "second-down": LocalBackend(engine=FailingEngine()),
+    })
+
+    with pytest.raises(Exception, match="provider unreachable"):
+        service.translate("Hello.", "en", "es")
+
+    stats = service.backend_stats()
+    assert stats["first-down"]["errors"] == 1
+    assert stats["second-down"]["errors"] == 1
+    service.close()
+
+
+def test_failover_is_per_chunk():
+    primary = FailingEngine(failures=1)
+    service = make_service({
+        "chunked-primary": LocalBackend(engine=primary),
+        "chunked-secondary": LocalBackend(engine=stub_engine),
+    }, chunk_chars=20)
+
+    translated = service.translate_batch(["One sentence here. Another one here."], "en", "es")
+
+    assert translated == ["[es] One sentence here. [es] Another one here."]
+    stats = service.backend_stats()
+    assert stats["chunked-primary"]["errors"] == 1
+    assert stats["chunked-secondary"]["calls"] == 2
+    service.close()
+
+
+def test_fastest_routing_prefers_lowest_latency():
+    service = make_service({
+        "slow-backend": LocalBackend(engine=stub_engine),
+        "fast-backend": LocalBackend(engine=stub_engine),
+    }, routing="fastest")
+    service.stats["slow-backend"].record(("en", "es"), 2.0, ok=True)
+    service.stats["fast-backend"].record(("en", "es"), 0.1, ok=True)
+
+    service.translate("Hello.", "en", "es")
+
+    stats = service.backend_stats()
+    assert stats["fast-backend"]["calls"] == 2
+    assert stats["slow-backend"]["calls"] == 1
+    service.close()
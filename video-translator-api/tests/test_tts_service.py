@@ -0,0 +1,22 @@
+import asyncio
+
+from benchmarks.fakes import fake_tts_service
+
+
+def test_limits_of_closed_loops_are_dropped(tmp_path):
+    tts = fake_tts_service(latency=0.01, concurrency=1)
+
+    async def synthesize(run: int):
+        # Two clips against a limit of one: the second waits, binding the semaphore to this loop
+        await asyncio.gather(*[
+            tts.generate_speech_batch("Hello there.", "es", str(tmp_path / f"{run}_{i}.mp3")) for i in range(2)
+        ])
+
+    for run in range(3):
+        asyncio.run(synthesize(run))
+
+    async def current():
+        tts._limit()
+        return len(tts._limits)
+
+    assert asyncio.run(current()) == 1